@@ -0,0 +1,92 @@
+import csv
+import time
+from io import StringIO
+
+from django.core.management.base import BaseCommand
+
+from api.management.commands.benchmark_renderers import (
+    ingredients_list, recipes_page)
+from api.v1.compression import CompressionCache, compress
+from api.v1.renderers import FastJSONRenderer
+
+
+class Command(BaseCommand):
+    """Измеряет экономию трафика и затраты CPU на сжатие gzip ответов API:
+    страницы списка рецептов, полного списка ингредиентов и списка покупок
+    в CSV для уровней сжатия из "--levels". Для каждого уровня выводит
+    размер сжатого тела, долю сэкономленных байт, время сжатия и время
+    выдачи из кэша сжатых тел ("CompressionCache").
+    Пример: python manage.py benchmark_compression --levels 1 6 9"""
+
+    help = 'Измеряет экономию трафика и время сжатия ответов API'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ingredients-list',
+            type=int,
+            default=2200,
+            help='Число ингредиентов в полном списке ингредиентов.')
+        parser.add_argument(
+            '--levels',
+            type=int,
+            nargs='*',
+            default=[1, 6, 9],
+            help='Уровни сжатия gzip.')
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=6,
+            help='Число рецептов на странице.')
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=200,
+            help='Число повторов каждой операции.')
+
+    def handle(self, *args, **options):
+        renderer: FastJSONRenderer = FastJSONRenderer()
+        payloads: dict[str, bytes] = {
+            'recipes': renderer.render(recipes_page(
+                page_size=options['page_size'], ingredients=10)),
+            'ingredients': renderer.render(ingredients_list(
+                count=options['ingredients_list'])),
+            'shopping_cart': self._shopping_cart(
+                count=options['ingredients_list'] // 20)}
+        self.stdout.write(
+            f'{"payload":<15}{"level":>6}{"bytes":>9}{"gzip":>9}'
+            f'{"saved":>8}{"ms":>9}{"cached ms":>11}')
+        for name, content in payloads.items():
+            for level in options['levels']:
+                compressed: bytes = compress(content=content, level=level)
+                cache: CompressionCache = CompressionCache()
+                cache.compress(content=content, level=level)
+                compress_ms: float = self._measure(
+                    func=lambda: compress(content=content, level=level),
+                    repeat=options['repeat'])
+                cached_ms: float = self._measure(
+                    func=lambda: cache.compress(content=content, level=level),
+                    repeat=options['repeat'])
+                self.stdout.write(
+                    f'{name:<15}{level:>6}{len(content):>9}'
+                    f'{len(compressed):>9}'
+                    f'{1 - len(compressed) / len(content):>8.1%}'
+                    f'{compress_ms:>9.3f}{cached_ms:>11.4f}')
+        return
+
+    def _measure(self, func, repeat: int) -> float:
+        """Вспомогательная функция: возвращает среднее время вызова func
+        в миллисекундах."""
+        started: float = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - started) / repeat * 1000
+
+    def _shopping_cart(self, count: int) -> bytes:
+        """Вспомогательная функция: возвращает список покупок из count
+        ингредиентов в формате CSV ".../recipes/download_shopping_cart/"."""
+        stream: StringIO = StringIO()
+        writer = csv.writer(stream)
+        writer.writerow(('name', 'measurement_unit', 'amount'))
+        for num in range(count):
+            writer.writerow((f'ингредиент {num}', 'г', num * 12.5))
+        return stream.getvalue().encode()
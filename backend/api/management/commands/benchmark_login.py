@@ -0,0 +1,58 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+BENCHMARK_PASSWORD: str = 'benchmark_password_1'
+
+
+class Command(BaseCommand):
+    """Измеряет пропускную способность входа в систему для политик
+    хеширования паролей из "PASSWORD_HASHER_POLICIES".
+    Для каждой политики многократно проверяет пароль ее основным хешером
+    (основная нагрузка на CPU при входе) в одном потоке и выводит число
+    входов в секунду на один воркер gunicorn.
+    Пример: python manage.py benchmark_login --seconds 5 --policies scrypt"""
+
+    help = 'Измеряет число входов в секунду на воркер для политик хеширования'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--policies',
+            nargs='*',
+            default=list(settings.PASSWORD_HASHER_POLICIES),
+            help='Политики для измерения (по умолчанию - все).')
+        parser.add_argument(
+            '--seconds',
+            type=float,
+            default=3.0,
+            help='Длительность измерения одной политики в секундах.')
+
+    def handle(self, *args, **options):
+        for policy in options['policies']:
+            if policy not in settings.PASSWORD_HASHER_POLICIES:
+                raise CommandError(f'Неизвестная политика "{policy}".')
+        self.stdout.write(
+            f'{"policy":<10}{"algorithm":<16}{"ms/login":>10}'
+            f'{"logins/sec/worker":>20}')
+        for policy in options['policies']:
+            hasher = import_string(
+                settings.PASSWORD_HASHER_POLICIES[policy][0])()
+            try:
+                encoded: str = hasher.encode(
+                    BENCHMARK_PASSWORD, hasher.salt())
+            except ValueError as error:
+                self.stdout.write(f'{policy:<10}пропущена: {error}')
+                continue
+            logins: int = 0
+            started: float = time.perf_counter()
+            elapsed: float = 0.0
+            while logins == 0 or elapsed < options['seconds']:
+                hasher.verify(BENCHMARK_PASSWORD, encoded)
+                logins += 1
+                elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{policy:<10}{hasher.algorithm:<16}'
+                f'{elapsed / logins * 1000:>10.1f}'
+                f'{logins / elapsed:>20.1f}')
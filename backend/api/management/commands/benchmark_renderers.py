@@ -0,0 +1,124 @@
+import time
+from decimal import Decimal
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.v1.parsers import FastJSONParser
+from api.v1.renderers import FastJSONRenderer, orjson
+
+
+def ingredients_list(count: int) -> list[dict]:
+    """Возвращает полный список ингредиентов в формате выдачи
+    "/api/v1/ingredients/" (без БД)."""
+    return [
+        {'id': num, 'name': f'ингредиент {num}', 'measurement_unit': 'г'}
+        for num in range(count)]
+
+
+def recipes_page(page_size: int, ingredients: int) -> dict:
+    """Возвращает страницу списка рецептов в формате выдачи
+    "/api/v1/recipes/" (без БД)."""
+    return {
+        'count': page_size * 10,
+        'next': 'http://localhost/api/v1/recipes/?page=2',
+        'previous': None,
+        'results': [{
+            'id': recipe_num,
+            'tags': [
+                {'id': num, 'name': f'Тег{num}', 'color': '#E26C2D',
+                 'slug': f'tag_{num}'}
+                for num in range(3)],
+            'author': {
+                'email': 'author@email.com', 'id': 1,
+                'username': 'author', 'first_name': 'Иван',
+                'last_name': 'Петров', 'is_subscribed': True},
+            'ingredients': [
+                {'id': num, 'name': f'ингредиент {num}',
+                 'measurement_unit': 'г',
+                 'amount': Decimal('12.50') if num % 2 else num + 0.5}
+                for num in range(ingredients)],
+            'is_favorited': False,
+            'is_in_shopping_cart': True,
+            'name': f'Рецепт {recipe_num}',
+            'image': (f'http://localhost/media/recipes/variants/'
+                      f'{recipe_num}_card.webp'),
+            'text': 'Описание приготовления рецепта. ' * 20,
+            'cooking_time': 30}
+            for recipe_num in range(page_size)]}
+
+
+class Command(BaseCommand):
+    """Измеряет время рендеринга и разбора JSON для "JSONRenderer"/
+    "JSONParser" DRF и "FastJSONRenderer"/"FastJSONParser" на страницах
+    списка рецептов и полном списке ингредиентов (выдача API без БД).
+    Пример: python manage.py benchmark_renderers --page-size 24"""
+
+    help = 'Измеряет время рендеринга и разбора JSON выдачи API'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ingredients',
+            type=int,
+            default=10,
+            help='Число ингредиентов в каждом рецепте.')
+        parser.add_argument(
+            '--ingredients-list',
+            type=int,
+            default=2200,
+            help='Число ингредиентов в полном списке ингредиентов.')
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=6,
+            help='Число рецептов на странице.')
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=500,
+            help='Число повторов каждой операции.')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(
+                'orjson не установлен: FastJSONRenderer и FastJSONParser '
+                'используют json.')
+        payloads: dict[str, object] = {
+            'recipes': recipes_page(
+                page_size=options['page_size'],
+                ingredients=options['ingredients']),
+            'ingredients': ingredients_list(
+                count=options['ingredients_list'])}
+        self.stdout.write(
+            f'{"payload":<13}{"operation":<10}{"bytes":>9}'
+            f'{"json, ms":>10}{"fast, ms":>10}{"speedup":>9}')
+        for name, data in payloads.items():
+            body: bytes = JSONRenderer().render(data)
+            operations: dict[str, tuple] = {
+                'render': (
+                    lambda: JSONRenderer().render(data),
+                    lambda: FastJSONRenderer().render(data)),
+                'parse': (
+                    lambda: JSONParser().parse(BytesIO(body)),
+                    lambda: FastJSONParser().parse(BytesIO(body)))}
+            for operation, (baseline, fast) in operations.items():
+                baseline_ms: float = self._measure(
+                    func=baseline, repeat=options['repeat'])
+                fast_ms: float = self._measure(
+                    func=fast, repeat=options['repeat'])
+                self.stdout.write(
+                    f'{name:<13}{operation:<10}{len(body):>9}'
+                    f'{baseline_ms:>10.3f}{fast_ms:>10.3f}'
+                    f'{baseline_ms / fast_ms:>8.2f}x')
+        return
+
+    def _measure(self, func, repeat: int) -> float:
+        """Вспомогательная функция: возвращает среднее время вызова func
+        в миллисекундах."""
+        func()
+        started: float = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - started) / repeat * 1000
@@ -0,0 +1,127 @@
+import time
+from typing import Callable
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Prefetch
+from rest_framework.test import APIRequestFactory
+
+from api.v1.serializers import (
+    RECIPES_READ_VALUES, RecipesReadSerializer, RecipesSerializer)
+from api.v1.views import RecipesViewSet
+from foodgram_app.models import (
+    Ingredients, Recipes, RecipesIngredients, RecipesTags, Tags)
+
+BENCHMARK_IMAGE_NAME: str = 'recipes/images/benchmark.gif'
+
+
+class Command(BaseCommand):
+    """Измеряет время выдачи страницы списка рецептов сериализаторами
+    "RecipesSerializer" и "RecipesReadSerializer" (выборка страницы из БД
+    и сериализация) для анонимного и авторизованного пользователя.
+    Рецепты создаются в транзакции, которая откатывается после измерения,
+    поэтому БД не изменяется.
+    Пример: python manage.py benchmark_serializers --page-size 24"""
+
+    help = 'Измеряет время выдачи страницы рецептов сериализаторами'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ingredients',
+            type=int,
+            default=10,
+            help='Число ингредиентов в каждом рецепте.')
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=6,
+            help='Число рецептов на странице.')
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=200,
+            help='Число выдач страницы каждым сериализатором.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{"serializer":<24}{"user":<8}{"ms/page":>10}{"speedup":>10}')
+        with transaction.atomic():
+            recipe_ids: list[int] = self._create_recipes(
+                count=options['page_size'],
+                ingredients=options['ingredients'])
+            user: User = User.objects.create(
+                username='benchmark_reader',
+                email='benchmark_reader@email.com')
+            for reader in (AnonymousUser(), user):
+                self._benchmark_user(
+                    recipe_ids=recipe_ids,
+                    repeat=options['repeat'],
+                    user=reader)
+            transaction.set_rollback(True)
+        return
+
+    def _benchmark_user(
+            self, recipe_ids: list[int], repeat: int, user: User) -> None:
+        """Вспомогательная функция: выдает страницу рецептов recipe_ids
+        repeat раз каждым сериализатором от имени user и выводит
+        результаты."""
+        request = APIRequestFactory().get(
+            '/api/v1/recipes/', HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        request.user = user
+        context: dict = {
+            'request': request, 'view': RecipesViewSet(action='list')}
+        pages: dict[str, Callable[[], list]] = {
+            'RecipesSerializer': lambda: RecipesSerializer(
+                Recipes.objects.filter(id__in=recipe_ids)
+                .select_related('author').prefetch_related(
+                    Prefetch('recipe_ingredient',
+                             queryset=RecipesIngredients.objects.order_by()),
+                    Prefetch('recipe_tag',
+                             queryset=RecipesTags.objects.order_by())),
+                many=True, context=context).data,
+            'RecipesReadSerializer': lambda: RecipesReadSerializer(
+                Recipes.objects.filter(id__in=recipe_ids)
+                .values(*RECIPES_READ_VALUES),
+                many=True, context=context).data}
+        user_kind: str = 'anon' if user.is_anonymous else 'auth'
+        baseline: float = None
+        for name, page in pages.items():
+            page()
+            started: float = time.perf_counter()
+            for _ in range(repeat):
+                page()
+            elapsed: float = (time.perf_counter() - started) / repeat
+            baseline = baseline or elapsed
+            self.stdout.write(
+                f'{name:<24}{user_kind:<8}{elapsed * 1000:>10.3f}'
+                f'{baseline / elapsed:>9.2f}x')
+        return
+
+    def _create_recipes(self, count: int, ingredients: int) -> list[int]:
+        """Вспомогательная функция: создает count рецептов с тремя тегами
+        и ingredients ингредиентами каждый. Возвращает ID рецептов."""
+        author: User = User.objects.create(
+            username='benchmark_author', email='benchmark_author@email.com')
+        tags: list[Tags] = Tags.objects.bulk_create([
+            Tags(color=f'#BE{num:04d}', name=f'Бенчмарк{num}',
+                 slug=f'benchmark_{num}')
+            for num in range(3)])
+        ingredient_objs: list[Ingredients] = Ingredients.objects.bulk_create([
+            Ingredients(name=f'benchmark_{num}', measurement_unit='г')
+            for num in range(ingredients)])
+        recipes: list[Recipes] = Recipes.objects.bulk_create([
+            Recipes(author=author, cooking_time=num + 1,
+                    image=BENCHMARK_IMAGE_NAME, name=f'benchmark_{num}',
+                    text='benchmark')
+            for num in range(count)])
+        RecipesTags.objects.bulk_create([
+            RecipesTags(recipe=recipe, tag=tag)
+            for recipe in recipes for tag in tags])
+        RecipesIngredients.objects.bulk_create([
+            RecipesIngredients(amount=num + 1, ingredient=ingredient,
+                               recipe=recipe)
+            for recipe in recipes
+            for num, ingredient in enumerate(ingredient_objs)])
+        return [recipe.id for recipe in recipes]
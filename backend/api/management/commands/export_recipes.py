@@ -0,0 +1,36 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from api.v1.transfer import RECIPES_TRANSFER_CHUNK_SIZE, export_recipes
+from foodgram_app.models import Recipes
+
+
+class Command(BaseCommand):
+    """Выгружает рецепты в файл NDJSON (см. "api/v1/transfer.py").
+    Рецепты читаются серверным курсором, поэтому объем памяти
+    не зависит от числа рецептов.
+    Пример: python manage.py export_recipes --output recipes.ndjson"""
+
+    help = 'Выгружает рецепты в файл NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default='-',
+            help='Путь к файлу NDJSON или "-" для стандартного вывода.')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=RECIPES_TRANSFER_CHUNK_SIZE,
+            help='Число рецептов, читаемых из БД за один раз.')
+
+    def handle(self, *args, **options):
+        lines = export_recipes(
+            recipes=Recipes.objects.all(), chunk_size=options['chunk_size'])
+        if options['output'] == '-':
+            sys.stdout.buffer.writelines(lines)
+            sys.stdout.buffer.flush()
+            return
+        with open(options['output'], 'wb') as file:
+            file.writelines(lines)
@@ -0,0 +1,62 @@
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from api.v1.transfer import (
+    RECIPES_TRANSFER_CHUNK_MAX_BYTES, RECIPES_TRANSFER_CHUNK_SIZE,
+    import_recipes, read_lines)
+
+
+class Command(BaseCommand):
+    """Создает рецепты из файла NDJSON (см. "api/v1/transfer.py").
+    Строки с ошибками пропускаются и выводятся с номерами строк.
+    Картинки обрабатываются в пуле потоков "RECIPES_IMAGE_WORKERS";
+    команда завершается после обработки всех картинок.
+    Пример: python manage.py import_recipes recipes.ndjson --author admin"""
+
+    help = 'Создает рецепты из файла NDJSON ("-" - стандартный ввод)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='Путь к файлу NDJSON или "-" для стандартного ввода.')
+        parser.add_argument(
+            '--author',
+            required=True,
+            help='Имя пользователя (username) автора рецептов.')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=RECIPES_TRANSFER_CHUNK_SIZE,
+            help='Число строк, сохраняемых в одной транзакции.')
+        parser.add_argument(
+            '--chunk-max-bytes',
+            type=int,
+            default=RECIPES_TRANSFER_CHUNK_MAX_BYTES,
+            help='Размер строк в байтах, сохраняемых в одной транзакции.')
+
+    def handle(self, *args, **options):
+        author: User = User.objects.filter(
+            username=options['author']).first()
+        if author is None:
+            raise CommandError(
+                f'Пользователь "{options["author"]}" не существует.')
+        if options['path'] == '-':
+            report: dict = import_recipes(
+                lines=read_lines(stream=sys.stdin.buffer),
+                author=author,
+                chunk_size=options['chunk_size'],
+                chunk_max_bytes=options['chunk_max_bytes'])
+        else:
+            with open(options['path'], 'rb') as file:
+                report: dict = import_recipes(
+                    lines=read_lines(stream=file),
+                    author=author,
+                    chunk_size=options['chunk_size'],
+                    chunk_max_bytes=options['chunk_max_bytes'])
+        for error in report['errors']:
+            self.stderr.write(f'Строка {error["line"]}: {error["errors"]}')
+        self.stdout.write(
+            f'Создано рецептов: {report["created"]}, '
+            f'пропущено строк: {len(report["errors"])}.')
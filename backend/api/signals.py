@@ -0,0 +1,46 @@
+from django.contrib.auth.models import User
+from django.db import connections
+from django.db.models import Index
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from api.v1.authentication import invalidate_token, invalidate_user_tokens
+from api.v1.backends import USER_EMAIL_INDEX_NAME
+
+
+@receiver(signal=post_migrate)
+def create_user_email_index(sender, using, *args, **kwargs) -> None:
+    """После миграций создает индекс по полю "email" встроенной модели
+    "User", если его еще нет. Индекс используется "EmailBackend" при входе
+    в систему. Задать индекс в миграциях нельзя: модель "User" принадлежит
+    приложению "django.contrib.auth"."""
+    if sender.label != User._meta.app_label:
+        return
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        constraints: dict = connection.introspection.get_constraints(
+            cursor, User._meta.db_table)
+    if USER_EMAIL_INDEX_NAME in constraints:
+        return
+    with connection.schema_editor() as schema_editor:
+        schema_editor.add_index(
+            User, Index(fields=('email',), name=USER_EMAIL_INDEX_NAME))
+    return
+
+
+@receiver(signal=post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, *args, **kwargs) -> None:
+    """При удалении токена (в том числе при выходе из системы через
+    "TokenDestroyView") удаляет его запись из кэша аутентификации."""
+    invalidate_token(instance.key)
+    return
+
+
+@receiver(signal=post_save, sender=User)
+def invalidate_saved_user_tokens(sender, instance, *args, **kwargs) -> None:
+    """При сохранении пользователя (смена пароля через "set_password",
+    деактивация, изменение данных) удаляет записи его токенов из кэша
+    аутентификации."""
+    invalidate_user_tokens(instance.pk)
+    return
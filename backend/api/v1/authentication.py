@@ -0,0 +1,189 @@
+"""
+Создает классы аутентификации для API проекта "Foodgram".
+
+Классы:
+    - TokenCache;
+    - CachedTokenAuthentication (унаследован от TokenAuthentication).
+
+Создает функции инвалидации кэша токенов:
+    - invalidate_token;
+    - invalidate_user_tokens.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+TOKEN_CACHE_KEY_PREFIX: str = 'foodgram:auth-token:'
+TOKEN_CACHE_USER_KEY_PREFIX: str = 'foodgram:auth-token-user:'
+TOKEN_CACHE_DEFAULTS: dict = {
+    'CACHE_ALIAS': None,
+    'MAX_SIZE': 10000,
+    'TIMEOUT': 60}
+
+
+class TokenCache():
+    """
+    Хранит записи "ключ токена - (ID пользователя, дата создания токена)"
+    для "CachedTokenAuthentication". Объекты пользователей не кэшируются:
+    пользователь загружается из БД при каждом запросе.
+
+    Без "CACHE_ALIAS" записи хранятся в памяти процесса: размер ограничен
+    "MAX_SIZE" записями (вытесняются давно не использованные), время жизни
+    записи - "TIMEOUT" секунд. Инвалидация сигналами действует только
+    в текущем процессе, поэтому в остальных процессах отозванный токен
+    остается действительным не дольше "TIMEOUT". Такой режим подходит
+    только для одного процесса: при нескольких процессах (воркеры
+    Gunicorn, несколько контейнеров) нужно задать "CACHE_ALIAS".
+
+    С "CACHE_ALIAS" записи хранятся в общем кэше Django (например, Redis
+    или Memcached) с тем же "TIMEOUT": инвалидация действует сразу во всех
+    процессах.
+    """
+
+    def __init__(
+            self,
+            cache_alias: str = None,
+            max_size: int = TOKEN_CACHE_DEFAULTS['MAX_SIZE'],
+            timeout: int = TOKEN_CACHE_DEFAULTS['TIMEOUT']):
+        self.shared = caches[cache_alias] if cache_alias else None
+        self.max_size: int = max_size
+        self.timeout: int = timeout
+        self._entries: OrderedDict = OrderedDict()
+        self._user_keys: dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple[int, datetime]:
+        """Возвращает запись (ID пользователя, дата создания токена)
+        или None, если токена нет в кэше или срок хранения записи истек."""
+        if self.shared is not None:
+            return self.shared.get(TOKEN_CACHE_KEY_PREFIX + key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, record = entry
+            if expires_at < time.monotonic():
+                self._pop(key)
+                return None
+            self._entries.move_to_end(key)
+        return record
+
+    def set(self, key: str, user_id: int, created: datetime) -> None:
+        """Сохраняет запись (user_id, created) для токена с ключом key."""
+        record: tuple[int, datetime] = (user_id, created)
+        if self.shared is not None:
+            self.shared.set_many(
+                {TOKEN_CACHE_KEY_PREFIX + key: record,
+                 TOKEN_CACHE_USER_KEY_PREFIX + str(user_id): key},
+                timeout=self.timeout)
+            return
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (time.monotonic() + self.timeout, record)
+            self._user_keys[user_id] = key
+            while len(self._entries) > self.max_size:
+                self._pop(next(iter(self._entries)))
+
+    def delete(self, key: str) -> None:
+        """Удаляет запись по ключу токена."""
+        if self.shared is not None:
+            self.shared.delete(TOKEN_CACHE_KEY_PREFIX + key)
+            return
+        with self._lock:
+            self._pop(key)
+
+    def delete_user(self, user_id: int) -> None:
+        """Удаляет запись токена пользователя с ID=user_id."""
+        if self.shared is not None:
+            user_key: str = TOKEN_CACHE_USER_KEY_PREFIX + str(user_id)
+            key: str = self.shared.get(user_key)
+            if key is not None:
+                self.shared.delete_many((TOKEN_CACHE_KEY_PREFIX + key,
+                                         user_key))
+            return
+        with self._lock:
+            key: str = self._user_keys.get(user_id)
+            if key is not None:
+                self._pop(key)
+
+    def clear(self) -> None:
+        """Очищает локальный кэш процесса."""
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+
+    def _pop(self, key: str) -> None:
+        """Вспомогательная функция: удаляет запись локального кэша
+        и обратную ссылку на нее. Вызывается под блокировкой."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_id: int = entry[1][0]
+        if self._user_keys.get(user_id) == key:
+            del self._user_keys[user_id]
+
+
+_token_cache: TokenCache = None
+_token_cache_lock = threading.Lock()
+
+
+def get_token_cache() -> TokenCache:
+    """Возвращает кэш токенов процесса, создавая его при первом обращении
+    согласно настройке "TOKEN_AUTHENTICATION_CACHE"."""
+    global _token_cache
+    if _token_cache is None:
+        with _token_cache_lock:
+            if _token_cache is None:
+                options: dict = {
+                    **TOKEN_CACHE_DEFAULTS,
+                    **getattr(settings, 'TOKEN_AUTHENTICATION_CACHE', {})}
+                _token_cache = TokenCache(
+                    cache_alias=options['CACHE_ALIAS'],
+                    max_size=options['MAX_SIZE'],
+                    timeout=options['TIMEOUT'])
+    return _token_cache
+
+
+def invalidate_token(key: str) -> None:
+    """Удаляет из кэша запись токена с ключом key."""
+    get_token_cache().delete(key)
+
+
+def invalidate_user_tokens(user_id: int) -> None:
+    """Удаляет из кэша записи токенов пользователя с ID=user_id."""
+    get_token_cache().delete_user(user_id)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Переопределяет TokenAuthentication библиотеки DRF:
+        - ID пользователя токена берется из кэша "TokenCache";
+        - пользователь загружается из БД по первичному ключу при каждом
+          запросе, поэтому изменения и деактивация пользователя действуют
+          сразу во всех процессах;
+        - запрос к таблице токенов (Token JOIN User) выполняется только
+          при промахе кэша.
+    Кэш инвалидируется сигналами из "api/signals.py" при удалении токена
+    (выход из системы), а также при сохранении пользователя (смена пароля,
+    деактивация)."""
+
+    def authenticate_credentials(self, key):
+        token_cache: TokenCache = get_token_cache()
+        record: tuple[int, datetime] = token_cache.get(key)
+        if record is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key=key, user_id=user.pk, created=token.created)
+            return user, token
+        user_id, created = record
+        user = get_user_model().objects.filter(pk=user_id).first()
+        if user is None or not user.is_active:
+            raise AuthenticationFailed(
+                gettext_lazy('User inactive or deleted.'))
+        return user, self.get_model()(key=key, user=user, created=created)
@@ -0,0 +1,37 @@
+"""
+Создает бэкенды аутентификации для API проекта "Foodgram".
+
+Классы-бэкенды:
+    - EmailBackend (унаследован от ModelBackend).
+"""
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+
+USER_EMAIL_INDEX_NAME: str = 'auth_user_email_idx'
+
+
+class EmailBackend(ModelBackend):
+    """Аутентифицирует пользователя по электронной почте и паролю.
+    Пользователь и его токен ("auth_token") загружаются одним запросом
+    к БД по индексу "USER_EMAIL_INDEX_NAME", поэтому токен доступен
+    без повторного обращения к БД. Модель "User" не требует уникальности
+    почты, поэтому если почта указана у нескольких пользователей, вход
+    по ней отклоняется, а не выполняется от имени одного из них.
+    Аутентификация по имени пользователя (админ-зона) остается
+    за "ModelBackend"."""
+
+    def authenticate(self, request, email=None, password=None):
+        if email is None or password is None:
+            return None
+        users: list[User] = list(User.objects.select_related(
+            'auth_token').filter(email=email)[:2])
+        if len(users) != 1:
+            """Хеширование пароля выполняется и для несуществующей
+            или неоднозначной почты, чтобы время ответа не выдавало наличие
+            пользователей."""
+            User().set_password(password)
+            return None
+        user: User = users[0]
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
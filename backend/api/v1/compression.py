@@ -0,0 +1,234 @@
+"""
+Создает сжатие ответов API проекта "Foodgram".
+
+Ответы сжимаются gzip, если клиент принимает gzip ("Accept-Encoding"),
+тип содержимого - из "CONTENT_TYPES" (JSON и CSV) и размер тела не меньше
+"MIN_SIZE" байт. Потоковые ответы и ответы с "Content-Encoding"
+(например, уже сжатые файлы) не сжимаются, картинки и другие медиа
+не сжимаются, так как их тип не входит в "CONTENT_TYPES".
+
+Настройка "RESPONSE_COMPRESSION" задает параметры по умолчанию и параметры
+эндпоинтов ("ENDPOINTS": префикс пути - параметры, действует самый длинный
+подходящий префикс):
+    - LEVEL: int - уровень сжатия gzip (1-9);
+    - MIN_SIZE: int - минимальный размер тела для сжатия;
+    - CACHE: bool - сохранять сжатые тела ответов в кэше процесса;
+    - CACHE_QUERY_PARAMS: tuple[str] - параметры запроса, с которыми ответ
+      сохраняется в кэше (например, только "page" для нефильтрованных
+      страниц рецептов).
+
+Кэш сжатых тел ("CompressionCache") адресуется хешем несжатого тела
+и уровнем сжатия: одинаковые ответы (например, "/tags/", "/ingredients/"
+и страницы рецептов для анонимных пользователей) сжимаются один раз,
+а устаревшая запись не может быть выдана, так как измененный ответ имеет
+другой хеш. Сжатие выполняется с нулевым временем изменения (mtime=0),
+поэтому результат детерминирован.
+
+Классы:
+    - CompressionCache;
+    - ResponseCompressionMiddleware.
+
+Функции:
+    - accepts_gzip;
+    - compress;
+    - get_compression_cache;
+    - get_compression_options.
+"""
+import gzip
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+
+COMPRESSION_DEFAULTS: dict = {
+    'CACHE': False,
+    'CACHE_MAX_SIZE': 256,
+    'CACHE_QUERY_PARAMS': (),
+    'CONTENT_TYPES': ('application/json', 'text/csv'),
+    'ENDPOINTS': {},
+    'LEVEL': 6,
+    'MIN_SIZE': 1024}
+
+QVALUE_PATTERN = re.compile(r'^(0(\.[0-9]{0,3})?|1(\.0{0,3})?)$')
+
+
+def accepts_gzip(request: HttpRequest) -> bool:
+    """Проверяет, что клиент принимает gzip: заголовок "Accept-Encoding"
+    запроса содержит "gzip" (или "*", если "gzip" не указан) с весом
+    q больше нуля. Кодировка с некорректным весом считается отклоненной."""
+    weights: dict[str, float] = {}
+    for coding in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, *params = [part.strip().lower() for part in coding.split(';')]
+        weight: float = 1.0
+        for param in params:
+            key, _, value = (part.strip() for part in param.partition('='))
+            if key == 'q':
+                weight = (
+                    float(value) if QVALUE_PATTERN.match(value) else 0.0)
+        weights[name] = weight
+    for name in ('gzip', 'x-gzip', '*'):
+        if name in weights:
+            return weights[name] > 0
+    return False
+
+
+def compress(content: bytes, level: int) -> bytes:
+    """Возвращает тело content, сжатое gzip с уровнем level."""
+    return gzip.compress(content, compresslevel=level, mtime=0)
+
+
+class CompressionCache():
+    """
+    Хранит сжатые тела ответов в памяти процесса по ключу (уровень сжатия,
+    хеш BLAKE2b несжатого тела). Размер ограничен "max_size" записями
+    (вытесняются давно не использованные).
+
+    Атрибуты:
+        - hits: int
+            - число выдач сжатого тела из кэша
+        - misses: int
+            - число сжатий при промахе кэша
+    """
+
+    def __init__(
+            self,
+            max_size: int = COMPRESSION_DEFAULTS['CACHE_MAX_SIZE']):
+        self.max_size: int = max_size
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compress(self, content: bytes, level: int) -> bytes:
+        """Возвращает тело content, сжатое с уровнем level, из кэша или
+        сжимает его и сохраняет в кэше."""
+        key: tuple[int, bytes] = (
+            level, hashlib.blake2b(content, digest_size=16).digest())
+        with self._lock:
+            compressed: bytes = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compressed
+        compressed = compress(content=content, level=level)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = compressed
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return compressed
+
+    def clear(self) -> None:
+        """Очищает кэш и счетчики."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_compression_cache: CompressionCache = None
+_compression_cache_lock = threading.Lock()
+
+
+def get_compression_options() -> dict:
+    """Возвращает параметры сжатия по умолчанию с учетом настройки
+    "RESPONSE_COMPRESSION"."""
+    return {
+        **COMPRESSION_DEFAULTS,
+        **getattr(settings, 'RESPONSE_COMPRESSION', {})}
+
+
+def get_compression_cache() -> CompressionCache:
+    """Возвращает кэш сжатых тел процесса, создавая его при первом
+    обращении согласно настройке "RESPONSE_COMPRESSION"."""
+    global _compression_cache
+    if _compression_cache is None:
+        with _compression_cache_lock:
+            if _compression_cache is None:
+                _compression_cache = CompressionCache(
+                    max_size=get_compression_options()['CACHE_MAX_SIZE'])
+    return _compression_cache
+
+
+class ResponseCompressionMiddleware():
+    """Сжимает ответы gzip с параметрами эндпоинта из настройки
+    "RESPONSE_COMPRESSION". Должен располагаться в "MIDDLEWARE" выше
+    middleware, которые читают или изменяют тело ответа."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        options: dict = get_compression_options()
+        self.content_types: tuple[str] = tuple(options['CONTENT_TYPES'])
+        self.defaults: dict = {
+            name: options[name]
+            for name in ('CACHE', 'CACHE_QUERY_PARAMS', 'LEVEL', 'MIN_SIZE')}
+        """Префиксы эндпоинтов от длинных к коротким."""
+        self.endpoints: list[tuple[str, dict]] = sorted(
+            ((prefix, {**self.defaults, **endpoint})
+             for prefix, endpoint in options['ENDPOINTS'].items()),
+            key=lambda item: len(item[0]),
+            reverse=True)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        return self.process_response(
+            request=request, response=self.get_response(request))
+
+    def get_endpoint_options(self, path: str) -> dict:
+        """Возвращает параметры сжатия эндпоинта по пути запроса."""
+        for prefix, endpoint in self.endpoints:
+            if path.startswith(prefix):
+                return endpoint
+        return self.defaults
+
+    def process_response(
+            self,
+            request: HttpRequest,
+            response: HttpResponse) -> HttpResponse:
+        """Сжимает тело ответа, если это допускают его тип, размер
+        и заголовок "Accept-Encoding" запроса."""
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        content_type: str = response.get('Content-Type', '').split(';')[0]
+        if content_type.strip().lower() not in self.content_types:
+            return response
+        endpoint: dict = self.get_endpoint_options(path=request.path_info)
+        content: bytes = response.content
+        if len(content) < endpoint['MIN_SIZE']:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if not accepts_gzip(request=request):
+            return response
+        if self._is_cacheable(
+                request=request, response=response, endpoint=endpoint):
+            compressed: bytes = get_compression_cache().compress(
+                content=content, level=endpoint['LEVEL'])
+        else:
+            compressed: bytes = compress(
+                content=content, level=endpoint['LEVEL'])
+        if len(compressed) >= len(content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        etag: str = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = 'gzip'
+        return response
+
+    def _is_cacheable(
+            self,
+            request: HttpRequest,
+            response: HttpResponse,
+            endpoint: dict) -> bool:
+        """Вспомогательная функция: проверяет, что сжатое тело ответа
+        на GET-запрос эндпоинта с "CACHE" и без параметров запроса кроме
+        "CACHE_QUERY_PARAMS" сохраняется в кэше."""
+        if not endpoint['CACHE'] or request.method != 'GET':
+            return False
+        if response.status_code != 200:
+            return False
+        return set(request.GET).issubset(endpoint['CACHE_QUERY_PARAMS'])
@@ -8,12 +8,17 @@
 
 from django_filters.rest_framework import (
     FilterSet,
-    BooleanFilter, CharFilter, ModelMultipleChoiceFilter)
+    BooleanFilter, CharFilter, ChoiceFilter, ModelMultipleChoiceFilter,
+    NumberFilter)
 from rest_framework.exceptions import MethodNotAllowed
 from rest_framework.filters import BaseFilterBackend
 
 from foodgram_app.models import (
-    Recipes, RecipesFavorites, ShoppingCarts, Tags, User)
+    Recipes, RecipesFavorites, RecipesTags, ShoppingCarts, Tags, User)
+from foodgram_app.search import search_recipes
+
+RECIPES_ORDERING_CHOICES: tuple[tuple[str, str]] = (
+    ('cooking_time', 'Время приготовления'),)
 
 
 class IngredientsFilter(BaseFilterBackend):
@@ -35,28 +40,52 @@ class RecipesFilter(FilterSet):
     """Создает фильтр для "RecipesViewSet".
     Позволяет осуществлять фильтрацию по полям:
         - author;
+        - cooking_time__gte, cooking_time__lte: отображает только те
+                                                рецепты, время приготовления
+                                                которых не меньше / не больше
+                                                указанного (в минутах);
         - is_favorite: отображает только те рецепты, которые у пользователя
                        добавлены в избранное (есть объект в RecipesFavorites);
         - is_in_shopping_cart: отображает только те рецепты, которые у
                                пользователя добавлены в корзину (есть объект
                                в ShoppingCarts);
+        - search: полнотекстовый поиск по названию и описанию рецепта,
+                  результаты сортируются по релевантности
+                  (см. "foodgram_app/search.py");
         - tags:
             - отображает только те рецепты, для которых определен(ы)
               выбранный(е) тег(и) (через slug);
             - отображает все рецепты, если фильтр не был указан.
+    Позволяет сортировать рецепты по возрастанию времени приготовления
+    ("ordering=cooking_time"), при равном времени - по убыванию ID.
+    Фильтры по диапазону времени и автору вместе с сортировкой используют
+    составные индексы модели "Recipes", фильтр по тегам выполняется
+    подзапросом без соединения таблиц и DISTINCT.
     """
 
     author = CharFilter(field_name='author__id')
+    cooking_time__gte = NumberFilter(
+        field_name='cooking_time', lookup_expr='gte')
+    cooking_time__lte = NumberFilter(
+        field_name='cooking_time', lookup_expr='lte')
     is_favorited = BooleanFilter(method='filter_is_favorited')
     is_in_shopping_cart = BooleanFilter(method='filter_is_in_shopping_cart')
+    search = CharFilter(method='filter_search')
     tags = ModelMultipleChoiceFilter(
         field_name='tags__slug',
         to_field_name='slug',
-        queryset=Tags.objects.all())
+        queryset=Tags.objects.all(),
+        method='filter_tags')
+    ordering = ChoiceFilter(
+        choices=RECIPES_ORDERING_CHOICES,
+        method='filter_ordering')
 
     class Meta:
         model = Recipes
-        fields = ('author', 'is_favorited', 'is_in_shopping_cart', 'tags')
+        fields = (
+            'author', 'cooking_time__gte', 'cooking_time__lte',
+            'is_favorited', 'is_in_shopping_cart', 'search', 'tags',
+            'ordering')
 
     def _filter_recipes(self, queryset, value, model):
         """Вспомогательная функция. Фильтрует объекты модели "Recipes" согласно
@@ -69,7 +98,7 @@ class RecipesFilter(FilterSet):
             raise MethodNotAllowed
         recipe_ids: list = model.objects.filter(
             user=user).values_list('recipe_id', flat=True)
-        return Recipes.objects.filter(id__in=recipe_ids)
+        return queryset.filter(id__in=recipe_ids)
 
     def filter_is_favorited(self, queryset, name, value):
         """Переопределяет queryset: фильтрует только те рецепты, которые
@@ -92,3 +121,24 @@ class RecipesFilter(FilterSet):
             queryset=queryset,
             value=value,
             model=ShoppingCarts)
+
+    def filter_search(self, queryset, name, value):
+        """Переопределяет queryset: оставляет только рецепты, найденные
+        по поисковому запросу value, в порядке убывания релевантности."""
+        return search_recipes(queryset=queryset, query=value)
+
+    def filter_tags(self, queryset, name, value):
+        """Переопределяет queryset: оставляет только рецепты, для которых
+        определен хотя бы один из тегов value. Использует подзапрос
+        к "RecipesTags" вместо соединения, поэтому не требует DISTINCT
+        и сохраняет порядок по индексам модели "Recipes"."""
+        if not value:
+            return queryset
+        return queryset.filter(id__in=RecipesTags.objects.filter(
+            tag__in=value).values('recipe_id'))
+
+    def filter_ordering(self, queryset, name, value):
+        """Переопределяет queryset: сортирует рецепты по полю value
+        (см. "RECIPES_ORDERING_CHOICES"), при равном значении - по убыванию
+        ID, что совпадает с порядком составных индексов модели "Recipes"."""
+        return queryset.order_by(value, '-id')
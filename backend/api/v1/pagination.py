@@ -0,0 +1,16 @@
+"""
+Создает классы пагинации для API проекта "Foodgram".
+
+Классы-пагинаторы:
+    - RecommendationsPagination.
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class RecommendationsPagination(CursorPagination):
+    """Пагинация рекомендаций рецептов ("RecipeRecommendations") по курсору
+    места в выдаче: страница читается по индексу (user, rank) без OFFSET
+    и COUNT, поэтому время ответа не зависит от номера страницы."""
+
+    ordering = 'rank'
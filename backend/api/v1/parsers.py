@@ -0,0 +1,45 @@
+"""
+Создает парсеры для API проекта "Foodgram".
+
+Классы-парсеры:
+    - FastJSONParser (унаследован от JSONParser).
+"""
+from io import BytesIO
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from api.v1.renderers import FastJSONRenderer, orjson
+
+"""Кодировки тела запроса, которые orjson разбирает без перекодирования."""
+ORJSON_ENCODINGS: tuple[str] = ('utf-8', 'utf8')
+
+
+class FastJSONParser(JSONParser):
+    """
+    Парсер JSON на библиотеке orjson.
+
+    Разбор выполняет JSONParser DRF, если:
+        - orjson не установлен;
+        - тело запроса не в кодировке UTF-8;
+        - в настройках DRF отключен "STRICT_JSON" (orjson не принимает
+          NaN и Infinity);
+        - orjson не может разобрать тело запроса: ошибки разбора
+          совпадают с ошибками JSONParser.
+    В отличие от JSONParser целые числа больше 64 бит разбираются
+    как float.
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding: str = (parser_context or {}).get(
+            'encoding', settings.DEFAULT_CHARSET)
+        if any((orjson is None, not self.strict,
+                encoding.lower() not in ORJSON_ENCODINGS)):
+            return super().parse(stream, media_type, parser_context)
+        body: bytes = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(BytesIO(body), media_type, parser_context)
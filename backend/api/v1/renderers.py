@@ -0,0 +1,55 @@
+"""
+Создает рендереры для API проекта "Foodgram".
+
+Классы-рендереры:
+    - FastJSONRenderer (унаследован от JSONRenderer).
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+"""Параметры orjson: даты и время передаются в "default" (форматируются
+как в JSONEncoder DRF), ключи словарей могут быть не строками."""
+ORJSON_OPTIONS: int = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    if orjson is not None else 0)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Рендерер JSON на библиотеке orjson. Выдает те же байты, что
+    и JSONRenderer DRF (компактные разделители, UTF-8, экранирование
+    символов U+2028 и U+2029, Decimal - как float, даты и время - через
+    JSONEncoder DRF).
+
+    Рендеринг выполняет JSONRenderer DRF, если:
+        - orjson не установлен;
+        - запрошены отступы (например, для BrowsableAPIRenderer);
+        - в настройках DRF отключены "UNICODE_JSON" или "COMPACT_JSON";
+        - orjson не может сериализовать данные (например, целое число
+          больше 64 бит).
+    В отличие от JSONRenderer значения NaN и Infinity выдаются как null.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        indent: int = self.get_indent(
+            accepted_media_type, renderer_context or {})
+        if any((orjson is None, self.ensure_ascii, not self.compact,
+                indent is not None)):
+            return super().render(
+                data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        try:
+            ret: bytes = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(
+                data, accepted_media_type, renderer_context)
+        return ret.replace(
+            b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
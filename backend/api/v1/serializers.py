@@ -2,9 +2,18 @@
 Создает сериализаторы моделей проекта "Foodgram".
 
 Классы-сериализаторы:
-    - CustomUserSerializer (унаследован от UserSerializer)
+    - CustomUserSerializer (унаследован от UserSerializer);
+    - RecipesReadSerializer (выдача рецептов без полей DRF).
 
 Создает ограничения для вводимых полей модели:
+    - RECIPES_IMAGE_MAX_BYTES - максимальный размер картинки рецепта;
+    - RECIPES_IMAGE_MAX_PIXELS - максимальное число пикселей картинки рецепта;
+    - RECIPES_BULK_MAX_LEN - максимальное число ID рецептов в одном
+      запросе массового добавления в избранное/корзину;
+    - RECIPES_BY_INGREDIENTS_MAX_LEN - максимальное число ID ингредиентов
+      в запросе поиска рецептов по ингредиентам;
+    - RECIPES_BY_INGREDIENTS_MIN_COVERAGE - минимальное покрытие рецепта
+      ингредиентами по умолчанию;
     - USER_EMAIL_MAX_LEN - максимальная длина поля "email";
     - USER_FIRST_NAME_MAX_LEN - максимальная длина поля "first_name";
     - USER_PASSWORD_MAX_LEN - максимальная длина поля "password";
@@ -14,25 +23,46 @@
     - USERNAME_PATTERN - паттерн допустимых символов поля "username".
 """
 import base64
+import binascii
 import inspect
+from tempfile import SpooledTemporaryFile
+
 from django.db import transaction
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
-from django.core.files.base import ContentFile
-from django.shortcuts import get_object_or_404
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.base import File
 from djoser.serializers import UserSerializer
+from PIL import Image
 from re import sub, search
 from rest_framework import status
 from rest_framework.exceptions import APIException
-from rest_framework.response import Response
 from rest_framework.serializers import (
-    Serializer, ModelSerializer,
-    BooleanField, CharField, EmailField, ImageField, IntegerField, ListField,
-    PrimaryKeyRelatedField, SerializerMethodField,
+    BaseSerializer, ListSerializer, Serializer, ModelSerializer,
+    BooleanField, CharField, EmailField, FloatField, ImageField, IntegerField,
+    ListField, PrimaryKeyRelatedField, SerializerMethodField, SlugField,
     ValidationError)
+
+from foodgram_app.catalog import Catalog, get_catalog_cache
+from foodgram_app.images import (
+    RECIPES_IMAGE_PLACEHOLDER, get_image_variant_url)
 from foodgram_app.models import (
-    Ingredients, Recipes, RecipesFavorites, RecipesIngredients, RecipesTags,
-    ShoppingCarts, Subscriptions, Tags)
+    INGREDIENTS_NAME_MAX_LENGTH, INGREDIENTS_UNIT_MAX_LENGTH,
+    RECIPES_IMAGE_STATUS_PENDING, RECIPES_IMAGE_STATUS_READY,
+    RECIPES_NAME_MAX_LEN, TAGS_SLUG_MAX_LEN,
+    Ingredients, Recipes, RecipesFavorites, RecipesIngredients,
+    RecipesIngredientsLog, RecipesTags, ShoppingCarts, Subscriptions, Tags)
+from foodgram_app.tasks import discard_media_files, schedule_recipe_image
+from foodgram_app.validation import (
+    VALIDATION_MODE_CONSTRAINTS, validation_mode)
+
+BASE64_DECODE_CHUNK_SIZE: int = 64 * 1024
+BASE64_SPOOL_MAX_SIZE: int = 1024 * 1024
+RECIPES_BULK_MAX_LEN: int = 100
+RECIPES_BY_INGREDIENTS_MAX_LEN: int = 100
+RECIPES_BY_INGREDIENTS_MIN_COVERAGE: float = 0.5
+RECIPES_IMAGE_MAX_BYTES: int = 15 * 1024 * 1024
+RECIPES_IMAGE_MAX_PIXELS: int = 40_000_000
 
 USER_EMAIL_MAX_LEN: int = 254
 USER_FIRST_NAME_MAX_LEN: int = 150
@@ -44,6 +74,12 @@ USER_FORBIDDEN_USERNAMES: list[str] = ['me']
 
 USERNAME_PATTERN: str = r'^[\w.@+-]+$'
 
+"""Поля выборки QuerySet.values() рецептов для "RecipesReadSerializer"."""
+RECIPES_READ_VALUES: tuple[str] = (
+    'id', 'name', 'text', 'cooking_time', 'image', 'image_status',
+    'image_variants', 'author_id', 'author__email', 'author__username',
+    'author__first_name', 'author__last_name')
+
 
 class APICustomException(APIException):
     """Возвращает ошибку 500 с указанием того, что ошибка на сервере.
@@ -60,7 +96,20 @@ class APICustomException(APIException):
 
 
 class Base64ImageField(ImageField):
-    """Сериализатор изображений в формате base64."""
+    """Сериализатор изображений в формате base64.
+    Base64 декодируется частями во временный файл (в памяти хранится не более
+    "BASE64_SPOOL_MAX_SIZE" байт), ограничения "RECIPES_IMAGE_MAX_BYTES"
+    и "RECIPES_IMAGE_MAX_PIXELS" проверяются до полного декодирования.
+    При валидации проверяется только заголовок изображения: полная проверка
+    Pillow выполняется в фоне после сохранения рецепта
+    (см. "foodgram_app/tasks.py")."""
+
+    default_error_messages = {
+        'image_too_large': (
+            'Размер картинки не должен превышать {max_bytes} байт.'),
+        'image_too_many_pixels': (
+            'Картинка не должна содержать более {max_pixels} пикселей.')}
+
     def to_internal_value(self, data):
         """Декодирует данные, если было прислано изображение в формате
         base64.
@@ -68,12 +117,116 @@ class Base64ImageField(ImageField):
             - "data:[<MIME-type>][;base64],<data>";
             - "data:image/png;base64,iVBORw0KGg..."."""
         if isinstance(data, str) and data.startswith('data:image'):
-            data_format, base64_image = data.split(';base64,')
-            image_extension: str = data_format.split('/')[-1]
-            data: ContentFile = ContentFile(
-                base64.b64decode(base64_image),
-                name='image.' + image_extension)
-        return super().to_internal_value(data)
+            data: File = self._decode_base64(data=data)
+        file = super(ImageField, self).to_internal_value(data)
+        if file.size > RECIPES_IMAGE_MAX_BYTES:
+            self.fail('image_too_large', max_bytes=RECIPES_IMAGE_MAX_BYTES)
+        if not self._check_image_header(file=file):
+            self.fail('invalid_image')
+        return file
+
+    def _check_image_header(self, file) -> bool:
+        """Вспомогательная функция: читает заголовок изображения и проверяет
+        число пикселей. Возвращает False, если заголовок прочитать не удалось
+        (в том числе если он еще не декодирован полностью)."""
+        position: int = file.tell()
+        file.seek(0)
+        try:
+            width, height = Image.open(file).size
+        except Exception:
+            return False
+        finally:
+            file.seek(position)
+        if width * height > RECIPES_IMAGE_MAX_PIXELS:
+            self.fail(
+                'image_too_many_pixels', max_pixels=RECIPES_IMAGE_MAX_PIXELS)
+        return True
+
+    def _decode_base64(self, data: str) -> File:
+        """Вспомогательная функция: декодирует base64 частями
+        по "BASE64_DECODE_CHUNK_SIZE" символов во временный файл.
+        Размер проверяется по длине строки до декодирования, число пикселей -
+        по заголовку, как только он декодирован."""
+        separator: str = ';base64,'
+        separator_index: int = data.find(separator)
+        if separator_index == -1:
+            self.fail('invalid_image')
+        image_extension: str = data[:separator_index].split('/')[-1]
+        start: int = separator_index + len(separator)
+        if (len(data) - start) // 4 * 3 > RECIPES_IMAGE_MAX_BYTES:
+            self.fail('image_too_large', max_bytes=RECIPES_IMAGE_MAX_BYTES)
+        spooled_file = SpooledTemporaryFile(max_size=BASE64_SPOOL_MAX_SIZE)
+        header_checked: bool = False
+        try:
+            for offset in range(start, len(data), BASE64_DECODE_CHUNK_SIZE):
+                try:
+                    spooled_file.write(base64.b64decode(
+                        data[offset:offset + BASE64_DECODE_CHUNK_SIZE],
+                        validate=True))
+                except binascii.Error:
+                    self.fail('invalid_image')
+                if not header_checked:
+                    header_checked = self._check_image_header(
+                        file=spooled_file)
+        except BaseException:
+            spooled_file.close()
+            raise
+        spooled_file.seek(0)
+        return File(spooled_file, name='image.' + image_extension)
+
+
+class PrimaryKeyIdField(PrimaryKeyRelatedField):
+    """Поле первичного ключа без запроса к БД: проверяет только формат
+    значения и возвращает ID. Существование объектов проверяется одним
+    запросом для всего списка (см. "RecipesSerializer.validate")."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
+class RecipesImageVariantMixin():
+    """Подменяет в выдаче сериализатора модели "Recipes" URL оригинала
+    картинки в поле "image" на URL ее уменьшенного варианта
+    (см. "foodgram_app/images.py"). Если варианты еще не созданы,
+    остается URL оригинала. Пока картинка обрабатывается в фоне или если
+    ее обработка завершилась ошибкой, выдается URL заглушки."""
+
+    image_variant: str = 'card'
+
+    def get_image_variant(self) -> str:
+        """Возвращает название варианта картинки для выдачи."""
+        return self.image_variant
+
+    def get_image_url(self, image_status: str, image_variants: dict) -> str:
+        """Возвращает URL заглушки или варианта картинки для выдачи
+        (абсолютный, если в контексте есть запрос) или None, если нужно
+        выдать оригинал."""
+        if image_status != RECIPES_IMAGE_STATUS_READY:
+            url: str = staticfiles_storage.url(RECIPES_IMAGE_PLACEHOLDER)
+        else:
+            url: str = get_image_variant_url(
+                variants=image_variants,
+                variant=self.get_image_variant())
+        if url is None:
+            return None
+        request = self.context.get('request', None)
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        return url
+
+    def to_representation(self, instance):
+        representation = super().to_representation(instance)
+        url: str = self.get_image_url(
+            image_status=instance.image_status,
+            image_variants=instance.image_variants)
+        if url is not None:
+            representation['image'] = url
+        return representation
 
 
 class CustomUserSerializer(UserSerializer):
@@ -169,7 +322,8 @@ class CustomUserLoginSerializer(Serializer):
         """Проверяет корректность указанных полей:
             - email;
             - password.
-        Возвращает объект пользователя в случае успешной аутентификации."""
+        Возвращает объект пользователя в случае успешной аутентификации.
+        Пользователь загружается вместе с токеном бэкендом "EmailBackend"."""
         request = self.context.get('request', None)
         if not request:
             raise APICustomException()
@@ -177,13 +331,9 @@ class CustomUserLoginSerializer(Serializer):
         password: str = data.get('password', None)
         if email is None or password is None:
             raise ValidationError('Не указана электронная почта или пароль!')
-        if not User.objects.filter(email=email).exists():
-            raise ValidationError(
-                'Указана неверная электронная почта или пароль!')
-        username: str = User.objects.get(email=email).username
         user = authenticate(
             request=request,
-            username=username,
+            email=email,
             password=password)
         if not user:
             raise ValidationError(
@@ -192,7 +342,7 @@ class CustomUserLoginSerializer(Serializer):
         return data
 
 
-class RecipesShortSerializer(ModelSerializer):
+class RecipesShortSerializer(RecipesImageVariantMixin, ModelSerializer):
     """Создает сериализатор для модели "Recipes".
     Содержит в себе краткий перечень полей, необходимый для эндпоинта
     подписок на авторов "/users/subscriptions/".
@@ -307,7 +457,7 @@ class RecipesIngredientsCreateSerializer(ModelSerializer):
         - "POST";
         - "PUT"."""
 
-    id = PrimaryKeyRelatedField(queryset=Ingredients.objects.all())
+    id = PrimaryKeyIdField(queryset=Ingredients.objects.all())
     measurement_unit = SerializerMethodField(read_only=True)
     name = SerializerMethodField(read_only=True)
 
@@ -328,17 +478,24 @@ class RecipesIngredientsCreateSerializer(ModelSerializer):
             'amount')
 
 
-class RecipesSerializer(ModelSerializer):
-    """Создает сериализатор для модели "Recipes"."""
+class RecipesSerializer(RecipesImageVariantMixin, ModelSerializer):
+    """Создает сериализатор для модели "Recipes".
+    В поле "image" выдает вариант картинки "card" для списка рецептов
+    и "detail" для остальных запросов."""
 
     author = CustomUserSerializer(read_only=True)
     is_favorited = SerializerMethodField()
     is_in_shopping_cart = SerializerMethodField()
     image = Base64ImageField()
 
-    @transaction.atomic
+    @validation_mode(VALIDATION_MODE_CONSTRAINTS)
     def create(self, validated_data):
-        """Переопределяет метод сохранения данных (POST)."""
+        """Переопределяет метод сохранения данных (POST).
+        Данные уже проверены сериализатором, поэтому модели сохраняются
+        в режиме валидации "constraints" (см. "foodgram_app/validation.py").
+        Картинка сохраняется в хранилище до начала транзакции
+        (см. "_save_image"), в транзакцию передается только имя файла.
+        """
         request = self.context.get('request', None)
         if not request:
             raise APICustomException()
@@ -346,11 +503,22 @@ class RecipesSerializer(ModelSerializer):
         """Не нужно проверять наличие полей в validated_data и context
         так как это уже проверяется в методе validate."""
         ingredients_data: list[dict] = validated_data.pop('recipe_ingredient')
-        current_recipe: Recipes = Recipes.objects.create(
-            author=user, **validated_data)
-        self._set_ingredients(
-            ingredients_data=ingredients_data, recipe=current_recipe)
-        self._set_tags(context=self.context, recipe=current_recipe)
+        tags_data: list[int] = validated_data.pop('tags')
+        image_name: str = self._save_image(image=validated_data.pop('image'))
+        try:
+            with transaction.atomic():
+                current_recipe: Recipes = Recipes.objects.create(
+                    author=user,
+                    image=image_name,
+                    image_status=RECIPES_IMAGE_STATUS_PENDING,
+                    **validated_data)
+                self._set_ingredients(
+                    ingredients_data=ingredients_data, recipe=current_recipe)
+                self._set_tags(recipe=current_recipe, tags_data=tags_data)
+                schedule_recipe_image(recipe=current_recipe)
+        except Exception:
+            discard_media_files(names=[image_name])
+            raise
         return current_recipe
 
     def get_fields(self):
@@ -365,11 +533,31 @@ class RecipesSerializer(ModelSerializer):
                 many=True,
                 source='recipe_ingredient')
         else:
-            fields['ingredients'] = RecipesIngredientsSerializer(
-                many=True,
-                source='recipe_ingredient')
+            fields['ingredients'] = SerializerMethodField()
+            fields['tags'] = SerializerMethodField()
         return fields
 
+    def get_image_variant(self) -> str:
+        """Возвращает вариант картинки "card" для списка рецептов
+        и "detail" для остальных запросов."""
+        view = self.context.get('view', None)
+        if view is not None and getattr(view, 'action', None) == 'list':
+            return 'card'
+        return 'detail'
+
+    def get_ingredients(self, obj):
+        """Возвращает ингредиенты рецепта в поле "ingredients". Из БД
+        читаются только связи "RecipesIngredients" (ID ингредиента
+        и количество), названия и единицы измерения берутся из справочника
+        процесса (см. "foodgram_app/catalog.py")."""
+        amounts: list[tuple[int, float]] = [
+            (recipe_ingredient.ingredient_id, recipe_ingredient.amount)
+            for recipe_ingredient in obj.recipe_ingredient.all()]
+        return get_catalog_cache().resolve(
+            tag_ids=(),
+            ingredient_ids=[ingredient_id for ingredient_id, _ in amounts]
+        ).get_ingredients(amounts=amounts)
+
     def get_is_favorited(self, obj):
         """Показывает наличие рецепта в избранном пользователя в поле
         'is_subscribed'. Возвращает True, если рецепт в избранном,
@@ -382,10 +570,21 @@ class RecipesSerializer(ModelSerializer):
         False - если нет, или пользователь не авторизован.."""
         return self._get_is_check(obj_queryset=obj.shopping_cart)
 
+    def get_tags(self, obj):
+        """Возвращает теги рецепта в поле "tags". Из БД читаются только
+        связи "RecipesTags" (ID тега), данные тегов берутся из справочника
+        процесса (см. "foodgram_app/catalog.py")."""
+        tag_ids: list[int] = [
+            recipe_tag.tag_id for recipe_tag in obj.recipe_tag.all()]
+        return get_catalog_cache().resolve(
+            tag_ids=tag_ids, ingredient_ids=()).get_tags(tag_ids=tag_ids)
+
     def to_representation(self, instance):
         """Переопределяет сериализацию объекта:
-            - в поле "tags": сериализатор должен принимать на вход список id
-              тегов, а возвращать в ответе полую информацию от объектах;
+            - в полях "tags" и "ingredients": при 'PATCH', 'POST' и 'PUT'
+              HTTP-запросах сериализатор принимает на вход списки id, а
+              в ответе возвращает полную информацию об объектах (как при
+              чтении, см. "get_tags" и "get_ingredients");
             - в поле "id: сериализатор должен исключить из выдачи поле 'id',
               при 'PATCH', 'POST' и 'PUT' HTTP-запросах.
             """
@@ -395,44 +594,33 @@ class RecipesSerializer(ModelSerializer):
             raise APICustomException()
         if request.method in ('PATCH', 'POST', 'PUT'):
             representation.pop('id')
-        tags_data: list = []
-        tags: list[Tags] = instance.tags.all()
-        for tag in tags:
-            tags_data.append({
-                'id': tag.id,
-                'name': tag.name,
-                'color': tag.color,
-                'slug': tag.slug})
-        representation['tags'] = tags_data
-        ingredients_data: list = []
-        recipe_ingredients = instance.recipe_ingredient.all()
-        for recipe_ingredient in recipe_ingredients:
-            ingredient = recipe_ingredient.ingredient
-            ingredients_data.append({
-                'id': ingredient.id,
-                'name': ingredient.name,
-                'measurement_unit': ingredient.measurement_unit,
-                'amount': recipe_ingredient.amount})
-        representation['ingredients'] = ingredients_data
+            representation['tags'] = self.get_tags(obj=instance)
+            representation['ingredients'] = self.get_ingredients(
+                obj=instance)
         return representation
 
-    @transaction.atomic
+    @validation_mode(VALIDATION_MODE_CONSTRAINTS)
     def update(self, instance, validated_data):
-        """Переопределяет метод обновления данных (PATCH)."""
-        instance.cooking_time = validated_data.get(
-            'cooking_time', instance.name)
-        instance.image = validated_data.get('image', instance.image)
-        instance.name = validated_data.get('name', instance.name)
-        instance.text = validated_data.get('text', instance.text)
-        RecipesIngredients.objects.filter(recipe=instance).delete()
-        """Не нужно проверять наличие полей в validated_data и context
-        так как это уде проверяется в методе validate."""
-        ingredients_data: list[dict] = validated_data.pop('recipe_ingredient')
-        self._set_ingredients(
-            ingredients_data=ingredients_data, recipe=instance)
-        RecipesTags.objects.filter(recipe=instance).delete()
-        self._set_tags(context=self.context, recipe=instance)
-        instance.save()
+        """Переопределяет метод обновления данных (PATCH).
+        Модели сохраняются в режиме валидации "constraints".
+        Связи с ингредиентами и тегами обновляются по разнице с текущими
+        (см. "_update_ingredients" и "_update_tags"); если поле не передано
+        в PATCH-запросе, связи не затрагиваются. Новая картинка сохраняется
+        в хранилище до начала транзакции (см. "_save_image")."""
+        image_changed: bool = 'image' in validated_data
+        image_name: str = (
+            self._save_image(image=validated_data['image'])
+            if image_changed else None)
+        try:
+            with transaction.atomic():
+                self._update_instance(
+                    instance=instance,
+                    validated_data=validated_data,
+                    image_name=image_name)
+        except Exception:
+            if image_changed:
+                discard_media_files(names=[image_name])
+            raise
         return instance
 
     def validate(self, data):
@@ -441,9 +629,12 @@ class RecipesSerializer(ModelSerializer):
         id (ListField), невозможно осуществить валидацию при помощи
         сериализатора, требуется ручная проверка входящих данных."""
         ingredients = data.get('recipe_ingredient', None)
-        self._validate_ingredients(ingredients=ingredients)
-        tags: list[int] = self.context['request'].data.get('tags', None)
-        self._validate_tags(tags=tags)
+        if not self.partial or ingredients is not None:
+            self._validate_ingredients(ingredients=ingredients)
+        request_data = self.context['request'].data
+        if not self.partial or 'tags' in request_data:
+            tags: list[int] = request_data.get('tags', None)
+            data['tags'] = self._validate_tags(tags=tags)
         """При PATCH запросе (кнопка "редактировать") фронт получает
         изображение рецепта (instance.image), но при отправке запроса
         изображение не прикрепляется."""
@@ -466,6 +657,49 @@ class RecipesSerializer(ModelSerializer):
             'text',
             'cooking_time')
 
+    def _save_image(self, image) -> str:
+        """Вспомогательная функция для create() и update(): сохраняет
+        картинку рецепта в хранилище поля "Recipes.image" (хеширование
+        и запись файла выполняются вне транзакции) и возвращает имя файла.
+        Если транзакция затем откатывается, файл ставится в очередь
+        на удаление "MediaGarbage"."""
+        field = Recipes._meta.get_field('image')
+        return field.storage.save(
+            field.generate_filename(instance=None, filename=image.name),
+            image,
+            max_length=field.max_length)
+
+    def _update_instance(
+            self,
+            instance: Recipes,
+            validated_data: dict,
+            image_name: str) -> None:
+        """Вспомогательная функция для update(): обновляет поля рецепта,
+        его ингредиенты и теги в транзакции. Если передано имя новой
+        картинки image_name, ставит ее обработку в очередь, а прежнюю
+        картинку - в очередь на удаление."""
+        instance.cooking_time = validated_data.get(
+            'cooking_time', instance.cooking_time)
+        old_image_name: str = instance.image.name
+        if image_name is not None:
+            instance.image = image_name
+            instance.image_status = RECIPES_IMAGE_STATUS_PENDING
+        instance.name = validated_data.get('name', instance.name)
+        instance.text = validated_data.get('text', instance.text)
+        if 'recipe_ingredient' in validated_data:
+            self._update_ingredients(
+                ingredients_data=validated_data['recipe_ingredient'],
+                recipe=instance)
+        if 'tags' in validated_data:
+            self._update_tags(
+                recipe=instance, tags_data=validated_data['tags'])
+        instance.save()
+        if image_name is not None:
+            schedule_recipe_image(recipe=instance)
+            if image_name != old_image_name:
+                discard_media_files(names=[old_image_name])
+        return
+
     def _get_is_check(self, obj_queryset):
         """Вспомогательная функция:
             - проверяет авторизован ли пользователь;
@@ -479,9 +713,10 @@ class RecipesSerializer(ModelSerializer):
             user=user).exists()
 
     def _set_ingredients(self, ingredients_data: list[dict], recipe: Recipes):
-        """Вспомогательная функция для create() и update(): создает объекты
+        """Вспомогательная функция для create(): создает объекты
         в модели "RecipesIngredients" согласно данным, переданным в
-        ingredients_data (перечень "id" и "amount" ингридиентов)."""
+        ingredients_data (перечень "id" и "amount" ингридиентов)
+        и записывает рецепт в журнал "RecipesIngredientsLog"."""
         recipe_ingredients: list = []
         for ingredient in ingredients_data:
             current_amount: float = ingredient['amount']
@@ -490,20 +725,89 @@ class RecipesSerializer(ModelSerializer):
                 ingredient=ingredient['id'],
                 recipe=recipe))
         RecipesIngredients.objects.bulk_create(recipe_ingredients)
+        RecipesIngredientsLog.objects.log(recipe_ids=[recipe.id])
+
+    def _set_tags(self, recipe: Recipes, tags_data: list[Tags]):
+        """Вспомогательная функция для create(): создает объекты
+        в модели "RecipesTags" согласно списку тегов tags_data."""
+        RecipesTags.objects.bulk_create([
+            RecipesTags(recipe=recipe, tag=tag) for tag in tags_data])
+
+    def _update_ingredients(
+            self, ingredients_data: list[dict], recipe: Recipes):
+        """Вспомогательная функция для update(): сравнивает присланные
+        ингредиенты с текущими объектами модели "RecipesIngredients"
+        и выполняет только необходимые запросы: удаление исключенных,
+        обновление изменившихся количеств, создание добавленных.
+        При изменении состава рецепт записывается в журнал
+        "RecipesIngredientsLog" (удаление записывается сигналом)."""
+        current: dict[int, RecipesIngredients] = {
+            recipe_ingredient.ingredient_id: recipe_ingredient
+            for recipe_ingredient in RecipesIngredients.objects.filter(
+                recipe=recipe)}
+        new_amounts: dict[int, float] = {
+            ingredient['id'].id: ingredient['amount']
+            for ingredient in ingredients_data}
+        removed_ids: list[int] = [
+            ingredient_id for ingredient_id in current
+            if ingredient_id not in new_amounts]
+        if removed_ids:
+            RecipesIngredients.objects.filter(
+                recipe=recipe, ingredient_id__in=removed_ids).delete()
+        changed: list[RecipesIngredients] = []
+        added: list[RecipesIngredients] = []
+        for ingredient_id, amount in new_amounts.items():
+            recipe_ingredient = current.get(ingredient_id, None)
+            if recipe_ingredient is None:
+                added.append(RecipesIngredients(
+                    amount=amount, ingredient_id=ingredient_id, recipe=recipe))
+            elif recipe_ingredient.amount != amount:
+                recipe_ingredient.amount = amount
+                changed.append(recipe_ingredient)
+        if changed:
+            RecipesIngredients.objects.bulk_update(changed, fields=('amount',))
+        if added:
+            RecipesIngredients.objects.bulk_create(added)
+            RecipesIngredientsLog.objects.log(recipe_ids=[recipe.id])
+        return
 
-    def _set_tags(self, context: dict, recipe: Recipes):
-        """Вспомогательная функция для create() и update(): создает объекты
-        в модели "RecipesTags" согласно данным, переданным в context
-        (список "id" тегов)."""
-        tags_data = context['request'].data.get('tags')
-        recipe.tags.set(tags_data)
+    def _update_tags(self, recipe: Recipes, tags_data: list[Tags]):
+        """Вспомогательная функция для update(): сравнивает присланные
+        теги с текущими объектами модели "RecipesTags" и удаляет
+        исключенные и создает добавленные связи."""
+        current_ids: set[int] = set(RecipesTags.objects.filter(
+            recipe=recipe).values_list('tag_id', flat=True))
+        new_ids: set[int] = {tag.id for tag in tags_data}
+        if current_ids - new_ids:
+            RecipesTags.objects.filter(
+                recipe=recipe, tag_id__in=current_ids - new_ids).delete()
+        if new_ids - current_ids:
+            RecipesTags.objects.bulk_create([
+                RecipesTags(recipe=recipe, tag_id=tag_id)
+                for tag_id in new_ids - current_ids])
+        return
 
     def _validate_ingredients(self, ingredients: list) -> None:
         """Вспомогательная функция для "validate": производит валидацию
-        ингредиентов из списка присланных."""
+        ингредиентов из списка присланных. Все ингредиенты загружаются одним
+        запросом, ID в ingredients заменяются на объекты "Ingredients"."""
         ingredient_ids = [ingredient['id'] for ingredient in ingredients]
         if len(ingredient_ids) != len(set(ingredient_ids)):
             raise ValidationError('В рецепте продублированы ингредиенты!')
+        found: dict[int, Ingredients] = Ingredients.objects.in_bulk(
+            ingredient_ids)
+        errors: list[dict] = []
+        for ingredient in ingredients:
+            ingredient_id: int = ingredient['id']
+            if ingredient_id in found:
+                ingredient['id'] = found[ingredient_id]
+                errors.append({})
+                continue
+            errors.append({
+                'id': [f'Недопустимый первичный ключ "{ingredient_id}" '
+                       '- объект не существует.']})
+        if any(errors):
+            raise ValidationError({'ingredients': errors})
         return
 
     def _validate_image(self, image: str) -> None:
@@ -514,179 +818,240 @@ class RecipesSerializer(ModelSerializer):
                 "image": ["Файл не был прикреплен."]})
         return
 
-    def _validate_tags(self, tags: list) -> None:
+    def _validate_tags(self, tags: list) -> list[Tags]:
         """Вспомогательная функция для "validate": производит валидацию
-        тегов из списка присланных."""
+        тегов из списка присланных. Все теги загружаются одним запросом.
+        Возвращает список тегов без повторов в порядке присланных ID."""
         if not isinstance(tags, list):
             raise ValidationError({
                 "tags": ["Укажите ID в формате списка."]})
         if len(tags) == 0:
             raise ValidationError({
                 "tags": ["Поле не может быть пустым."]})
+        """Значения bool не считаются ID, поэтому тип проверяется точно."""
+        found: dict[int, Tags] = Tags.objects.in_bulk(
+            [tag_id for tag_id in tags if type(tag_id) is int])
         bad_ids: list = []
         for tag_id in tags:
-            if not isinstance(tag_id, int):
+            if type(tag_id) is not int:
                 bad_ids.append({
                     'id': ['Недопустимый формат ввода! '
                            'Укажите список ID тегов.']})
-            elif not Tags.objects.filter(id=tag_id).exists():
+            elif tag_id not in found:
                 bad_ids.append({
                     'id': [f'Недопустимый первичный ключ "{tag_id}" '
                            '- объект не существует.']})
         if bad_ids:
             raise ValidationError({'tags': bad_ids})
-        return
+        return [found[tag_id] for tag_id in dict.fromkeys(tags)]
 
 
-class RecipesShortSerializer(ModelSerializer):
-    """Создает сериализатор для модели "Recipes" c ограниченным набором полей
-    для отображения в списке покупок."""
+class RecipesReadListSerializer(ListSerializer):
+    """Создает сериализатор списка для "RecipesReadSerializer": данные
+    связей и отметки пользователя загружаются одним запросом на каждую
+    модель для всех рецептов списка."""
 
-    class Meta:
-        model = Recipes
-        fields = (
-            'id',
-            'name',
-            'image',
-            'cooking_time')
+    def to_representation(self, data):
+        return self.child.represent(rows=list(data))
 
 
-class RecipesFavoritesSerializer(ModelSerializer):
-    """Создает сериализатор для модели "Recipes" в случае, если происходит
-    добавление рецепта в избранное или удаление оттуда."""
+class RecipesReadSerializer(RecipesImageVariantMixin, BaseSerializer):
+    """Создает сериализатор модели "Recipes" только для чтения: выдача
+    совпадает с выдачей "RecipesSerializer" при GET-запросе, но строится
+    из словарей выборки QuerySet.values(*RECIPES_READ_VALUES) без полей
+    DRF и объектов моделей:
+        - теги и ингредиенты - из связей "RecipesTags" и "RecipesIngredients"
+          (по одному запросу на рецепты списка) и справочника процесса
+          (см. "foodgram_app/catalog.py");
+        - "is_favorited", "is_in_shopping_cart" и "author.is_subscribed" -
+          по одному запросу на рецепты списка для авторизованного
+          пользователя."""
 
-    def validate(self, data):
-        """Производит валидацию данных:
-            - DELETE: проверяет, что пользователь "user" добавил рецепт
-              "recipe" в избранное;
-            - POST: проверяет, что пользователь "user" не добавляет
-              рецепт "recipe" в избранное повторно."""
+    get_image_variant = RecipesSerializer.get_image_variant
+
+    class Meta:
+        list_serializer_class = RecipesReadListSerializer
+
+    def represent(self, rows: list[dict]) -> list[dict]:
+        """Возвращает выдачу рецептов по строкам выборки rows."""
         request = self.context.get('request', None)
-        if not request:
+        if request is None:
             raise APICustomException()
-        request_method: str = request.method
-        user: User = data.get('user', None)
-        recipe: Recipes = data.get('recipe', None)
-        if request_method == 'DELETE' and not RecipesFavorites.objects.filter(
-                recipe=recipe, user=user).exists():
-            raise ValidationError({
-                'recipe':
-                    ['Ошибка удаления. Рецепта нет в избранном.']})
-        elif request_method == 'POST' and RecipesFavorites.objects.filter(
-                recipe=recipe, user=user).exists():
-            raise ValidationError({
-                'recipe':
-                    ['Ошибка добавления. Рецепт уже находится в избранном.']})
-        return data
-
-    def create(self, serializer):
-        """Дополняет метод save() для записи в БД:
-            - добавляет запись в таблицу "RecipesFavorites"."""
-        recipe_id = self.kwargs.get('id', None)
-        recipe: Recipes = get_object_or_404(Recipes, id=recipe_id)
-        user: User = self.request.user
-        if RecipesFavorites.objects.filter(
-                recipe=recipe, user=user).exists():
-            raise ValidationError(
-                'Ошибка добавления. '
-                'Рецепт уже находится в избранном.')
-        RecipesFavorites.objects.create(recipe=recipe, user=user)
-        return
+        if not rows:
+            return []
+        recipe_ids: list[int] = [row['id'] for row in rows]
+        ingredients: dict[int, list[tuple[int, float]]] = {}
+        for recipe_id, ingredient_id, amount in (
+                RecipesIngredients.objects.filter(recipe_id__in=recipe_ids)
+                .order_by().values_list(
+                    'recipe_id', 'ingredient_id', 'amount')):
+            ingredients.setdefault(recipe_id, []).append(
+                (ingredient_id, amount))
+        tags: dict[int, list[int]] = {}
+        for recipe_id, tag_id in (
+                RecipesTags.objects.filter(recipe_id__in=recipe_ids)
+                .order_by().values_list('recipe_id', 'tag_id')):
+            tags.setdefault(recipe_id, []).append(tag_id)
+        catalog: Catalog = get_catalog_cache().resolve(
+            tag_ids=[tag_id for ids in tags.values() for tag_id in ids],
+            ingredient_ids=[ingredient_id
+                            for amounts in ingredients.values()
+                            for ingredient_id, _ in amounts])
+        favorited, in_shopping_cart, subscribed = self._get_user_marks(
+            user=request.user, rows=rows)
+        image_storage = Recipes._meta.get_field('image').storage
+        representation: list[dict] = []
+        for row in rows:
+            image: str = self.get_image_url(
+                image_status=row['image_status'],
+                image_variants=row['image_variants'])
+            if image is None and row['image']:
+                image = request.build_absolute_uri(
+                    image_storage.url(row['image']))
+            representation.append({
+                'id': row['id'],
+                'tags': catalog.get_tags(tag_ids=tags.get(row['id'], [])),
+                'author': {
+                    'email': row['author__email'],
+                    'id': row['author_id'],
+                    'username': row['author__username'],
+                    'first_name': row['author__first_name'],
+                    'last_name': row['author__last_name'],
+                    'is_subscribed': row['author_id'] in subscribed},
+                'ingredients': catalog.get_ingredients(
+                    amounts=ingredients.get(row['id'], [])),
+                'is_favorited': row['id'] in favorited,
+                'is_in_shopping_cart': row['id'] in in_shopping_cart,
+                'name': row['name'],
+                'image': image,
+                'text': row['text'],
+                'cooking_time': row['cooking_time']})
+        return representation
 
-    def destroy(self, request, *args, **kwargs):
-        """Дополняет метод destroy() для удаления из БД:
-            - удаляет запись из таблицы "RecipesFavorites"."""
-        recipe_id = self.kwargs.get('id', None)
-        recipe: Recipes = get_object_or_404(Recipes, id=recipe_id)
-        user: User = self.request.user
-        if not RecipesFavorites.objects.filter(
-                recipe=recipe, user=user).exists():
-            raise ValidationError(
-                'Ошибка удаления. '
-                'Рецепта нет в избранном.')
-        recipe_favorite: RecipesFavorites = get_object_or_404(
-            RecipesFavorites, recipe=recipe_id, user=user)
-        recipe_favorite.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+    def to_representation(self, instance):
+        return self.represent(rows=[instance])[0]
+
+    def _get_user_marks(
+            self,
+            user: User,
+            rows: list[dict]) -> tuple[set[int], set[int], set[int]]:
+        """Вспомогательная функция: возвращает ID рецептов из rows
+        в избранном и в списке покупок пользователя и ID их авторов,
+        на которых подписан пользователь. Для анонимного пользователя
+        возвращает пустые множества без запросов к БД."""
+        if user.is_anonymous:
+            return set(), set(), set()
+        recipe_ids: list[int] = [row['id'] for row in rows]
+        favorited: set[int] = set(RecipesFavorites.objects.filter(
+            user=user, recipe_id__in=recipe_ids).values_list(
+                'recipe_id', flat=True))
+        in_shopping_cart: set[int] = set(ShoppingCarts.objects.filter(
+            user=user, recipe_id__in=recipe_ids).values_list(
+                'recipe_id', flat=True))
+        subscribed: set[int] = set(Subscriptions.objects.filter(
+            subscriber=user,
+            subscription_to_id__in={row['author_id'] for row in rows}
+        ).values_list('subscription_to_id', flat=True))
+        return favorited, in_shopping_cart, subscribed
+
+
+class RecipesTransferIngredientsSerializer(ModelSerializer):
+    """Создает сериализатор ингредиента рецепта для импорта рецептов
+    в формате NDJSON (см. "api/v1/transfer.py"): ингредиент задается
+    названием и единицей измерения, а не ID, так как ID различаются
+    в разных окружениях."""
+
+    name = CharField(max_length=INGREDIENTS_NAME_MAX_LENGTH)
+    measurement_unit = CharField(max_length=INGREDIENTS_UNIT_MAX_LENGTH)
 
     class Meta:
-        model = RecipesFavorites
+        model = RecipesIngredients
         fields = (
-            'user',
-            'recipe')
+            'name',
+            'measurement_unit',
+            'amount')
 
 
-class ShoppingCartsSerializer(ModelSerializer):
-    """Создает сериализатор для модели "ShoppingCarts"."""
+class RecipesTransferSerializer(ModelSerializer):
+    """Создает сериализатор строки импорта рецептов в формате NDJSON
+    (см. "api/v1/transfer.py"). Проверяет только значения полей без запросов
+    к БД: теги (по slug), ингредиенты (по названию и единице измерения)
+    и уникальность названий проверяются для пачки строк сразу."""
 
-    def validate(self, data):
-        """Производит валидацию данных:
-            - DELETE: проверяет, что пользователь "user" имеет рецепт
-              "recipe" в корзине;
-            - POST: проверяет, что пользователь "user" не добавляет
-              рецепт "recipe" в корзину повторно."""
-        request = self.context.get('request', None)
-        if not request:
-            raise APICustomException()
-        request_method: str = request.method
-        user: User = data['user']
-        recipe: Recipes = data['recipe']
-        if request_method == 'DELETE' and not ShoppingCarts.objects.filter(
-                recipe=recipe, user=user).exists():
-            raise ValidationError('Ошибка удаления. Рецепта нет в корзине.')
-        elif request_method == 'POST' and ShoppingCarts.objects.filter(
-                recipe=recipe, user=user).exists():
-            raise ValidationError(
-                'Ошибка добавления. Рецепт уже находится в корзине.')
-        return data
+    image = Base64ImageField()
+    ingredients = RecipesTransferIngredientsSerializer(
+        allow_empty=False, many=True)
+    name = CharField(max_length=RECIPES_NAME_MAX_LEN)
+    tags = ListField(
+        allow_empty=False,
+        child=SlugField(max_length=TAGS_SLUG_MAX_LEN))
 
     class Meta:
-        model = ShoppingCarts
+        model = Recipes
         fields = (
-            'user',
-            'recipe')
+            'name',
+            'text',
+            'cooking_time',
+            'image',
+            'tags',
+            'ingredients')
+
+    def validate_ingredients(self, value):
+        """Проверяет отсутствие повторяющихся ингредиентов."""
+        keys: set[tuple[str, str]] = {
+            (ingredient['name'].lower(), ingredient['measurement_unit'])
+            for ingredient in value}
+        if len(keys) != len(value):
+            raise ValidationError('В рецепте продублированы ингредиенты!')
+        return value
 
+    def validate_tags(self, value):
+        """Удаляет из списка повторяющиеся теги, сохраняя порядок."""
+        return list(dict.fromkeys(value))
 
-class SubscriptionsSerializer(ModelSerializer):
-    """Создает сериализатор для модели "Subscriptions"."""
 
-    def validate(self, data):
-        """Производит валидацию данных:
-            - DELETE:
-                - проверяет, что пользователь "subscriber" имеет подписку
-                  на пользователя "subscription_to".;
-            - POST:
-                - проверяет, что пользователь "subscriber" не подписывается
-                  сам на себя;
-                - проверяет, что пользователь "subscriber" не осуществляет
-                  повторную подписку на пользователя "subscription_to"."""
-        request = self.context.get('request', None)
-        if not request:
-            raise APICustomException()
-        request_method: str = request.method
-        subscriber: User = data['subscriber']
-        subscription_to: User = data['subscription_to']
-        subscription_exists: bool = Subscriptions.objects.filter(
-            subscriber=subscriber,
-            subscription_to=subscription_to).exists()
-        if request_method == 'DELETE' and not subscription_exists:
-            raise ValidationError(
-                "Вы не были подписаны на пользователя "
-                f"{subscription_to.username}.")
-        elif request_method == 'POST':
-            if subscriber.id == subscription_to.id:
-                raise ValidationError("Вы не можете подписаться на себя.")
-            elif subscription_exists:
-                raise ValidationError(
-                    "Вы уже подписаны на пользователя "
-                    f"{subscription_to.username}.")
-        return data
+class RecipesBulkSerializer(Serializer):
+    """Создает сериализатор для валидации списка ID рецептов при массовом
+    добавлении рецептов в избранное/корзину и удалении оттуда."""
+
+    recipes = ListField(
+        allow_empty=False,
+        child=IntegerField(min_value=1),
+        max_length=RECIPES_BULK_MAX_LEN)
+
+    def validate_recipes(self, value):
+        """Удаляет из списка повторяющиеся ID, сохраняя порядок."""
+        return list(dict.fromkeys(value))
+
+
+class RecipesByIngredientsSerializer(Serializer):
+    """Создает сериализатор для валидации параметров поиска рецептов
+    по имеющимся у пользователя ингредиентам:
+        - ingredients: список ID ингредиентов;
+        - min_coverage: минимальная доля ингредиентов рецепта, которые есть
+          у пользователя."""
+
+    ingredients = ListField(
+        allow_empty=False,
+        child=IntegerField(min_value=1),
+        max_length=RECIPES_BY_INGREDIENTS_MAX_LEN)
+    min_coverage = FloatField(
+        default=RECIPES_BY_INGREDIENTS_MIN_COVERAGE,
+        max_value=1,
+        min_value=0.01)
+
+
+class RecipesShortSerializer(RecipesImageVariantMixin, ModelSerializer):
+    """Создает сериализатор для модели "Recipes" c ограниченным набором полей
+    для отображения в списке покупок."""
 
     class Meta:
-        model = Subscriptions
+        model = Recipes
         fields = (
-            'subscriber',
-            'subscription_to')
+            'id',
+            'name',
+            'image',
+            'cooking_time')
 
 
 class TagsSerializer(ModelSerializer):
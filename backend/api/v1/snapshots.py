@@ -0,0 +1,148 @@
+"""
+Создает снимок выдачи списка ингредиентов "/api/v1/ingredients/" проекта
+"Foodgram".
+
+Полный список ингредиентов и списки для всех префиксов названий длиной
+до "INGREDIENTS_SNAPSHOT_PREFIX_MAX_LEN" символов (фильтр "name", который
+фронтенд отправляет при вводе первых букв) заранее сериализуются в JSON
+("FastJSONRenderer") и сжимаются gzip. Такие запросы выдаются из снимка без
+запросов к БД и работы сериализаторов, клиенту, принимающему gzip,
+выдается сжатое тело.
+
+Снимок строится из справочника тегов и ингредиентов процесса
+(см. "foodgram_app/catalog.py") без запросов к БД и перестраивается, когда
+справочник обновляется: при изменении "Ingredients" (сигналы) и импорте
+ингредиентов из CSV.
+
+Классы:
+    - IngredientsSnapshot;
+    - IngredientsSnapshotCache.
+
+Функции:
+    - get_ingredients_snapshot;
+    - snapshot_response.
+"""
+import threading
+
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from api.v1.compression import accepts_gzip, compress
+from api.v1.renderers import FastJSONRenderer
+from foodgram_app.catalog import Catalog, get_catalog
+
+INGREDIENTS_SNAPSHOT_LEVEL: int = 9
+INGREDIENTS_SNAPSHOT_PREFIX_MAX_LEN: int = 2
+
+
+def _blob(content: bytes) -> tuple[bytes, bytes]:
+    """Вспомогательная функция: возвращает пару (JSON, JSON в gzip),
+    сжатое тело - None, если сжатие не уменьшает размер."""
+    compressed: bytes = compress(
+        content=content, level=INGREDIENTS_SNAPSHOT_LEVEL)
+    return content, compressed if len(compressed) < len(content) else None
+
+
+class IngredientsSnapshot():
+    """
+    Неизменяемый снимок выдачи списка ингредиентов.
+
+    Атрибуты:
+        - blobs: dict[str, tuple[bytes, bytes]]
+            - JSON и JSON в gzip (None, если сжатие не уменьшает размер)
+              для каждого префикса названия в нижнем регистре ("" - полный
+              список)
+        - catalog: Catalog
+            - снимок справочника, из которого построен снимок выдачи
+    """
+
+    EMPTY: tuple[bytes, bytes] = _blob(content=b'[]')
+
+    def __init__(
+            self,
+            blobs: dict[str, tuple[bytes, bytes]],
+            catalog: Catalog):
+        self.blobs: dict[str, tuple[bytes, bytes]] = blobs
+        self.catalog: Catalog = catalog
+
+    @classmethod
+    def build(cls, catalog: Catalog) -> 'IngredientsSnapshot':
+        """Создает снимок выдачи из справочника catalog. Ингредиенты
+        выдаются в порядке сортировки модели "Ingredients"."""
+        ingredients: list[dict] = [
+            {'id': ingredient_id,
+             'name': name,
+             'measurement_unit': measurement_unit}
+            for ingredient_id, (_, name, measurement_unit) in sorted(
+                catalog.ingredients.items(), key=lambda item: item[1][0])]
+        buckets: dict[str, list[dict]] = {'': ingredients}
+        for ingredient in ingredients:
+            name: str = ingredient['name'].lower()
+            for length in range(1, min(
+                    len(name), INGREDIENTS_SNAPSHOT_PREFIX_MAX_LEN) + 1):
+                buckets.setdefault(name[:length], []).append(ingredient)
+        renderer: FastJSONRenderer = FastJSONRenderer()
+        return cls(
+            blobs={prefix: _blob(content=renderer.render(bucket))
+                   for prefix, bucket in buckets.items()},
+            catalog=catalog)
+
+    def get(self, name: str) -> tuple[bytes, bytes]:
+        """Возвращает JSON и JSON в gzip выдачи для фильтра name или None,
+        если префикс длиннее "INGREDIENTS_SNAPSHOT_PREFIX_MAX_LEN"
+        (выдача строится запросом к БД)."""
+        prefix: str = (name or '').lower()
+        if len(prefix) > INGREDIENTS_SNAPSHOT_PREFIX_MAX_LEN:
+            return None
+        return self.blobs.get(prefix, self.EMPTY)
+
+
+class IngredientsSnapshotCache():
+    """Хранит снимок выдачи списка ингредиентов процесса и перестраивает
+    его при обновлении справочника процесса."""
+
+    def __init__(self):
+        self._snapshot: IngredientsSnapshot = None
+        self._lock = threading.Lock()
+
+    def get(self) -> IngredientsSnapshot:
+        """Возвращает снимок выдачи для актуального справочника."""
+        catalog: Catalog = get_catalog()
+        snapshot: IngredientsSnapshot = self._snapshot
+        if snapshot is not None and snapshot.catalog is catalog:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or self._snapshot.catalog is not catalog:
+                self._snapshot = IngredientsSnapshot.build(catalog=catalog)
+            return self._snapshot
+
+    def clear(self) -> None:
+        """Сбрасывает снимок: он будет построен заново при обращении."""
+        with self._lock:
+            self._snapshot = None
+
+
+_ingredients_snapshot_cache: IngredientsSnapshotCache = (
+    IngredientsSnapshotCache())
+
+
+def get_ingredients_snapshot() -> IngredientsSnapshot:
+    """Возвращает актуальный снимок выдачи списка ингредиентов процесса."""
+    return _ingredients_snapshot_cache.get()
+
+
+def snapshot_response(
+        request: HttpRequest,
+        blob: tuple[bytes, bytes]) -> HttpResponse:
+    """Возвращает ответ с телом из снимка: сжатым, если клиент принимает
+    gzip и сжатое тело есть в снимке."""
+    content, compressed = blob
+    response: HttpResponse = HttpResponse(
+        content, content_type='application/json')
+    if compressed is None:
+        return response
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if accepts_gzip(request=request):
+        response.content = compressed
+        response['Content-Encoding'] = 'gzip'
+    return response
@@ -0,0 +1,184 @@
+from datetime import datetime
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.v1.authentication import TokenCache, get_token_cache
+from api.v1.backends import USER_EMAIL_INDEX_NAME
+from api.v1.tests.test_views import (
+    URL_AUTH_LOGIN, URL_AUTH_LOGOUT, URL_USERS_ME,
+    anon_client, auth_token_client)
+from foodgram_app.tests.test_models import (
+    create_user_obj, create_user_obj_with_hash)
+
+TEST_HASHER_COST: dict = {
+    **settings.PASSWORD_HASHER_COST,
+    'ARGON2_MEMORY_COST': 1024,
+    'SCRYPT_WORK_FACTOR': 2 ** 10}
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache() -> None:
+    """Фикстура очищает кэш токенов процесса перед каждым тестом."""
+    get_token_cache().clear()
+    return
+
+
+def token_queries_count(client: APIClient) -> int:
+    """Выполняет GET-запрос к "/api/v1/users/me/" и возвращает число
+    запросов к таблице токенов."""
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(URL_USERS_ME)
+    assert response.status_code == status.HTTP_200_OK
+    return sum('authtoken_token' in query['sql']
+               for query in context.captured_queries)
+
+
+def test_token_cache_lru_and_ttl() -> None:
+    """Тестирует вытеснение давно не использованных записей и истечение
+    срока хранения записей в локальном кэше."""
+    created: datetime = timezone.now()
+    token_cache = TokenCache(max_size=2, timeout=60)
+    token_cache.set(key='key_0', user_id=0, created=created)
+    token_cache.set(key='key_1', user_id=1, created=created)
+    assert token_cache.get('key_0') == (0, created)
+    token_cache.set(key='key_2', user_id=2, created=created)
+    assert token_cache.get('key_1') is None
+    assert token_cache.get('key_0') is not None
+    token_cache.delete_user(0)
+    assert token_cache.get('key_0') is None
+    token_cache = TokenCache(max_size=2, timeout=-1)
+    token_cache.set(key='key_0', user_id=0, created=created)
+    assert token_cache.get('key_0') is None
+    return
+
+
+@pytest.mark.django_db
+def test_user_email_index() -> None:
+    """Тестирует, что после миграций создан индекс по полю "email" модели
+    "User", используемый "EmailBackend"."""
+    with connection.cursor() as cursor:
+        constraints: dict = connection.introspection.get_constraints(
+            cursor, User._meta.db_table)
+    assert constraints[USER_EMAIL_INDEX_NAME]['columns'] == ['email']
+    return
+
+
+@pytest.mark.django_db
+def test_login_duplicate_email() -> None:
+    """Тестирует отказ во входе по почте, указанной у нескольких
+    пользователей: токен не выдается ни одному из них."""
+    users: list[User] = [
+        create_user_obj_with_hash(num=num) for num in (1, 2)]
+    User.objects.filter(id=users[1].id).update(email=users[0].email)
+    data: dict = {
+        'email': users[0].email,
+        'password': 'test_user_password_1'}
+    response = anon_client().post(URL_AUTH_LOGIN, data, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert not Token.objects.exists()
+    return
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('policy, prefix', [
+    ('scrypt', 'scrypt$1024$'),
+    ('argon2', 'argon2$argon2id$v=19$m=1024,')])
+def test_password_rehash_on_login(policy: str, prefix: str) -> None:
+    """Тестирует, что при смене политики хеширования пароль пересчитывается
+    новым хешером при успешном входе в систему."""
+    user: User = create_user_obj_with_hash(num=1)
+    assert user.password.startswith('pbkdf2_sha256$')
+    data: dict = {
+        'email': 'test_user_email_1@email.com',
+        'password': 'test_user_password_1'}
+    with override_settings(
+            PASSWORD_HASHERS=settings.PASSWORD_HASHER_POLICIES[policy],
+            PASSWORD_HASHER_COST=TEST_HASHER_COST):
+        response = anon_client().post(URL_AUTH_LOGIN, data, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        user.refresh_from_db()
+        assert user.password.startswith(prefix)
+        assert user.check_password('test_user_password_1')
+    return
+
+
+@override_settings(PASSWORD_HASHER_COST=TEST_HASHER_COST)
+def test_benchmark_login_command() -> None:
+    """Тестирует вывод команды "benchmark_login"."""
+    stdout = StringIO()
+    call_command(
+        'benchmark_login', '--policies', 'scrypt', '--seconds', '0',
+        stdout=stdout)
+    output: list[str] = stdout.getvalue().splitlines()
+    assert output[0].split() == [
+        'policy', 'algorithm', 'ms/login', 'logins/sec/worker']
+    assert output[1].split()[:2] == ['scrypt', 'scrypt']
+    return
+
+
+@pytest.mark.django_db
+class TestCachedTokenAuthentication():
+    """Производит тест класса аутентификации "CachedTokenAuthentication"."""
+
+    def test_cached_request(self) -> None:
+        """Тестирует, что повторный запрос с тем же токеном не обращается
+        к таблице токенов."""
+        create_user_obj(num=1)
+        client: APIClient = auth_token_client(user_id=1)
+        assert token_queries_count(client) == 1
+        assert token_queries_count(client) == 0
+        return
+
+    def test_cached_request_fresh_user(self) -> None:
+        """Тестирует, что при попадании в кэш пользователь загружается
+        из БД: изменения без сигналов (например, из другого процесса)
+        видны сразу, деактивированный пользователь не аутентифицируется."""
+        create_user_obj(num=1)
+        client: APIClient = auth_token_client(user_id=1)
+        token_queries_count(client)
+        User.objects.filter(id=1).update(first_name='changed')
+        response = client.get(URL_USERS_ME)
+        assert response.json()['first_name'] == 'changed'
+        User.objects.filter(id=1).update(is_active=False)
+        response = client.get(URL_USERS_ME)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        return
+
+    def test_logout_invalidates(self) -> None:
+        """Тестирует, что после выхода из системы токен из кэша
+        не принимается."""
+        create_user_obj(num=1)
+        client: APIClient = auth_token_client(user_id=1)
+        token_queries_count(client)
+        response = client.post(URL_AUTH_LOGOUT)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not Token.objects.exists()
+        response = client.get(URL_USERS_ME)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        return
+
+    def test_user_save_invalidates(self) -> None:
+        """Тестирует, что изменение пароля и деактивация пользователя
+        сбрасывают запись в кэше."""
+        user: User = create_user_obj(num=1)
+        client: APIClient = auth_token_client(user_id=1)
+        token_queries_count(client)
+        user.set_password('new_test_password')
+        user.save()
+        assert token_queries_count(client) == 1
+        user.is_active = False
+        user.save()
+        response = client.get(URL_USERS_ME)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        return
@@ -0,0 +1,160 @@
+import gzip
+import json
+
+import pytest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+from rest_framework import status
+
+from api.v1.compression import (
+    ResponseCompressionMiddleware, accepts_gzip, get_compression_cache)
+from api.v1.tests.test_views import URL_INGREDIENTS, anon_client
+from foodgram_app.tests.test_models import create_ingredient_obj
+
+"""Настройка сжатия для тестов middleware."""
+TEST_RESPONSE_COMPRESSION: dict = {
+    'CACHE_MAX_SIZE': 2,
+    'LEVEL': 1,
+    'MIN_SIZE': 100,
+    'ENDPOINTS': {
+        '/api/v1/recipes/': {'CACHE': True, 'CACHE_QUERY_PARAMS': ('page',)},
+        '/api/v1/recipes/download_shopping_cart/': {
+            'CACHE': False, 'LEVEL': 9}}}
+
+"""Тело ответа больше "MIN_SIZE" тестовой настройки."""
+TEST_CONTENT: bytes = json.dumps(
+    [{'id': num, 'name': 'ингредиент'} for num in range(20)]).encode()
+
+
+@pytest.fixture(autouse=True)
+def clear_compression_cache() -> None:
+    """Фикстура очищает кэш сжатых тел процесса перед каждым тестом."""
+    get_compression_cache().clear()
+    return
+
+
+class TestResponseCompressionMiddleware():
+    """Производит тест middleware "ResponseCompressionMiddleware"."""
+
+    def get_response(
+            self,
+            response: HttpResponse,
+            path: str = '/api/v1/recipes/',
+            accept_encoding: str = 'gzip, deflate') -> HttpResponse:
+        """Возвращает ответ response, обработанный middleware, на GET-запрос
+        к path."""
+        request = RequestFactory().get(
+            path, HTTP_ACCEPT_ENCODING=accept_encoding)
+        return ResponseCompressionMiddleware(lambda request: response)(
+            request)
+
+    @pytest.fixture(autouse=True)
+    def compression_settings(self, settings) -> None:
+        """Фикстура подставляет тестовую настройку сжатия."""
+        settings.RESPONSE_COMPRESSION = TEST_RESPONSE_COMPRESSION
+        return
+
+    @pytest.mark.parametrize('content_type', [
+        'application/json', 'text/csv; charset=utf-8'])
+    def test_compress(self, content_type: str) -> None:
+        """Тестирует сжатие JSON и CSV ответов."""
+        response: HttpResponse = self.get_response(
+            HttpResponse(TEST_CONTENT, content_type=content_type))
+        assert response['Content-Encoding'] == 'gzip'
+        assert response['Vary'] == 'Accept-Encoding'
+        assert int(response['Content-Length']) == len(response.content)
+        assert gzip.decompress(response.content) == TEST_CONTENT
+        return
+
+    @pytest.mark.parametrize('response, accept_encoding', [
+        (HttpResponse(TEST_CONTENT[:99], content_type='application/json'),
+         'gzip'),
+        (HttpResponse(TEST_CONTENT, content_type='application/json'),
+         'br, deflate'),
+        (HttpResponse(TEST_CONTENT, content_type='application/json'),
+         'br, gzip;q=0'),
+        (HttpResponse(TEST_CONTENT, content_type='image/png'), 'gzip'),
+        (HttpResponse(TEST_CONTENT, content_type='application/gzip'),
+         'gzip'),
+        (StreamingHttpResponse(
+            [TEST_CONTENT], content_type='application/json'), 'gzip')])
+    def test_skip(self, response: HttpResponse, accept_encoding: str) -> None:
+        """Тестирует ответы без сжатия: меньше порога, клиент не принимает
+        gzip (в том числе с весом q=0), медиа и уже сжатые файлы, потоковые
+        ответы."""
+        response = self.get_response(
+            response=response, accept_encoding=accept_encoding)
+        assert not response.has_header('Content-Encoding')
+        assert b''.join(response) in (TEST_CONTENT, TEST_CONTENT[:99])
+        return
+
+    @pytest.mark.parametrize('path, cached', [
+        ('/api/v1/recipes/', True),
+        ('/api/v1/recipes/?page=2', True),
+        ('/api/v1/recipes/?page=2&tags=lunch', False),
+        ('/api/v1/recipes/download_shopping_cart/', False),
+        ('/api/v1/users/', False)])
+    def test_cache(self, path: str, cached: bool) -> None:
+        """Тестирует кэш сжатых тел для эндпоинтов с "CACHE"
+        и допустимыми параметрами запроса."""
+        for _ in range(2):
+            response: HttpResponse = self.get_response(
+                HttpResponse(TEST_CONTENT, content_type='application/json'),
+                path=path)
+            assert gzip.decompress(response.content) == TEST_CONTENT
+        assert get_compression_cache().hits == int(cached)
+        assert get_compression_cache().misses == int(cached)
+        return
+
+    def test_endpoint_level(self) -> None:
+        """Тестирует уровень сжатия эндпоинта по самому длинному
+        подходящему префиксу пути."""
+        responses: list[HttpResponse] = [
+            self.get_response(
+                HttpResponse(TEST_CONTENT, content_type='text/csv'),
+                path=path)
+            for path in ('/api/v1/recipes/',
+                         '/api/v1/recipes/download_shopping_cart/')]
+        assert responses[0].content == gzip.compress(
+            TEST_CONTENT, compresslevel=1, mtime=0)
+        assert responses[1].content == gzip.compress(
+            TEST_CONTENT, compresslevel=9, mtime=0)
+        return
+
+
+@pytest.mark.parametrize('accept_encoding, accepted', [
+    ('gzip', True),
+    ('gzip, deflate, br', True),
+    ('br;q=1.0, GZIP;q=0.5', True),
+    ('*', True),
+    ('x-gzip', True),
+    ('gzip;q=0', False),
+    ('gzip; q=0.000, *', False),
+    ('*;q=0', False),
+    ('br, *;q=0', False),
+    ('gzip;q=2', False),
+    ('br, deflate', False),
+    ('', False)])
+def test_accepts_gzip(accept_encoding: str, accepted: bool) -> None:
+    """Тестирует разбор весов q заголовка "Accept-Encoding": gzip
+    с нулевым или некорректным весом отклонен."""
+    request = RequestFactory().get(
+        '/api/v1/recipes/', HTTP_ACCEPT_ENCODING=accept_encoding)
+    assert accepts_gzip(request=request) is accepted
+    return
+
+
+@pytest.mark.django_db
+def test_ingredients_compressed() -> None:
+    """Тестирует сжатие полного списка ингредиентов "/api/v1/ingredients/":
+    распакованный ответ совпадает с несжатым."""
+    for num in range(1, 51):
+        create_ingredient_obj(num=num)
+    plain = anon_client().get(URL_INGREDIENTS)
+    compressed = anon_client().get(
+        URL_INGREDIENTS, HTTP_ACCEPT_ENCODING='gzip')
+    assert compressed.status_code == status.HTTP_200_OK
+    assert compressed['Content-Encoding'] == 'gzip'
+    assert len(compressed.content) < len(plain.content)
+    assert gzip.decompress(compressed.content) == plain.content
+    return
@@ -0,0 +1,41 @@
+from io import BytesIO
+
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from api.v1.parsers import FastJSONParser
+
+
+class TestFastJSONParser():
+    """Производит тест парсера "FastJSONParser"."""
+
+    def parse(self, parser: JSONParser, body: bytes, encoding: str = 'utf-8'):
+        """Возвращает результат разбора тела запроса body."""
+        return parser.parse(
+            BytesIO(body), parser_context={'encoding': encoding})
+
+    @pytest.mark.parametrize('body, encoding', [
+        ('{"name": "Хлеб", "ingredients": [{"id": 1, "amount": 0.5}],'
+         ' "tags": [1, 2], "cooking_time": 90}'.encode(), 'utf-8'),
+        ('{"name": "Хлеб"}'.encode('cp1251'), 'cp1251'),
+        (b'[1, 2.5, null, true, "\\u0445"]', 'utf-8')])
+    def test_same_data(self, body: bytes, encoding: str) -> None:
+        """Тестирует совпадение результата с JSONParser DRF."""
+        assert self.parse(FastJSONParser(), body, encoding) == self.parse(
+            JSONParser(), body, encoding)
+        return
+
+    @pytest.mark.parametrize('body', [b'{"name": ', b'[NaN]', b'[Infinity]'])
+    def test_errors(self, body: bytes, monkeypatch) -> None:
+        """Тестирует совпадение ошибок разбора с JSONParser DRF,
+        в том числе без orjson."""
+        with pytest.raises(ParseError) as expected:
+            self.parse(JSONParser(), body)
+        with pytest.raises(ParseError) as error:
+            self.parse(FastJSONParser(), body)
+        assert str(error.value) == str(expected.value)
+        monkeypatch.setattr('api.v1.parsers.orjson', None)
+        with pytest.raises(ParseError):
+            self.parse(FastJSONParser(), body)
+        return
@@ -0,0 +1,85 @@
+import datetime
+import uuid
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from api.v1 import renderers
+from api.v1.renderers import FastJSONRenderer
+
+"""Страница рецептов с типами значений, которые выдает API."""
+TEST_RECIPES_PAGE: dict = {
+    'count': 2,
+    'next': 'http://localhost/api/v1/recipes/?page=2',
+    'previous': None,
+    'results': ReturnList([
+        ReturnDict({
+            'id': 1,
+            'tags': [{'id': 1, 'name': 'Завтрак', 'color': '#E26C2D',
+                      'slug': 'breakfast'}],
+            'author': {'email': 'author@email.com', 'id': 1,
+                       'username': 'author', 'first_name': 'Иван',
+                       'last_name': 'Петров', 'is_subscribed': False},
+            'ingredients': [
+                {'id': 1, 'name': 'мука', 'measurement_unit': 'г',
+                 'amount': 250.0},
+                {'id': 2, 'name': 'соль', 'measurement_unit': 'ч. л.',
+                 'amount': Decimal('0.50')},
+                {'id': 3, 'name': 'вода', 'measurement_unit': 'мл',
+                 'amount': 0.1}],
+            'is_favorited': True,
+            'is_in_shopping_cart': False,
+            'name': 'Хлеб "домашний"',
+            'image': 'http://localhost/media/recipes/images/1.webp',
+            'text': 'Смешать\tи испечь.\nСтрока\u2028разделитель\u2029.',
+            'cooking_time': 90}, serializer=None)], serializer=None),
+    'created': datetime.datetime(
+        2023, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+    'date': datetime.date(2023, 5, 1),
+    'duration': datetime.timedelta(minutes=90),
+    'label': gettext_lazy('Рецепт'),
+    'uuid': uuid.UUID('12345678123456781234567812345678')}
+
+
+class TestFastJSONRenderer():
+    """Производит тест рендерера "FastJSONRenderer"."""
+
+    def render(self, renderer: JSONRenderer, **kwargs) -> bytes:
+        """Возвращает результат рендеринга страницы рецептов
+        (с генератором, который рендерится как список)."""
+        data: dict = dict(
+            TEST_RECIPES_PAGE, ids=(num for num in range(3)))
+        return renderer.render(data, **kwargs)
+
+    @pytest.mark.parametrize('accepted_media_type, renderer_context', [
+        (None, None),
+        ('application/json; indent=4', None),
+        (None, {'indent': 2}),
+        (None, {'indent': None})])
+    def test_same_output(
+            self, accepted_media_type, renderer_context) -> None:
+        """Тестирует совпадение выдачи с JSONRenderer DRF, в том числе
+        при запросе отступов."""
+        kwargs: dict = {
+            'accepted_media_type': accepted_media_type,
+            'renderer_context': renderer_context}
+        assert self.render(FastJSONRenderer(), **kwargs) == self.render(
+            JSONRenderer(), **kwargs)
+        return
+
+    def test_fallback(self, monkeypatch) -> None:
+        """Тестирует выдачу без orjson и для данных, которые orjson
+        не сериализует."""
+        expected: bytes = self.render(JSONRenderer())
+        monkeypatch.setattr(renderers, 'orjson', None)
+        assert self.render(FastJSONRenderer()) == expected
+        monkeypatch.undo()
+        assert FastJSONRenderer().render(
+            {'big': 2 ** 70}) == JSONRenderer().render({'big': 2 ** 70})
+        assert FastJSONRenderer().render(None) == b''
+        with pytest.raises(TypeError):
+            FastJSONRenderer().render({'object': object()})
+        return
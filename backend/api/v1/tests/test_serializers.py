@@ -1,17 +1,38 @@
+import base64
+from io import BytesIO
+from tempfile import SpooledTemporaryFile
+
 import pytest
 
+from django.contrib.auth.models import AnonymousUser, User
+from django.db.models import Prefetch
+from PIL import Image
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
 from rest_framework.serializers import (
     Serializer, ListSerializer,
-    Field,
+    Field, ValidationError,
     BooleanField, CharField, ChoiceField, ImageField, FloatField,
     EmailField, IntegerField, SerializerMethodField, SlugField)
+from rest_framework.test import APIRequestFactory
+
+from api.v1 import serializers
 from api.v1.serializers import (
-    CustomUserSerializer, CustomUserSubscriptionsSerializer,
-    IngredientsSerializer, PrimaryKeyRelatedField, RecipesSerializer,
+    RECIPES_READ_VALUES,
+    Base64ImageField, CustomUserSerializer, CustomUserSubscriptionsSerializer,
+    IngredientsSerializer, PrimaryKeyRelatedField, RecipesReadSerializer,
+    RecipesSerializer,
     RecipesIngredientsSerializer, RecipesIngredientsCreateSerializer,
-    RecipesFavoritesSerializer, RecipesShortSerializer,
-    ShoppingCartsSerializer, SubscriptionsSerializer,
-    TagsIdListSerializer, TagsSerializer)
+    RecipesShortSerializer, TagsIdListSerializer, TagsSerializer)
+from api.v1.views import RecipesViewSet
+from foodgram_app.models import (
+    RECIPES_IMAGE_STATUS_FAILED, RECIPES_IMAGE_STATUS_PENDING,
+    Ingredients, Recipes, RecipesIngredients, RecipesTags, Tags)
+from foodgram_app.tests.test_models import (
+    create_ingredient_obj, create_recipe_favorite_obj,
+    create_recipe_ingredient_obj, create_recipe_obj, create_recipe_tag_obj,
+    create_shopping_cart_obj, create_subscription_obj, create_tag_obj,
+    create_user_obj)
 
 
 def serializer_fields_check(
@@ -118,17 +139,6 @@ def test_recipes_ingredients_create_serializer() -> None:
     return
 
 
-def test_recipes_favorites_serializer() -> None:
-    """Тестирует поля сериализатора "RecipesFavoritesSerializer"."""
-    expected_fields = {
-        'user': PrimaryKeyRelatedField,
-        'recipe': PrimaryKeyRelatedField}
-    serializer_fields_check(
-        expected_fields=expected_fields,
-        serializer=RecipesFavoritesSerializer())
-    return
-
-
 def test_recipes_short_serializer() -> None:
     """Тестирует поля сериализатора "RecipesShortSerializer"."""
     expected_fields = {
@@ -142,28 +152,6 @@ def test_recipes_short_serializer() -> None:
     return
 
 
-def test_shopping_carts_serializer() -> None:
-    """Тестирует поля сериализатора "ShoppingCartsSerializer"."""
-    expected_fields = {
-        'user': PrimaryKeyRelatedField,
-        'recipe': PrimaryKeyRelatedField}
-    serializer_fields_check(
-        expected_fields=expected_fields,
-        serializer=ShoppingCartsSerializer())
-    return
-
-
-def test_subscriptions_serializer() -> None:
-    """Тестирует поля сериализатора "SubscriptionsSerializer"."""
-    expected_fields = {
-        'subscriber': PrimaryKeyRelatedField,
-        'subscription_to': PrimaryKeyRelatedField}
-    serializer_fields_check(
-        expected_fields=expected_fields,
-        serializer=SubscriptionsSerializer())
-    return
-
-
 def test_tags_serializer() -> None:
     """Тестирует поля сериализатора "TagsSerializer"."""
     expected_fields = {
@@ -182,3 +170,198 @@ def test_tags_id_list_serializer() -> None:
     Сериализатор представляет собой объект "ListField"."""
     serializer: Field = TagsIdListSerializer()
     assert isinstance(serializer.child, IntegerField)
+
+
+def create_base64_png(size: tuple[int, int]) -> str:
+    """Создает и возвращает PNG-изображение в формате base64."""
+    buffer: BytesIO = BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, format='PNG')
+    image_base64: str = base64.b64encode(buffer.getvalue()).decode()
+    return f'data:image/png;base64,{image_base64}'
+
+
+class TestBase64ImageField():
+    """Производит тест поля "Base64ImageField"."""
+
+    def test_decode(self, monkeypatch) -> None:
+        """Тестирует декодирование base64 частями во временный файл."""
+        monkeypatch.setattr(serializers, 'BASE64_DECODE_CHUNK_SIZE', 8)
+        data: str = create_base64_png(size=(40, 20))
+        file = Base64ImageField().to_internal_value(data)
+        assert file.name == 'image.png'
+        assert file.read() == base64.b64decode(data.split(',')[1])
+        return
+
+    @pytest.mark.parametrize('constant, value, error', [
+        ('RECIPES_IMAGE_MAX_BYTES', 10, 'image_too_large'),
+        ('RECIPES_IMAGE_MAX_PIXELS', 799, 'image_too_many_pixels')])
+    def test_limits(self, constant, error, monkeypatch, value) -> None:
+        """Тестирует отклонение картинок, превышающих ограничения
+        по размеру и числу пикселей, и закрытие временного файла."""
+        spooled_files: list = []
+
+        def spooled_file(**kwargs):
+            spooled_files.append(SpooledTemporaryFile(**kwargs))
+            return spooled_files[-1]
+
+        monkeypatch.setattr(serializers, constant, value)
+        monkeypatch.setattr(serializers, 'BASE64_DECODE_CHUNK_SIZE', 8)
+        monkeypatch.setattr(serializers, 'SpooledTemporaryFile', spooled_file)
+        with pytest.raises(ValidationError) as exc_info:
+            Base64ImageField().to_internal_value(
+                create_base64_png(size=(40, 20)))
+        assert exc_info.value.detail[0].code == error
+        assert all(file.closed for file in spooled_files)
+        return
+
+    @pytest.mark.parametrize('data', [
+        'data:image/png;base64,not*base64',
+        'data:image/png;base64,' + base64.b64encode(b'not image').decode(),
+        'data:image/png,iVBORw0KGg'])
+    def test_invalid(self, data) -> None:
+        """Тестирует отклонение некорректных данных."""
+        with pytest.raises(ValidationError):
+            Base64ImageField().to_internal_value(data)
+        return
+
+
+@pytest.mark.django_db
+class TestRecipesSerializerValidation():
+    """Производит тест валидации тегов и ингредиентов "RecipesSerializer"."""
+
+    def get_serializer(self, data: dict) -> RecipesSerializer:
+        """Возвращает сериализатор POST-запроса с данными data."""
+        request: Request = Request(
+            APIRequestFactory().post('/', data, format='json'),
+            parsers=[JSONParser()])
+        return RecipesSerializer(data=data, context={'request': request})
+
+    def get_data(self, ingredient_ids: list, tag_ids: list) -> dict:
+        """Возвращает данные рецепта с указанными ID."""
+        return {
+            'cooking_time': 1,
+            'image': create_base64_png(size=(1, 1)),
+            'ingredients': [
+                {'id': ingredient_id, 'amount': 1}
+                for ingredient_id in ingredient_ids],
+            'name': 'test_recipe_name',
+            'tags': tag_ids,
+            'text': 'test_recipe_text'}
+
+    def test_single_query_per_relation(
+            self, django_assert_num_queries) -> None:
+        """Тестирует загрузку всех тегов и ингредиентов одним запросом
+        для каждой модели и передачу объектов в validated_data."""
+        for num in range(1, 4):
+            create_ingredient_obj(num=num)
+            create_tag_obj(num=num)
+        serializer: RecipesSerializer = self.get_serializer(
+            data=self.get_data(ingredient_ids=[1, 2, 3], tag_ids=[3, 1, 3]))
+        with django_assert_num_queries(3):
+            assert serializer.is_valid(), serializer.errors
+        assert serializer.validated_data['tags'] == [
+            Tags.objects.get(id=3), Tags.objects.get(id=1)]
+        assert [
+            ingredient['id']
+            for ingredient in serializer.validated_data['recipe_ingredient']
+        ] == list(Ingredients.objects.order_by('id'))
+        return
+
+    @pytest.mark.parametrize('ingredient_ids, tag_ids, expected_errors', [
+        ([1, 100500, 2], [1],
+         {'ingredients': [
+             {},
+             {'id': ['Недопустимый первичный ключ "100500" '
+                     '- объект не существует.']},
+             {}]}),
+        ([1], [1, 100500, 'x'],
+         {'tags': [
+             {'id': ['Недопустимый первичный ключ "100500" '
+                     '- объект не существует.']},
+             {'id': ['Недопустимый формат ввода! '
+                     'Укажите список ID тегов.']}]})])
+    def test_errors(self, expected_errors, ingredient_ids, tag_ids) -> None:
+        """Тестирует ошибки для отдельных несуществующих ID."""
+        for num in range(1, 3):
+            create_ingredient_obj(num=num)
+            create_tag_obj(num=num)
+        serializer: RecipesSerializer = self.get_serializer(
+            data=self.get_data(
+                ingredient_ids=ingredient_ids, tag_ids=tag_ids))
+        assert not serializer.is_valid()
+        assert serializer.errors == expected_errors
+        return
+
+
+@pytest.mark.django_db
+class TestRecipesReadSerializer():
+    """Производит тест совпадения выдачи "RecipesReadSerializer"
+    и "RecipesSerializer"."""
+
+    def setup_method(self) -> None:
+        """Создает рецепты двух авторов с тегами, ингредиентами, разными
+        состояниями картинки и отметками пользователя."""
+        self.user: User = create_user_obj(num=1)
+        authors: list[User] = [create_user_obj(num=num) for num in (2, 3)]
+        tags: list[Tags] = [create_tag_obj(num=num) for num in (1, 2)]
+        ingredients: list[Ingredients] = [
+            create_ingredient_obj(num=num) for num in (1, 2, 3)]
+        recipes: list[Recipes] = [
+            create_recipe_obj(num=num, user=authors[num % 2])
+            for num in range(1, 6)]
+        Recipes.objects.filter(id=recipes[0].id).update(
+            image_status=RECIPES_IMAGE_STATUS_PENDING)
+        Recipes.objects.filter(id=recipes[1].id).update(
+            image_status=RECIPES_IMAGE_STATUS_FAILED)
+        Recipes.objects.filter(id=recipes[2].id).update(image_variants={
+            'card': 'recipes/variants/card.webp',
+            'detail': 'recipes/variants/detail.webp'})
+        for num, recipe in enumerate(recipes):
+            for tag in tags[:num % 3]:
+                create_recipe_tag_obj(recipe=recipe, tag=tag)
+            for ingredient in ingredients[num % 2:]:
+                create_recipe_ingredient_obj(
+                    amount=num + 0.5, ingredient=ingredient, recipe=recipe)
+        create_recipe_favorite_obj(recipe=recipes[0], user=self.user)
+        create_shopping_cart_obj(recipe=recipes[1], user=self.user)
+        create_subscription_obj(
+            subscriber=self.user, subscription_to=authors[0])
+        return
+
+    def get_context(self, action: str, anonymous: bool) -> dict:
+        """Возвращает контекст сериализатора для действия action."""
+        request = APIRequestFactory().get('/api/v1/recipes/')
+        request.user = AnonymousUser() if anonymous else self.user
+        return {'request': request, 'view': RecipesViewSet(action=action)}
+
+    @pytest.mark.parametrize('anonymous', [True, False])
+    @pytest.mark.parametrize('action', ['list', 'retrieve'])
+    def test_contract(self, action: str, anonymous: bool) -> None:
+        """Тестирует совпадение выдачи списка и отдельного рецепта."""
+        context: dict = self.get_context(action=action, anonymous=anonymous)
+        recipes: list[Recipes] = list(
+            Recipes.objects.select_related('author').prefetch_related(
+                Prefetch('recipe_ingredient',
+                         queryset=RecipesIngredients.objects.order_by()),
+                Prefetch('recipe_tag',
+                         queryset=RecipesTags.objects.order_by())))
+        rows: list[dict] = list(
+            Recipes.objects.values(*RECIPES_READ_VALUES))
+        expected: list[dict] = RecipesSerializer(
+            recipes, many=True, context=context).data
+        assert RecipesReadSerializer(
+            rows, many=True, context=context).data == expected
+        assert RecipesReadSerializer(
+            rows[0], context=context).data == expected[0]
+        return
+
+    def test_queries(self, django_assert_num_queries) -> None:
+        """Тестирует число запросов: связи и отметки пользователя
+        загружаются одним запросом на модель для всего списка."""
+        context: dict = self.get_context(action='list', anonymous=False)
+        rows: list[dict] = list(
+            Recipes.objects.values(*RECIPES_READ_VALUES))
+        RecipesReadSerializer(rows, many=True, context=context).data
+        with django_assert_num_queries(5):
+            RecipesReadSerializer(rows, many=True, context=context).data
+        return
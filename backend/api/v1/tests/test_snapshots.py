@@ -0,0 +1,78 @@
+import gzip
+import json
+
+import pytest
+from rest_framework import status
+
+from api.v1.serializers import IngredientsSerializer
+from api.v1.tests.test_views import URL_INGREDIENTS, anon_client
+from foodgram_app.catalog import get_catalog_cache
+from foodgram_app.models import Ingredients
+
+"""Названия тестовых ингредиентов (единица измерения - "г")."""
+TEST_INGREDIENTS_NAMES: list[str] = [
+    'мука', 'молоко', 'масло сливочное', 'соль', 'сахар', 'яйца']
+
+
+@pytest.mark.django_db
+class TestIngredientsSnapshot():
+    """Производит тест выдачи списка ингредиентов из снимка."""
+
+    def setup_method(self) -> None:
+        """Создает тестовые ингредиенты."""
+        for name in TEST_INGREDIENTS_NAMES:
+            Ingredients.objects.create(name=name, measurement_unit='г')
+        return
+
+    @pytest.mark.parametrize('name', [
+        None, '', 'м', 'МО', 'с', 'я', 'б', 'са', 'мас', 'молоко'])
+    def test_same_data(self, name: str) -> None:
+        """Тестирует совпадение выдачи с выдачей сериализатора для списка
+        без фильтра, коротких фильтров (из снимка) и длинных фильтров
+        (запрос к БД)."""
+        params: dict = {} if name is None else {'name': name}
+        response = anon_client().get(URL_INGREDIENTS, params)
+        assert response.status_code == status.HTTP_200_OK
+        queryset = Ingredients.objects.all()
+        if name:
+            queryset = queryset.filter(name__istartswith=name.lower())
+        assert json.loads(response.content) == IngredientsSerializer(
+            queryset, many=True).data
+        return
+
+    def test_no_queries(self, django_assert_num_queries, monkeypatch) -> None:
+        """Тестирует выдачу из снимка без запросов к БД и выдачу сжатого
+        тела только клиенту, принимающему gzip."""
+        monkeypatch.setattr(get_catalog_cache(), 'poll_interval', 60)
+        plain = anon_client().get(URL_INGREDIENTS)
+        with django_assert_num_queries(0):
+            compressed = anon_client().get(
+                URL_INGREDIENTS, {'name': 'м'}, HTTP_ACCEPT_ENCODING='gzip')
+        assert compressed['Content-Encoding'] == 'gzip'
+        assert [ingredient['name'] for ingredient in json.loads(
+            gzip.decompress(compressed.content))] == [
+                'масло сливочное', 'молоко', 'мука']
+        assert not plain.has_header('Content-Encoding')
+        refused = anon_client().get(
+            URL_INGREDIENTS, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        assert not refused.has_header('Content-Encoding')
+        assert refused.content == plain.content
+        return
+
+    def test_rebuild(self) -> None:
+        """Тестирует обновление снимка при изменении ингредиентов."""
+        assert len(anon_client().get(URL_INGREDIENTS).json()) == 6
+        Ingredients.objects.create(name='мед', measurement_unit='г')
+        Ingredients.objects.filter(name='яйца').delete()
+        names: list[str] = [
+            ingredient['name']
+            for ingredient in anon_client().get(URL_INGREDIENTS).json()]
+        assert names == sorted({*TEST_INGREDIENTS_NAMES, 'мед'} - {'яйца'})
+        return
+
+    def test_browsable_api(self) -> None:
+        """Тестирует выдачу browsable API без снимка."""
+        response = anon_client().get(URL_INGREDIENTS, {'format': 'api'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'].startswith('text/html')
+        return
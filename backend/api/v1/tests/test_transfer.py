@@ -0,0 +1,112 @@
+import json
+from io import BytesIO
+
+import pytest
+from rest_framework import status
+
+from api.v1 import transfer, views
+from api.v1.tests.test_serializers import create_base64_png
+from api.v1.tests.test_views import URL_RECIPES_IMPORT, admin_token_client
+from api.v1.transfer import NDJSON_CONTENT_TYPE, import_recipes, read_lines
+from foodgram_app.models import Recipes
+from foodgram_app.tests.test_models import (
+    create_ingredient_obj, create_tag_obj, create_user_obj)
+
+
+@pytest.mark.parametrize('lines, size, max_bytes, expected', [
+    ([b'aa', b'bb', b'cc'], 2, 100, [[1, 2], [3]]),
+    ([b'aa', b'bb', b'cc'], 10, 4, [[1, 2], [3]]),
+    ([b'aa', b'bbbbbb', b'cc'], 10, 4, [[1], [2], [3]]),
+    ([b'aaaa', b'b', b'c', b'd'], 10, 3, [[1], [2, 3, 4]]),
+    ([], 10, 4, [])])
+def test_line_chunks(
+        lines: list[bytes],
+        size: int,
+        max_bytes: int,
+        expected: list[list[int]]) -> None:
+    """Тестирует разбиение строк NDJSON на пачки по числу строк и размеру:
+    строка больше ограничения размера образует отдельную пачку."""
+    chunks: list[list[tuple[int, bytes]]] = list(transfer._line_chunks(
+        lines=lines, size=size, max_bytes=max_bytes))
+    assert [[line_number for line_number, _ in chunk]
+            for chunk in chunks] == expected
+    assert [line for chunk in chunks for _, line in chunk] == lines
+    return
+
+
+@pytest.mark.parametrize('body, expected', [
+    (b'aaaa\nbb\ncc', [b'aaaa\n', b'bb\n', b'cc']),
+    (b'aaaaa\nbb\n', [None, b'bb\n']),
+    (b'aaaaaaaaaaaa\nbb', [None, b'bb']),
+    (b'bb\naaaaaaaaaaaa', [b'bb\n', None]),
+    (b'', [])])
+def test_read_lines(body: bytes, expected: list[bytes]) -> None:
+    """Тестирует чтение строк с ограничением длины: вместо строки длиннее
+    ограничения возвращается None, чтение продолжается со следующей
+    строки."""
+    assert list(read_lines(stream=BytesIO(body), max_line_bytes=4)) == (
+        expected)
+    return
+
+
+@pytest.mark.django_db
+def test_import_long_line() -> None:
+    """Тестирует отклонение слишком длинной строки как ошибки строки."""
+    report: dict = import_recipes(
+        lines=read_lines(stream=BytesIO(b'{}\n' + b'x' * 100 + b'\n{}\n'),
+                         max_line_bytes=10),
+        author=create_user_obj(num=1))
+    assert report['created'] == 0
+    assert [error['line'] for error in report['errors']] == [1, 2, 3]
+    assert report['errors'][1]['errors'] == {
+        'non_field_errors': ['Строка превышает допустимый размер.']}
+    return
+
+
+@pytest.mark.django_db
+def test_import_request_too_large(monkeypatch) -> None:
+    """Тестирует отклонение тела запроса импорта больше
+    "RECIPES_TRANSFER_REQUEST_MAX_BYTES" байт."""
+    create_user_obj(num=1)
+    monkeypatch.setattr(views, 'RECIPES_TRANSFER_REQUEST_MAX_BYTES', 4)
+    response = admin_token_client(user_id=1).post(
+        URL_RECIPES_IMPORT, data=b'{}\n{}\n',
+        content_type=NDJSON_CONTENT_TYPE)
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    return
+
+
+@pytest.mark.django_db
+def test_import_closes_images(monkeypatch) -> None:
+    """Тестирует, что декодированные картинки каждой пачки закрываются
+    после ее сохранения, в том числе картинки отклоненных строк."""
+    create_tag_obj(num=1)
+    ingredient = create_ingredient_obj(num=1)
+    recipe: dict = {
+        'text': 'test_recipe_text',
+        'cooking_time': 1,
+        'image': create_base64_png(size=(2, 2)),
+        'tags': ['test_tag_slug_1'],
+        'ingredients': [{
+            'name': ingredient.name,
+            'measurement_unit': ingredient.measurement_unit,
+            'amount': 1}]}
+    lines: list[bytes] = [
+        json.dumps({**recipe, 'name': name}).encode()
+        for name in ('imported_1', 'imported_2', 'imported_1')]
+    closed: list[bool] = []
+    close_images = transfer._close_images
+
+    def record_close_images(records: list[tuple[int, dict]]) -> None:
+        close_images(records=records)
+        closed.extend(data['image'].closed for _, data in records)
+        return
+
+    monkeypatch.setattr(transfer, '_close_images', record_close_images)
+    report: dict = import_recipes(
+        lines=lines, author=create_user_obj(num=1), chunk_max_bytes=1)
+    assert report['created'] == 2
+    assert [error['line'] for error in report['errors']] == [3]
+    assert closed == [True, True, True]
+    assert Recipes.objects.filter(name__startswith='imported_').count() == 2
+    return
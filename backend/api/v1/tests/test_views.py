@@ -1,20 +1,27 @@
 import json
 import os
+from io import StringIO
 
 import pytest
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
 from pathlib import Path
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 
+from api.v1.transfer import NDJSON_CONTENT_TYPE
 from api.v1.serializers import (
     USER_EMAIL_MAX_LEN, USER_FIRST_NAME_MAX_LEN, USER_PASSWORD_MAX_LEN,
     USER_SECOND_NAME_MAX_LEN, USER_USERNAME_MAX_LEN)
+from foodgram_app.catalog import get_catalog_cache
+from foodgram_app.ingredient_index import get_ingredient_index_cache
+from foodgram_app.similarity import build_similar_recipes
 from foodgram_app.models import (
-    RECIPES_MEDIA_ROOT,
-    Ingredients, Recipes, Subscriptions, Tags)
+    RECIPES_IMAGE_STATUS_READY, RECIPES_MEDIA_ROOT,
+    Ingredients, RecipeRecommendations, Recipes, RecipesFavorites,
+    RecipesIngredients, RecipesTags, ShoppingCarts, Subscriptions, Tags)
 from foodgram_app.tests.test_models import (
     create_ingredient_obj, create_recipe_ingredient_obj, create_recipe_obj,
     create_recipe_tag_obj, create_shopping_cart_obj, create_tag_obj,
@@ -29,6 +36,13 @@ URL_INGREDIENTS_PK: str = URL_INGREDIENTS + '{pk}/'
 URL_RECIPES: str = f'{URL_API_V1}recipes/'
 URL_RECIPES_PK: str = URL_RECIPES + '{pk}/'
 URL_RECIPES_FAVORITE: str = f'{URL_RECIPES_PK}favorite/'
+URL_RECIPES_BULK_FAVORITE: str = f'{URL_RECIPES}bulk_favorite/'
+URL_RECIPES_BULK_SHOPPING_CART: str = f'{URL_RECIPES}bulk_shopping_cart/'
+URL_RECIPES_BY_INGREDIENTS: str = f'{URL_RECIPES}by_ingredients/'
+URL_RECIPES_EXPORT: str = f'{URL_RECIPES}export/'
+URL_RECIPES_IMPORT: str = f'{URL_RECIPES}import/'
+URL_RECIPES_RECOMMENDED: str = f'{URL_RECIPES}recommended/'
+URL_RECIPES_SIMILAR: str = f'{URL_RECIPES_PK}similar/'
 URL_TAGS: str = f'{URL_API_V1}tags/'
 URL_TAGS_PK: str = URL_TAGS + '{pk}/'
 URL_SHOPPING_LIST: str = f'{URL_RECIPES}download_shopping_cart/'
@@ -162,6 +176,38 @@ class TestAuth():
         assert data == {'auth_token': token.key}
         return
 
+    def test_users_login_single_query(
+            self, django_assert_num_queries) -> None:
+        """Тест того, что при наличии токена вход в систему по эндпоинту
+        "/api/auth/token/login/" выполняет один запрос к БД: пользователь
+        загружается вместе с токеном."""
+        test_user: User = create_user_obj_with_hash(num=1)
+        token, _ = Token.objects.get_or_create(user=test_user)
+        data: dict = {
+            'email': 'test_user_email_1@email.com',
+            'password': 'test_user_password_1'}
+        with django_assert_num_queries(1):
+            response = anon_client().post(URL_AUTH_LOGIN, data, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert json.loads(response.content) == {'auth_token': token.key}
+        return
+
+    @pytest.mark.parametrize('email, password', [
+        ('test_user_email_1@email.com', 'wrong_password'),
+        ('wrong_email@email.com', 'test_user_password_1')])
+    def test_users_login_invalid(self, email: str, password: str) -> None:
+        """Тест POST-запроса на страницу получения токена по эндпоинту
+        "/api/auth/token/login/" с неверной почтой или паролем: ответ
+        не должен выдавать, что именно указано неверно."""
+        create_user_obj_with_hash(num=1)
+        data: dict = {'email': email, 'password': password}
+        response = anon_client().post(URL_AUTH_LOGIN, data, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert json.loads(response.content) == {'non_field_errors': [
+            'Указана неверная электронная почта или пароль!']}
+        assert not Token.objects.exists()
+        return
+
     @pytest.mark.parametrize('client_func', [anon_client, auth_client])
     @pytest.mark.parametrize('method', ['delete', 'get', 'patch', 'put'])
     def test_users_login_not_allowed(self, client_func, method: str) -> None:
@@ -993,6 +1039,101 @@ class TestRecipesViewSet():
         assert results_pagination[0] == expected_data
         return
 
+    @pytest.mark.parametrize('count', [1, TEST_FIXTURES_OBJ_AMOUNT])
+    def test_recipes_get_queries(
+            self, count: int, django_assert_num_queries, monkeypatch) -> None:
+        """Тест числа запросов списка рецептов "/api/v1/recipes/": теги
+        и ингредиенты берутся из справочника процесса, из БД читаются
+        только связи (число запросов не зависит от числа рецептов)."""
+        user: User = create_user_obj(num=1)
+        tag: Tags = create_tag_obj(num=1)
+        ingredient: Ingredients = create_ingredient_obj(num=1)
+        for num in range(1, count + 1):
+            recipe: Recipes = create_recipe_obj(num=num, user=user)
+            create_recipe_tag_obj(recipe=recipe, tag=tag)
+            create_recipe_ingredient_obj(
+                amount=num, ingredient=ingredient, recipe=recipe)
+        monkeypatch.setattr(get_catalog_cache(), 'poll_interval', 60)
+        get_catalog_cache().get()
+        with django_assert_num_queries(4):
+            response = anon_client().get(URL_RECIPES)
+        results: list[dict] = response.json()['results']
+        assert len(results) == count
+        assert results[0]['tags'] == [{
+            'id': tag.id, 'name': tag.name, 'color': tag.color,
+            'slug': tag.slug}]
+        assert results[0]['ingredients'] == [{
+            'id': ingredient.id, 'name': ingredient.name,
+            'measurement_unit': ingredient.measurement_unit,
+            'amount': count}]
+        return
+
+    @pytest.mark.parametrize('search, expected_ids', [
+        ('борщ', [2, 1]),
+        ('БОР', [2, 1]),
+        ('свекла', [1]),
+        ('test_recipe_name_3', [3]),
+        ('пельмени', [])])
+    def test_recipes_search(
+            self,
+            search: str,
+            expected_ids: list[int],
+            create_recipes_ingredients_tags_users) -> None:
+        """Тест поиска рецептов "/api/v1/recipes/?search=...": рецепт
+        с запросом в названии выше рецепта с запросом в описании."""
+        Recipes.objects.filter(id=1).update(
+            text='Густой борщ: свекла, капуста и картофель.')
+        recipe: Recipes = Recipes.objects.get(id=2)
+        recipe.name = 'Борщ по-домашнему'
+        recipe.save()
+        response = anon_client().get(URL_RECIPES, {'search': search})
+        assert response.status_code == status.HTTP_200_OK
+        assert [recipe['id'] for recipe in json.loads(
+            response.content)['results']] == expected_ids
+        return
+
+    @pytest.mark.parametrize('params, expected_ids', [
+        ({'cooking_time__lte': 10}, [2]),
+        ({'cooking_time__gte': 30}, [3, 1]),
+        ({'cooking_time__gte': 11, 'cooking_time__lte': 29}, []),
+        ({'ordering': 'cooking_time'}, [2, 3, 1]),
+        ({'ordering': 'cooking_time',
+          'tags': ['test_tag_slug_1', 'test_tag_slug_2']}, [2, 3, 1]),
+        ({'cooking_time__gte': 30, 'tags': 'test_tag_slug_1'}, [3, 1]),
+        ({'author': 1, 'cooking_time__lte': 30,
+          'ordering': 'cooking_time'}, [1]),
+        ({'cooking_time__gte': 30, 'is_favorited': 1}, [1])])
+    def test_recipes_cooking_time(
+            self,
+            params: dict,
+            expected_ids: list[int],
+            create_recipes_ingredients_tags_users) -> None:
+        """Тест фильтрации рецептов по времени приготовления
+        "/api/v1/recipes/?cooking_time__lte=..." и сортировки
+        "?ordering=cooking_time" совместно с другими фильтрами."""
+        Recipes.objects.filter(id__in=(1, 3)).update(cooking_time=30)
+        Recipes.objects.filter(id=2).update(cooking_time=10)
+        create_recipe_tag_obj(
+            recipe=Recipes.objects.get(id=3), tag=Tags.objects.get(id=1))
+        for recipe_id in (1, 2):
+            RecipesFavorites.objects.create(recipe_id=recipe_id, user_id=1)
+        response = auth_token_client().get(URL_RECIPES, params)
+        assert response.status_code == status.HTTP_200_OK
+        assert [recipe['id'] for recipe in json.loads(
+            response.content)['results']] == expected_ids
+        return
+
+    @pytest.mark.parametrize('params', [
+        {'ordering': '-name'},
+        {'cooking_time__lte': 'fast'}])
+    def test_recipes_cooking_time_invalid(
+            self, params: dict, create_recipes_users) -> None:
+        """Тест недопустимых значений фильтра по времени приготовления
+        и сортировки "/api/v1/recipes/"."""
+        response = anon_client().get(URL_RECIPES, params)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        return
+
     @pytest.mark.parametrize(
         'client_func, status_code',
         [(anon_client, status.HTTP_401_UNAUTHORIZED),
@@ -1194,6 +1335,40 @@ class TestRecipesViewSet():
         assert response.status_code == status_code_another
         return
 
+    def test_recipes_pk_patch_diff(
+            self,
+            create_recipes_ingredients_tags_users) -> None:
+        """Тест PATCH-запроса на рецепт по эндпоинту "/api/v1/recipes/{pk}/":
+            - без полей "ingredients" и "tags" связи не затрагиваются,
+              незаполненные поля рецепта сохраняют значения;
+            - с полями "ingredients" и "tags" неизменные связи сохраняются,
+              изменившиеся обновляются, лишние удаляются, новые создаются."""
+        client: APIClient = anon_client()
+        client.force_authenticate(user=User.objects.get(id=1))
+        url: str = URL_RECIPES_PK.format(pk=1)
+        relations_before: list = list(
+            RecipesIngredients.objects.values_list('id', 'amount'))
+        response = client.patch(
+            url, data={'name': 'patch_name'}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        recipe: Recipes = Recipes.objects.get(id=1)
+        assert (recipe.name, recipe.cooking_time) == ('patch_name', 1)
+        assert list(RecipesIngredients.objects.values_list(
+            'id', 'amount')) == relations_before
+        kept_id: int = RecipesIngredients.objects.get(recipe_id=1).id
+        response = client.patch(url, data={
+            'ingredients': [{'id': 1, 'amount': 10}, {'id': 2, 'amount': 2}],
+            'tags': [2]}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert list(RecipesIngredients.objects.filter(recipe_id=1).values_list(
+            'ingredient_id', 'amount')) == [(1, 10), (2, 2)]
+        assert RecipesIngredients.objects.get(
+            recipe_id=1, ingredient_id=1).id == kept_id
+        assert list(RecipesTags.objects.filter(recipe_id=1).values_list(
+            'tag_id', flat=True)) == [2]
+        assert [tag['id'] for tag in response.json()['tags']] == [2]
+        return
+
     @pytest.mark.parametrize(
         'client_func, status_code',
         [(anon_client, status.HTTP_401_UNAUTHORIZED),
@@ -1285,6 +1460,259 @@ class TestRecipesViewSet():
         assert response.headers['Content-Type'] == 'text/csv'
         return
 
+    @pytest.mark.parametrize('url, error_key, exists_msg, missing_msg', [
+        (URL_RECIPES_FAVORITE,
+         'recipe',
+         'Ошибка добавления. Рецепт уже находится в избранном.',
+         'Ошибка удаления. Рецепта нет в избранном.'),
+        (URL_SHOPPING_UPDATE,
+         'non_field_errors',
+         'Ошибка добавления. Рецепт уже находится в корзине.',
+         'Ошибка удаления. Рецепта нет в корзине.')])
+    def test_recipes_pk_update_relation(
+            self,
+            url: str,
+            error_key: str,
+            exists_msg: str,
+            missing_msg: str,
+            django_assert_num_queries,
+            create_recipes_users) -> None:
+        """Тест POST и DELETE-запросов на добавление рецепта
+        в избранное/корзину и удаление оттуда по эндпоинтам:
+            - "/api/v1/recipes/{pk}/favorite/";
+            - "/api/v1/recipes/{pk}/shopping_cart/".
+        Проверяется, что изменение выполняется одним запросом к БД, а
+        повторные операции возвращают ошибку."""
+        client: APIClient = anon_client()
+        client.force_authenticate(user=User.objects.get(id=1))
+        with django_assert_num_queries(2):
+            response = client.post(url.format(pk=2))
+        assert response.status_code == status.HTTP_201_CREATED
+        assert json.loads(response.content) == {
+            'id': 2,
+            'name': 'test_recipe_name_2',
+            'image': (
+                f'/media/{Recipes.objects.get(id=2).image.name}'),
+            'cooking_time': 2}
+        response = client.post(url.format(pk=2))
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert json.loads(response.content) == {error_key: [exists_msg]}
+        response = client.post(url.format(pk=100))
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert json.loads(response.content) == {'recipe': [
+            'Недопустимый первичный ключ "100" - объект не существует.']}
+        with django_assert_num_queries(1):
+            response = client.delete(url.format(pk=2))
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        response = client.delete(url.format(pk=2))
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert json.loads(response.content) == {error_key: [missing_msg]}
+        return
+
+    @pytest.mark.parametrize('url, model', [
+        (URL_RECIPES_BULK_FAVORITE, RecipesFavorites),
+        (URL_RECIPES_BULK_SHOPPING_CART, ShoppingCarts)])
+    def test_recipes_bulk_update(
+            self, url: str, model, create_recipes_users) -> None:
+        """Тест POST и DELETE-запросов на массовое добавление рецептов
+        в избранное/корзину и удаление оттуда по эндпоинтам:
+            - "/api/v1/recipes/bulk_favorite/";
+            - "/api/v1/recipes/bulk_shopping_cart/".
+        Рецепт 1 заранее добавлен пользователем, рецепта 100 не существует,
+        рецепт 2 указан в запросе дважды."""
+        user: User = User.objects.get(id=1)
+        model.objects.create(recipe=Recipes.objects.get(id=1), user=user)
+        data: dict = {'recipes': [2, 1, 100, 2]}
+        response = anon_client().post(url, data=data, format='json')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        client: APIClient = auth_token_client(user_id=1)
+        response = client.post(url, data=data, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert json.loads(response.content) == {'results': [
+            {'id': 2, 'status': 'created'},
+            {'id': 1, 'status': 'exists'},
+            {'id': 100, 'status': 'not_found'}]}
+        assert set(model.objects.filter(user=user).values_list(
+            'recipe_id', flat=True)) == {1, 2}
+        data: dict = {'recipes': [1, 3]}
+        response = client.delete(url, data=data, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert json.loads(response.content) == {'results': [
+            {'id': 1, 'status': 'deleted'},
+            {'id': 3, 'status': 'absent'}]}
+        assert list(model.objects.filter(user=user).values_list(
+            'recipe_id', flat=True)) == [2]
+        response = client.post(url, data={'recipes': []}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        return
+
+    @pytest.mark.parametrize('params, expected', [
+        ({'ingredients': [1, 2]}, [(2, 1.0), (1, 0.5)]),
+        ({'ingredients': [1, 2], 'min_coverage': 0.6}, [(2, 1.0)]),
+        ({'ingredients': [3]}, [(3, 1.0), (1, 0.5)]),
+        ({'ingredients': [100]}, [])])
+    def test_recipes_by_ingredients(
+            self,
+            params: dict,
+            expected: list[tuple[int, float]],
+            create_recipes_ingredients_tags_users) -> None:
+        """Тест поиска рецептов по ингредиентам по эндпоинту
+        "/api/v1/recipes/by_ingredients/". Рецепт 1 содержит ингредиенты
+        1 и 3, рецепт 2 - 1 и 2, рецепт 3 - 3."""
+        get_ingredient_index_cache().clear()
+        create_recipe_ingredient_obj(
+            amount=1,
+            ingredient=Ingredients.objects.get(id=1),
+            recipe=Recipes.objects.get(id=2))
+        create_recipe_ingredient_obj(
+            amount=1,
+            ingredient=Ingredients.objects.get(id=3),
+            recipe=Recipes.objects.get(id=1))
+        response = anon_client().get(URL_RECIPES_BY_INGREDIENTS, params)
+        assert response.status_code == status.HTTP_200_OK
+        data: dict = json.loads(response.content)
+        assert data['count'] == len(expected)
+        assert [(recipe['id'], recipe['coverage'])
+                for recipe in data['results']] == expected
+        for params in ({}, {'ingredients': ['x']},
+                       {'ingredients': [1], 'min_coverage': 2}):
+            response = anon_client().get(URL_RECIPES_BY_INGREDIENTS, params)
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+        return
+
+    @pytest.mark.parametrize('pk, expected', [
+        (1, [(3, 0.5), (2, 0.5)]),
+        (2, [(1, 0.5), (3, 0.3333)]),
+        (100, None)])
+    def test_recipes_similar(
+            self,
+            pk: int,
+            expected: list[tuple[int, float]],
+            create_recipes_ingredients_tags_users) -> None:
+        """Тест похожих рецептов по эндпоинту "/api/v1/recipes/{id}/similar/".
+        Рецепт 1 содержит ингредиент 1, рецепт 2 - 1 и 2, рецепт 3 - 1 и 3."""
+        for recipe_id in (2, 3):
+            create_recipe_ingredient_obj(
+                amount=1,
+                ingredient=Ingredients.objects.get(id=1),
+                recipe=Recipes.objects.get(id=recipe_id))
+        build_similar_recipes()
+        response = anon_client().get(URL_RECIPES_SIMILAR.format(pk=pk))
+        if expected is None:
+            assert response.status_code == status.HTTP_404_NOT_FOUND
+            return
+        assert response.status_code == status.HTTP_200_OK
+        assert [(recipe['id'], recipe['similarity'])
+                for recipe in json.loads(response.content)['results']
+                ] == expected
+        return
+
+    def test_recipes_recommended(self) -> None:
+        """Тест персональных рекомендаций по эндпоинту
+        "/api/v1/recipes/recommended/": выдача по месту в рекомендациях,
+        страницы по курсору, пропуск удаленных рецептов."""
+        user: User = create_user_obj(num=1)
+        recipes: list[Recipes] = [
+            create_recipe_obj(num=num, user=user) for num in range(1, 9)]
+        RecipeRecommendations.objects.bulk_create([
+            RecipeRecommendations(
+                rank=rank, recipe_id=recipe.id, score=1 / rank, user=user)
+            for rank, recipe in enumerate(reversed(recipes), start=1)])
+        recipes[6].delete()
+        response = anon_client().get(URL_RECIPES_RECOMMENDED)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        client: APIClient = auth_token_client(user_id=user.id)
+        data: dict = client.get(URL_RECIPES_RECOMMENDED).json()
+        assert [recipe['id'] for recipe in data['results']] == [
+            recipe.id for recipe in (recipes[7], *recipes[5:1:-1])]
+        data = client.get(data['next']).json()
+        assert [recipe['id'] for recipe in data['results']] == [
+            recipes[1].id, recipes[0].id]
+        assert data['next'] is None
+        return
+
+    def test_recipes_export_import(
+            self,
+            django_capture_on_commit_callbacks,
+            create_recipes_ingredients_tags_users) -> None:
+        """Тест выгрузки и загрузки рецептов в формате NDJSON по эндпоинтам:
+            - "/api/v1/recipes/export/";
+            - "/api/v1/recipes/import/".
+        Выгруженные рецепты загружаются под новыми названиями вместе
+        со строками с ошибками, которые должны быть пропущены."""
+        assert anon_client().get(URL_RECIPES_EXPORT).status_code == (
+            status.HTTP_401_UNAUTHORIZED)
+        assert auth_token_client(user_id=2).get(
+            URL_RECIPES_EXPORT).status_code == status.HTTP_403_FORBIDDEN
+        client: APIClient = admin_token_client(user_id=1)
+        response = client.get(URL_RECIPES_EXPORT)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == NDJSON_CONTENT_TYPE
+        exported: list[dict] = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()]
+        assert [recipe['name'] for recipe in exported] == [
+            f'test_recipe_name_{i}'
+            for i in range(1, TEST_FIXTURES_OBJ_AMOUNT + 1)]
+        assert exported[0]['tags'] == ['test_tag_slug_1']
+        assert exported[0]['ingredients'] == [{
+            'name': 'test_ingredient_name_1',
+            'measurement_unit': 'батон',
+            'amount': 1.0}]
+        assert exported[0]['image'].startswith('data:image/gif;base64,')
+        lines: list[bytes] = []
+        for recipe in exported:
+            recipe['name'] = f'imported_{recipe["name"]}'
+            lines.append(json.dumps(recipe).encode())
+        lines.append(json.dumps(exported[0]).encode())
+        lines.append(b'{"name": ')
+        lines.append(json.dumps({**exported[0], 'name': 'imported_invalid',
+                                 'tags': ['unknown_tag']}).encode())
+        body: bytes = b'\n'.join(lines) + b'\n'
+        response = client.post(URL_RECIPES_IMPORT, data=body,
+                               content_type='application/json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(URL_RECIPES_IMPORT, data=body,
+                                   content_type=NDJSON_CONTENT_TYPE)
+        assert response.status_code == status.HTTP_201_CREATED
+        report: dict = json.loads(response.content)
+        assert report['created'] == TEST_FIXTURES_OBJ_AMOUNT
+        assert [error['line'] for error in report['errors']] == [4, 5, 6]
+        assert list(report['errors'][2]['errors']) == ['tags']
+        recipe: Recipes = Recipes.objects.get(
+            name='imported_test_recipe_name_2')
+        assert recipe.author_id == 1
+        assert recipe.image_status == RECIPES_IMAGE_STATUS_READY
+        assert list(recipe.tags.values_list('slug', flat=True)) == [
+            'test_tag_slug_2']
+        assert list(RecipesIngredients.objects.filter(
+            recipe=recipe).values_list('ingredient__name', 'amount')) == [
+                ('test_ingredient_name_2', 2.0)]
+        return
+
+    def test_recipes_transfer_commands(
+            self, tmp_path, create_recipes_ingredients_tags_users) -> None:
+        """Тест команд "export_recipes" и "import_recipes": выгруженные
+        рецепты загружаются повторно, строки с занятыми названиями
+        пропускаются."""
+        path: Path = tmp_path / 'recipes.ndjson'
+        call_command('export_recipes', output=str(path))
+        lines: list[str] = path.read_text().splitlines()
+        assert len(lines) == TEST_FIXTURES_OBJ_AMOUNT
+        recipe: dict = json.loads(lines[0])
+        recipe['name'] = 'imported_recipe'
+        path.write_text('\n'.join([*lines, json.dumps(recipe)]))
+        stdout: StringIO = StringIO()
+        call_command(
+            'import_recipes', str(path), author='test_user_username_2',
+            chunk_max_bytes=1, stdout=stdout, stderr=StringIO())
+        assert 'Создано рецептов: 1, пропущено строк: 3.' in stdout.getvalue()
+        assert Recipes.objects.get(name='imported_recipe').author_id == 2
+        with pytest.raises(CommandError):
+            call_command('import_recipes', str(path), author='unknown')
+        return
+
 
 @pytest.mark.django_db
 class TestTagsViewSet():
@@ -0,0 +1,323 @@
+"""
+Создает массовый импорт и экспорт рецептов проекта "Foodgram" в формате
+NDJSON (одна строка - один JSON-объект рецепта).
+
+Формат строки совпадает для импорта и экспорта:
+    {"name": "...", "text": "...", "cooking_time": 10,
+     "image": "data:image/png;base64,...",
+     "tags": ["breakfast", ...],
+     "ingredients": [{"name": "...", "measurement_unit": "г",
+                      "amount": 100}, ...]}
+Теги задаются slug, ингредиенты - названием и единицей измерения, так как
+ID объектов различаются в разных окружениях.
+
+Импорт обрабатывает строки пачками не более "RECIPES_TRANSFER_CHUNK_SIZE"
+строк и не более "RECIPES_TRANSFER_CHUNK_MAX_BYTES" байт (строки содержат
+картинки в base64, поэтому пачка ограничивается и по размеру): теги,
+ингредиенты и занятые названия рецептов загружаются для пачки тремя
+запросами, объекты "Recipes", "RecipesIngredients" и "RecipesTags"
+создаются через bulk_create в одной транзакции на пачку. Картинки
+обрабатываются в пуле потоков после фиксации транзакции
+(см. "foodgram_app/tasks.py"), декодированные картинки пачки
+закрываются после ее сохранения. Строки с ошибками пропускаются и
+перечисляются в отчете импорта с номерами строк.
+
+Строки читаются из потока функцией "read_lines" не длиннее
+"RECIPES_TRANSFER_LINE_MAX_BYTES" байт (картинка "RECIPES_IMAGE_MAX_BYTES"
+в base64 и остальные поля рецепта), более длинные строки отклоняются как
+ошибки строк без загрузки в память.
+
+Экспорт читает рецепты серверным курсором (QuerySet.iterator) и загружает
+ингредиенты и теги двумя запросами на пачку рецептов.
+
+Функции:
+    - export_recipes;
+    - import_recipes;
+    - read_lines.
+"""
+import base64
+import json
+import logging
+import mimetypes
+from itertools import islice
+from typing import Iterable, Iterator
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import QuerySet
+
+from api.v1.serializers import (
+    RECIPES_IMAGE_MAX_BYTES, RecipesTransferSerializer)
+from foodgram_app.models import (
+    RECIPES_IMAGE_STATUS_PENDING,
+    Ingredients, Recipes, RecipesIngredients, RecipesIngredientsLog,
+    RecipesTags, Tags)
+from foodgram_app.storage import recipes_image_storage
+from foodgram_app.tasks import schedule_recipe_image
+
+NDJSON_CONTENT_TYPE: str = 'application/x-ndjson'
+RECIPES_TRANSFER_CHUNK_MAX_BYTES: int = 32 * 1024 * 1024
+RECIPES_TRANSFER_CHUNK_SIZE: int = 200
+RECIPES_TRANSFER_LINE_MAX_BYTES: int = (
+    RECIPES_IMAGE_MAX_BYTES * 4 // 3 + 1024 * 1024)
+RECIPES_TRANSFER_REQUEST_MAX_BYTES: int = 1024 * 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[list]:
+    """Вспомогательная функция: разбивает iterable на списки
+    по size элементов."""
+    iterator: Iterator = iter(iterable)
+    while True:
+        chunk: list = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def read_lines(
+        stream,
+        max_line_bytes: int = RECIPES_TRANSFER_LINE_MAX_BYTES
+) -> Iterator[bytes]:
+    """Читает строки из бинарного потока stream, загружая в память
+    не более max_line_bytes байт на строку. Вместо строки длиннее
+    max_line_bytes возвращает None, остаток такой строки пропускается
+    (импорт отклоняет ее как ошибку строки)."""
+    while True:
+        line: bytes = stream.readline(max_line_bytes + 1)
+        if not line:
+            return
+        if line.endswith(b'\n') or len(line) <= max_line_bytes:
+            yield line
+            continue
+        while line and not line.endswith(b'\n'):
+            line = stream.readline(max_line_bytes + 1)
+        yield None
+
+
+def _line_chunks(
+        lines: Iterable[bytes],
+        size: int,
+        max_bytes: int) -> Iterator[list[tuple[int, bytes]]]:
+    """Вспомогательная функция: разбивает строки lines на списки пар
+    (номер строки, строка) не более size строк и не более max_bytes байт.
+    Строка больше max_bytes образует отдельный список. Отклоненные
+    "read_lines" строки (None) передаются без учета размера."""
+    chunk: list[tuple[int, bytes]] = []
+    chunk_bytes: int = 0
+    for line_number, line in enumerate(lines, start=1):
+        line_bytes: int = len(line) if line is not None else 0
+        if chunk and chunk_bytes + line_bytes > max_bytes:
+            yield chunk
+            chunk, chunk_bytes = [], 0
+        chunk.append((line_number, line))
+        chunk_bytes += line_bytes
+        if len(chunk) >= size:
+            yield chunk
+            chunk, chunk_bytes = [], 0
+    if chunk:
+        yield chunk
+    return
+
+
+def _encode_image(name: str, storage) -> str:
+    """Вспомогательная функция: возвращает картинку рецепта в формате
+    base64 ("data:image/png;base64,...") или None, если файл недоступен."""
+    try:
+        with storage.open(name) as file:
+            content: bytes = file.read()
+    except OSError:
+        logger.warning('Картинка рецепта "%s" недоступна для экспорта.', name)
+        return None
+    mime_type: str = mimetypes.guess_type(name)[0] or 'image/png'
+    return (f'data:{mime_type};base64,'
+            f'{base64.b64encode(content).decode("ascii")}')
+
+
+def export_recipes(
+        recipes: QuerySet,
+        chunk_size: int = RECIPES_TRANSFER_CHUNK_SIZE) -> Iterator[bytes]:
+    """Возвращает генератор строк NDJSON (bytes) с рецептами из QuerySet
+    recipes в порядке возрастания ID."""
+    rows: Iterator[dict] = recipes.order_by('id').values(
+        'id', 'name', 'text', 'cooking_time', 'image').iterator(
+            chunk_size=chunk_size)
+    for chunk in _chunks(rows, chunk_size):
+        recipe_ids: list[int] = [row['id'] for row in chunk]
+        ingredients: dict[int, list[dict]] = {}
+        for recipe_id, name, unit, amount in (
+                RecipesIngredients.objects.filter(recipe_id__in=recipe_ids)
+                .order_by('id').values_list(
+                    'recipe_id', 'ingredient__name',
+                    'ingredient__measurement_unit', 'amount')):
+            ingredients.setdefault(recipe_id, []).append(
+                {'name': name, 'measurement_unit': unit, 'amount': amount})
+        tags: dict[int, list[str]] = {}
+        for recipe_id, slug in (
+                RecipesTags.objects.filter(recipe_id__in=recipe_ids)
+                .order_by('id').values_list('recipe_id', 'tag__slug')):
+            tags.setdefault(recipe_id, []).append(slug)
+        for row in chunk:
+            recipe: dict = {
+                'name': row['name'],
+                'text': row['text'],
+                'cooking_time': row['cooking_time'],
+                'image': _encode_image(
+                    name=row['image'], storage=recipes_image_storage),
+                'tags': tags.get(row['id'], []),
+                'ingredients': ingredients.get(row['id'], [])}
+            yield json.dumps(recipe, ensure_ascii=False).encode() + b'\n'
+
+
+def _parse_lines(
+        lines: list[tuple[int, bytes]],
+        errors: list[dict]) -> list[tuple[int, dict]]:
+    """Вспомогательная функция: разбирает и проверяет строки пачки
+    сериализатором "RecipesTransferSerializer" без запросов к БД.
+    Возвращает пары (номер строки, проверенные данные), ошибки добавляет
+    в errors."""
+    records: list[tuple[int, dict]] = []
+    for line_number, line in lines:
+        if line is None:
+            errors.append({
+                'line': line_number,
+                'errors': {'non_field_errors': [
+                    'Строка превышает допустимый размер.']}})
+            continue
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            errors.append({
+                'line': line_number,
+                'errors': {'non_field_errors': ['Некорректный JSON.']}})
+            continue
+        serializer: RecipesTransferSerializer = RecipesTransferSerializer(
+            data=data)
+        if not serializer.is_valid():
+            errors.append({'line': line_number, 'errors': serializer.errors})
+            continue
+        records.append((line_number, serializer.validated_data))
+    return records
+
+
+def _resolve_records(
+        records: list[tuple[int, dict]],
+        errors: list[dict]) -> list[tuple[dict, list[tuple[int, float]]]]:
+    """Вспомогательная функция: загружает теги, ингредиенты и занятые
+    названия рецептов пачки тремя запросами. Возвращает пары
+    (данные рецепта, список (ID ингредиента, количество)), в данных рецепта
+    slug тегов заменяются на ID. Ошибки добавляет в errors."""
+    tags: dict[str, int] = dict(
+        Tags.objects.filter(
+            slug__in={slug for _, data in records for slug in data['tags']})
+        .values_list('slug', 'id'))
+    ingredients: dict[tuple[str, str], int] = {
+        (name, unit): ingredient_id
+        for ingredient_id, name, unit in Ingredients.objects.filter(
+            name__in={ingredient['name'].lower()
+                      for _, data in records
+                      for ingredient in data['ingredients']})
+        .values_list('id', 'name', 'measurement_unit')}
+    taken_names: set[str] = set(Recipes.objects.filter(
+        name__in=[data['name'] for _, data in records])
+        .values_list('name', flat=True))
+    resolved: list[tuple[dict, list[tuple[int, float]]]] = []
+    for line_number, data in records:
+        record_errors: dict[str, list[str]] = {}
+        if data['name'] in taken_names:
+            record_errors['name'] = [
+                'Рецепт с таким значением поля Название уже существует.']
+        missing_tags: list[str] = [
+            slug for slug in data['tags'] if slug not in tags]
+        if missing_tags:
+            record_errors['tags'] = [
+                f'Тег "{slug}" не существует.' for slug in missing_tags]
+        recipe_ingredients: list[tuple[int, float]] = []
+        for ingredient in data['ingredients']:
+            key: tuple[str, str] = (
+                ingredient['name'].lower(), ingredient['measurement_unit'])
+            if key not in ingredients:
+                record_errors.setdefault('ingredients', []).append(
+                    f'Ингредиент "{key[0]} ({key[1]})" не существует.')
+                continue
+            recipe_ingredients.append(
+                (ingredients[key], ingredient['amount']))
+        if record_errors:
+            errors.append({'line': line_number, 'errors': record_errors})
+            continue
+        taken_names.add(data['name'])
+        data['tags'] = [tags[slug] for slug in data['tags']]
+        resolved.append((data, recipe_ingredients))
+    return resolved
+
+
+@transaction.atomic
+def _create_recipes(
+        resolved: list[tuple[dict, list[tuple[int, float]]]],
+        author: User) -> int:
+    """Вспомогательная функция: создает рецепты пачки и их связи
+    тремя запросами bulk_create, записывает рецепты в журнал
+    "RecipesIngredientsLog" и ставит обработку картинок в очередь
+    после фиксации транзакции. Возвращает число созданных рецептов."""
+    recipes: list[Recipes] = Recipes.objects.bulk_create([
+        Recipes(
+            author=author,
+            cooking_time=data['cooking_time'],
+            image=data['image'],
+            image_status=RECIPES_IMAGE_STATUS_PENDING,
+            name=data['name'],
+            text=data['text'])
+        for data, _ in resolved])
+    RecipesIngredients.objects.bulk_create([
+        RecipesIngredients(
+            amount=amount, ingredient_id=ingredient_id, recipe=recipe)
+        for recipe, (_, recipe_ingredients) in zip(recipes, resolved)
+        for ingredient_id, amount in recipe_ingredients])
+    RecipesTags.objects.bulk_create([
+        RecipesTags(recipe=recipe, tag_id=tag_id)
+        for recipe, (data, _) in zip(recipes, resolved)
+        for tag_id in data['tags']])
+    RecipesIngredientsLog.objects.log(
+        recipe_ids=[recipe.id for recipe in recipes])
+    for recipe in recipes:
+        schedule_recipe_image(recipe=recipe)
+    return len(recipes)
+
+
+def _close_images(records: list[tuple[int, dict]]) -> None:
+    """Вспомогательная функция: закрывает декодированные картинки пачки
+    (временные файлы, см. "Base64ImageField")."""
+    for _, data in records:
+        data['image'].close()
+    return
+
+
+def import_recipes(
+        lines: Iterable[bytes],
+        author: User,
+        chunk_size: int = RECIPES_TRANSFER_CHUNK_SIZE,
+        chunk_max_bytes: int = RECIPES_TRANSFER_CHUNK_MAX_BYTES) -> dict:
+    """Создает рецепты автора author из строк NDJSON lines и возвращает
+    отчет: {"created": число созданных рецептов,
+            "errors": [{"line": номер строки, "errors": {...}}, ...]}.
+    Каждая пачка строк сохраняется в отдельной транзакции, поэтому
+    при прерывании импорта созданные ранее пачки сохраняются."""
+    report: dict = {'created': 0, 'errors': []}
+    for lines_chunk in _line_chunks(
+            lines=lines, size=chunk_size, max_bytes=chunk_max_bytes):
+        records: list[tuple[int, dict]] = _parse_lines(
+            lines=lines_chunk, errors=report['errors'])
+        del lines_chunk
+        try:
+            resolved: list[tuple[dict, list[tuple[int, float]]]] = (
+                _resolve_records(records=records, errors=report['errors']))
+            if resolved:
+                report['created'] += _create_recipes(
+                    resolved=resolved, author=author)
+        finally:
+            _close_images(records=records)
+    report['errors'].sort(key=lambda error: error['line'])
+    return report
@@ -3,30 +3,47 @@ import csv
 import pandas
 from django.contrib.auth.models import User
 from django.db import transaction
-from django.http import HttpResponse
+from django.db.models import Exists, Model, OuterRef, Prefetch
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.decorators import action, api_view, permission_classes
-from rest_framework.exceptions import MethodNotAllowed
+from rest_framework.exceptions import MethodNotAllowed, ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.serializers import Serializer
+from rest_framework.settings import api_settings
 from rest_framework.viewsets import ModelViewSet
 
 from api.v1.filters import IngredientsFilter, RecipesFilter
+from api.v1.pagination import RecommendationsPagination
 from api.v1.permissions import IsAuthorOrAdminOrReadOnly
 from api.v1.serializers import (
     CustomUserSerializer, CustomUserLoginSerializer,
     CustomUserSubscriptionsSerializer,
-    IngredientsSerializer, RecipesSerializer, RecipesFavoritesSerializer,
-    RecipesShortSerializer, ShoppingCartsSerializer, SubscriptionsSerializer,
-    TagsSerializer)
+    IngredientsSerializer, RecipesBulkSerializer,
+    RECIPES_READ_VALUES,
+    RecipesByIngredientsSerializer, RecipesReadSerializer, RecipesSerializer,
+    RecipesShortSerializer, TagsSerializer)
+from api.v1.snapshots import get_ingredients_snapshot, snapshot_response
+from api.v1.transfer import (
+    NDJSON_CONTENT_TYPE, RECIPES_TRANSFER_REQUEST_MAX_BYTES, export_recipes,
+    import_recipes, read_lines)
+from foodgram_app.catalog import invalidate_catalog
+from foodgram_app.ingredient_index import get_ingredient_index
 from foodgram_app.models import (
-    Ingredients, Tags, Recipes, RecipesFavorites, RecipesIngredients,
-    ShoppingCarts, Subscriptions)
+    Ingredients, Tags, RecipeRecommendations, Recipes, RecipesFavorites,
+    RecipesIngredients, RecipesTags, ShoppingCarts, SimilarRecipes,
+    Subscriptions)
+
+"""Действия "RecipesViewSet", выдача которых строится
+"RecipesReadSerializer"."""
+RECIPES_READ_ACTIONS: tuple[str] = (
+    'by_ingredients', 'list', 'recommended', 'retrieve', 'similar')
 
 
 @api_view(['POST'])
@@ -62,6 +79,7 @@ def csv_import_ingredients(request):
             serializer.is_valid(raise_exception=True)
             objects.append(Ingredients(**serializer.validated_data))
         Ingredients.objects.bulk_create(objects)
+        invalidate_catalog()
         return Response({'success': 'CSV file imported successfully'})
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -77,7 +95,11 @@ def custom_user_login(request):
         context={'request': request})
     serializer.is_valid(raise_exception=True)
     user: User = serializer.validated_data['user']
-    token, _ = Token.objects.get_or_create(user=user)
+    try:
+        """Токен уже загружен вместе с пользователем в "EmailBackend"."""
+        token: Token = user.auth_token
+    except Token.DoesNotExist:
+        token, _ = Token.objects.get_or_create(user=user)
     return Response({'auth_token': token.key}, status=status.HTTP_200_OK)
 
 
@@ -154,28 +176,27 @@ class CustomUserViewSet(ModelViewSet):
             - POST: создает подсписку пользователя на автора с id=pk;
             - DELETE: удаляет подписку пользователя на автора с id=pk."""
         subscriber: User = request.user
+        if request.method == 'DELETE':
+            if Subscriptions.objects.delete_if_exists(
+                    subscriber=subscriber, subscription_to=pk):
+                return Response(status=status.HTTP_204_NO_CONTENT)
+            subscription_to: User = get_object_or_404(User, id=pk)
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                'Вы не были подписаны на пользователя '
+                f'{subscription_to.username}.']})
         subscription_to: User = get_object_or_404(User, id=pk)
-        serializer = SubscriptionsSerializer(
-            data={'subscriber': subscriber.id,
-                  'subscription_to': pk},
+        if subscriber.id == subscription_to.id:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                'Вы не можете подписаться на себя.']})
+        if not Subscriptions.objects.create_if_not_exists(
+                subscriber=subscriber, subscription_to=subscription_to):
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                'Вы уже подписаны на пользователя '
+                f'{subscription_to.username}.']})
+        serializer = CustomUserSubscriptionsSerializer(
+            subscription_to,
             context={'request': request})
-        serializer.is_valid(raise_exception=True)
-        if request.method == 'DELETE':
-            Subscriptions.objects.get(
-                subscriber=subscriber,
-                subscription_to=subscription_to).delete()
-            data: None = None
-            status_code: status = status.HTTP_204_NO_CONTENT
-        elif request.method == 'POST':
-            Subscriptions.objects.create(
-                subscriber=subscriber,
-                subscription_to=subscription_to)
-            serializer = CustomUserSubscriptionsSerializer(
-                subscription_to,
-                context={'request': request})
-            data: dict = serializer.data
-            status_code: status = status.HTTP_201_CREATED
-        return Response(data=data, status=status_code)
+        return Response(data=serializer.data, status=status.HTTP_201_CREATED)
 
 
 class IngredientsViewSet(ModelViewSet):
@@ -185,6 +206,8 @@ class IngredientsViewSet(ModelViewSet):
                                  при GET запросе;
     2) ".../ingredients/{pk}/" - предоставляет информацию об ингредиенте
                                  с ID=pk при GET запросе.
+    Список ингредиентов без фильтра и с коротким фильтром "name" выдается
+    из заранее сериализованного и сжатого снимка.
     """
     filter_backends = (IngredientsFilter,)
     filterset_fields = ('name',)
@@ -193,6 +216,18 @@ class IngredientsViewSet(ModelViewSet):
     serializer_class = IngredientsSerializer
     queryset = Ingredients.objects.all()
 
+    def list(self, request, *args, **kwargs):
+        """Выдает список ингредиентов без фильтра "name" или с коротким
+        фильтром из снимка выдачи (см. "api/v1/snapshots.py") без запросов
+        к БД и сериализации. Остальные запросы и запросы не в формате
+        JSON (например, browsable API) обрабатываются вью-сетом."""
+        if isinstance(request.accepted_renderer, JSONRenderer):
+            blob: tuple[bytes, bytes] = get_ingredients_snapshot().get(
+                name=request.query_params.get('name'))
+            if blob is not None:
+                return snapshot_response(request=request, blob=blob)
+        return super().list(request, *args, **kwargs)
+
 
 class RecipesViewSet(ModelViewSet):
     """
@@ -206,7 +241,23 @@ class RecipesViewSet(ModelViewSet):
                              (доступно только автору рецепта).
     Дополнительные action-эндпоинты:
     3) ".../recipes/download_shopping_cart/" - формирует csv файл с элементами
-                                               пользовательской корзины.
+                                               пользовательской корзины;
+    4) ".../recipes/bulk_favorite/" - добавляет в избранное (POST) или удаляет
+                                      из него (DELETE) список рецептов;
+    5) ".../recipes/bulk_shopping_cart/" - добавляет в корзину (POST) или
+                                           удаляет из нее (DELETE) список
+                                           рецептов;
+    6) ".../recipes/export/" - выгружает рецепты в формате NDJSON
+                               (доступно только администратору);
+    7) ".../recipes/import/" - загружает рецепты в формате NDJSON
+                               (доступно только администратору);
+    8) ".../recipes/by_ingredients/" - ищет рецепты по имеющимся
+                                       у пользователя ингредиентам;
+    9) ".../recipes/{pk}/similar/" - предоставляет рецепты, похожие
+                                     на рецепт с ID=pk по ингредиентам;
+    10) ".../recipes/recommended/" - предоставляет персональные
+                                     рекомендации рецептов (доступно только
+                                     авторизованным пользователям).
     """
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipesFilter
@@ -215,8 +266,120 @@ class RecipesViewSet(ModelViewSet):
     serializer_class = RecipesSerializer
 
     def get_queryset(self):
+        """Для действий на чтение возвращает выборку словарей
+        для "RecipesReadSerializer", для остальных - объекты рецептов."""
+        if self.action in RECIPES_READ_ACTIONS:
+            return Recipes.objects.values(*RECIPES_READ_VALUES)
         return Recipes.objects.all().select_related(
-            'author').prefetch_related('ingredients', 'tags')
+            'author').prefetch_related(
+                Prefetch(
+                    'recipe_ingredient',
+                    queryset=RecipesIngredients.objects.order_by().only(
+                        'recipe_id', 'ingredient_id', 'amount')),
+                Prefetch(
+                    'recipe_tag',
+                    queryset=RecipesTags.objects.order_by().only(
+                        'recipe_id', 'tag_id')))
+
+    def get_serializer_class(self):
+        if self.action in RECIPES_READ_ACTIONS:
+            return RecipesReadSerializer
+        return super().get_serializer_class()
+
+    @action(detail=False,
+            methods=('delete', 'post'),
+            url_path='bulk_favorite',
+            permission_classes=(IsAuthenticated,))
+    def bulk_update_favorite(self, request):
+        """Добавляет action-эндпоинт ".../recipes/bulk_favorite/":
+            - POST: добавляет рецепты из списка "recipes" в избранное;
+            - DELETE: удаляет рецепты из списка "recipes" из избранного."""
+        return self._bulk_update_relations(
+            request=request, model=RecipesFavorites)
+
+    @action(detail=False,
+            methods=('delete', 'post'),
+            url_path='bulk_shopping_cart',
+            permission_classes=(IsAuthenticated,))
+    def bulk_update_shopping_cart(self, request):
+        """Добавляет action-эндпоинт ".../recipes/bulk_shopping_cart/":
+            - POST: добавляет рецепты из списка "recipes" в список покупок;
+            - DELETE: удаляет рецепты из списка "recipes" из списка покупок."""
+        return self._bulk_update_relations(
+            request=request, model=ShoppingCarts)
+
+    @action(detail=False,
+            methods=('get',),
+            url_path='by_ingredients')
+    def by_ingredients(self, request):
+        """Добавляет action-эндпоинт ".../recipes/by_ingredients/".
+        Принимает параметры "ingredients" (ID ингредиентов, параметр
+        повторяется) и "min_coverage" (минимальная доля ингредиентов
+        рецепта, которые есть у пользователя). Возвращает рецепты
+        с покрытием не ниже "min_coverage" по убыванию покрытия, покрытие
+        указывается в поле "coverage".
+        Рецепты подбираются по инвертированному индексу ингредиентов
+        (см. "foodgram_app/ingredient_index.py"), запросы к БД выполняются
+        только для рецептов текущей страницы."""
+        params: dict = {
+            'ingredients': request.query_params.getlist('ingredients')}
+        if 'min_coverage' in request.query_params:
+            params['min_coverage'] = request.query_params['min_coverage']
+        serializer = RecipesByIngredientsSerializer(data=params)
+        serializer.is_valid(raise_exception=True)
+        recipe_ids, coverage = get_ingredient_index().search(
+            ingredient_ids=serializer.validated_data['ingredients'],
+            min_coverage=serializer.validated_data['min_coverage'])
+        coverages: dict[int, float] = dict(zip(
+            recipe_ids.tolist(), coverage.tolist()))
+        page: list[int] = self.paginate_queryset(list(coverages))
+        page_recipes: list[dict] = self._get_recipes(recipe_ids=page)
+        data: list[dict] = self.get_serializer(page_recipes, many=True).data
+        for recipe_data in data:
+            recipe_data['coverage'] = round(coverages[recipe_data['id']], 4)
+        return self.get_paginated_response(data)
+
+    @action(detail=False,
+            methods=('get',),
+            url_path='recommended',
+            permission_classes=(IsAuthenticated,))
+    def recommended(self, request):
+        """Добавляет action-эндпоинт ".../recipes/recommended/".
+        Возвращает персональные рекомендации рецептов текущего пользователя
+        по убыванию оценки. Рекомендации рассчитываются офлайн командой
+        "python manage.py build_recommendations" (см.
+        "foodgram_app/recommendations.py"), выдача разбивается на страницы
+        по курсору ("next", "previous")."""
+        paginator = RecommendationsPagination()
+        rows: list[RecipeRecommendations] = paginator.paginate_queryset(
+            RecipeRecommendations.objects.filter(
+                user=request.user).only('rank', 'recipe_id'),
+            request,
+            view=self)
+        page_recipes: list[dict] = self._get_recipes(
+            recipe_ids=[row.recipe_id for row in rows])
+        return paginator.get_paginated_response(
+            self.get_serializer(page_recipes, many=True).data)
+
+    @action(detail=True,
+            methods=('get',),
+            url_path='similar')
+    def similar(self, request, pk=None):
+        """Добавляет action-эндпоинт ".../recipes/{id}/similar/".
+        Возвращает рецепты, похожие на рецепт по составу ингредиентов,
+        по убыванию сходства, сходство указывается в поле "similarity".
+        Похожие рецепты рассчитываются заранее и читаются из таблицы
+        "SimilarRecipes" по индексу (см. "foodgram_app/similarity.py")."""
+        recipe: Recipes = get_object_or_404(Recipes.objects.only('id'), id=pk)
+        scores: dict[int, float] = dict(
+            SimilarRecipes.objects.filter(recipe=recipe).values_list(
+                'similar_id', 'score'))
+        page: list[int] = self.paginate_queryset(list(scores))
+        page_recipes: list[dict] = self._get_recipes(recipe_ids=page)
+        data: list[dict] = self.get_serializer(page_recipes, many=True).data
+        for recipe_data in data:
+            recipe_data['similarity'] = round(scores[recipe_data['id']], 4)
+        return self.get_paginated_response(data)
 
     @action(detail=False,
             methods=('get',),
@@ -262,6 +425,56 @@ class RecipesViewSet(ModelViewSet):
             writer.writerow(row)
         return response
 
+    @action(detail=False,
+            methods=('get',),
+            url_path='export',
+            permission_classes=(IsAdminUser,))
+    def export_ndjson(self, request):
+        """Добавляет action-эндпоинт ".../recipes/export/".
+        Выгружает потоком рецепты в формате NDJSON (см. "api/v1/transfer.py")
+        с учетом фильтров "RecipesFilter" из параметров запроса."""
+        response: StreamingHttpResponse = StreamingHttpResponse(
+            export_recipes(
+                recipes=self.filter_queryset(Recipes.objects.all())),
+            content_type=NDJSON_CONTENT_TYPE)
+        response['Content-Disposition'] = (
+            'attachment; filename="recipes.ndjson"')
+        return response
+
+    @action(detail=False,
+            methods=('post',),
+            url_path='import',
+            permission_classes=(IsAdminUser,))
+    def import_ndjson(self, request):
+        """Добавляет action-эндпоинт ".../recipes/import/".
+        Создает рецепты текущего пользователя из тела запроса в формате
+        NDJSON (см. "api/v1/transfer.py"). Тело не больше
+        "RECIPES_TRANSFER_REQUEST_MAX_BYTES" байт читается построчно
+        с ограничением длины строки ("read_lines") без загрузки в память
+        целиком. Возвращает число созданных рецептов и ошибки строк,
+        которые были пропущены."""
+        if request.content_type.split(';')[0] != NDJSON_CONTENT_TYPE:
+            return Response(
+                {'Ошибка': 'Неправильный тип содержимого. '
+                           f'Ожидается {NDJSON_CONTENT_TYPE}.'},
+                status=status.HTTP_400_BAD_REQUEST)
+        try:
+            content_length: int = int(request.META.get('CONTENT_LENGTH', 0))
+        except ValueError:
+            content_length = 0
+        if content_length > RECIPES_TRANSFER_REQUEST_MAX_BYTES:
+            return Response(
+                {'Ошибка': 'Размер тела запроса превышает '
+                           f'{RECIPES_TRANSFER_REQUEST_MAX_BYTES} байт.'},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        stream = request.stream
+        lines = read_lines(stream=stream) if stream is not None else []
+        report: dict = import_recipes(lines=lines, author=request.user)
+        return Response(
+            data=report,
+            status=(status.HTTP_201_CREATED if report['created']
+                    else status.HTTP_400_BAD_REQUEST))
+
     @action(detail=False,
             methods=('delete', 'post'),
             url_path=r'(?P<pk>\d+)/favorite',
@@ -270,23 +483,14 @@ class RecipesViewSet(ModelViewSet):
         """Добавляет action-эндпоинт ".../recipes/{pk}/favorite/":
             - POST: добавляет рецепт с id=pk в избранное;
             - DELETE: удаляет рецепт с id=pk из избранного."""
-        user: User = request.user
-        serializer = RecipesFavoritesSerializer(
-            data={'user': user.id,
-                  'recipe': pk},
-            context={'request': request})
-        serializer.is_valid(raise_exception=True)
-        recipe: Recipes = Recipes.objects.get(id=pk)
-        if request.method == 'DELETE':
-            RecipesFavorites.objects.get(recipe=recipe, user=user).delete()
-            data: None = None
-            status_code: status = status.HTTP_204_NO_CONTENT
-        elif request.method == 'POST':
-            RecipesFavorites.objects.create(recipe=recipe, user=user)
-            serializer = RecipesShortSerializer(instance=recipe)
-            data = serializer.data
-            status_code: status = status.HTTP_201_CREATED
-        return Response(data=data, status=status_code)
+        return self._update_relation(
+            request=request,
+            pk=pk,
+            model=RecipesFavorites,
+            error_key='recipe',
+            exists_message=(
+                'Ошибка добавления. Рецепт уже находится в избранном.'),
+            missing_message='Ошибка удаления. Рецепта нет в избранном.')
 
     @action(detail=False,
             methods=('delete', 'post'),
@@ -296,23 +500,102 @@ class RecipesViewSet(ModelViewSet):
         """Добавляет action-эндпоинт ".../recipes/{pk}/shopping_cart/":
             - POST: добавляет рецепт с id=pk в список покупок;
             - DELETE: удаляет рецепт с id=pk из списка покупок."""
-        user: User = request.user
-        serializer = ShoppingCartsSerializer(
-            data={'user': user.id,
-                  'recipe': pk},
-            context={'request': request})
+        return self._update_relation(
+            request=request,
+            pk=pk,
+            model=ShoppingCarts,
+            error_key=api_settings.NON_FIELD_ERRORS_KEY,
+            exists_message=(
+                'Ошибка добавления. Рецепт уже находится в корзине.'),
+            missing_message='Ошибка удаления. Рецепта нет в корзине.')
+
+    def _bulk_update_relations(self, request, model: Model) -> Response:
+        """Вспомогательная функция для массового обновления связей
+        пользователя с рецептами ("RecipesFavorites", "ShoppingCarts").
+        Существование рецептов и связей с ними проверяется одним запросом,
+        изменение производится вторым:
+            - POST: "bulk_create" только для отсутствующих связей;
+            - DELETE: один "DELETE ... WHERE recipe_id IN (...)".
+        Возвращает статус обработки для каждого переданного ID:
+            - POST: "created", "exists" или "not_found";
+            - DELETE: "deleted", "absent" или "not_found"."""
+        serializer = RecipesBulkSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        recipe: Recipes = Recipes.objects.get(id=pk)
+        recipe_ids: list[int] = serializer.validated_data['recipes']
+        user: User = request.user
+        is_related: dict[int, bool] = dict(
+            Recipes.objects.filter(id__in=recipe_ids).annotate(
+                is_related=Exists(model.objects.filter(
+                    recipe=OuterRef('pk'), user=user))
+            ).order_by().values_list('id', 'is_related'))
+        if request.method == 'POST':
+            to_change: list[int] = [
+                recipe_id for recipe_id, related in is_related.items()
+                if not related]
+            model.objects.bulk_create(
+                [model(recipe_id=recipe_id, user=user)
+                 for recipe_id in to_change],
+                ignore_conflicts=True)
+            done_status, skip_status = 'created', 'exists'
+        else:
+            to_change: list[int] = [
+                recipe_id for recipe_id, related in is_related.items()
+                if related]
+            model.objects.filter(user=user, recipe_id__in=to_change).delete()
+            done_status, skip_status = 'deleted', 'absent'
+        to_change: set[int] = set(to_change)
+        results: list[dict] = []
+        for recipe_id in recipe_ids:
+            if recipe_id not in is_related:
+                result_status: str = 'not_found'
+            elif recipe_id in to_change:
+                result_status: str = done_status
+            else:
+                result_status: str = skip_status
+            results.append({'id': recipe_id, 'status': result_status})
+        return Response(data={'results': results}, status=status.HTTP_200_OK)
+
+    def _get_recipes(self, recipe_ids: list[int]) -> list[dict]:
+        """Вспомогательная функция: возвращает строки выборки рецептов
+        с ID из recipe_ids одним запросом в порядке recipe_ids
+        (отсутствующие рецепты пропускаются)."""
+        recipes: dict[int, dict] = {
+            recipe['id']: recipe
+            for recipe in self.get_queryset().filter(id__in=recipe_ids)}
+        return [recipes[recipe_id] for recipe_id in recipe_ids
+                if recipe_id in recipes]
+
+    def _update_relation(
+            self,
+            request,
+            pk: int,
+            model: Model,
+            error_key: str,
+            exists_message: str,
+            missing_message: str) -> Response:
+        """Вспомогательная функция для добавления рецепта в избранное/корзину
+        пользователя и удаления оттуда. Изменение производится одним
+        запросом, опираясь на ограничение уникальности модели:
+            - POST: "INSERT ... ON CONFLICT DO NOTHING", связь уже
+              существовала, если не было вставлено ни одной строки;
+            - DELETE: "DELETE ... WHERE ...", связи не было, если не было
+              удалено ни одной строки.
+        При POST рецепт дополнительно запрашивается для формирования ответа.
+        """
+        user: User = request.user
         if request.method == 'DELETE':
-            ShoppingCarts.objects.get(recipe=recipe, user=user).delete()
-            data: None = None
-            status_code: status = status.HTTP_204_NO_CONTENT
-        elif request.method == 'POST':
-            ShoppingCarts.objects.create(recipe=recipe, user=user)
-            serializer = RecipesShortSerializer(instance=recipe)
-            data = serializer.data
-            status_code: status = status.HTTP_201_CREATED
-        return Response(data=data, status=status_code)
+            if not model.objects.delete_if_exists(recipe=pk, user=user):
+                raise ValidationError({error_key: [missing_message]})
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        recipe: Recipes = Recipes.objects.filter(id=pk).first()
+        if recipe is None:
+            raise ValidationError({'recipe': [
+                f'Недопустимый первичный ключ "{pk}" - объект не существует.'
+            ]})
+        if not model.objects.create_if_not_exists(recipe=recipe, user=user):
+            raise ValidationError({error_key: [exists_message]})
+        serializer = RecipesShortSerializer(instance=recipe)
+        return Response(data=serializer.data, status=status.HTTP_201_CREATED)
 
 
 class TagsViewSet(ModelViewSet):
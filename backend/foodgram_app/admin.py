@@ -15,7 +15,9 @@ class CustomIngredientsAdmin(ModelAdmin):
         - добавляет фильтрацию по полю "name";
         - добавляет поиск по полям:
             - "name";
-            - "measurement_unit"."""
+            - "measurement_unit";
+        - удаляет рецепты выбранных ингредиентов одним проходом
+          "RecipesQuerySet.bulk_delete" (через "IngredientsQuerySet")."""
     list_display = ('name', 'measurement_unit')
     list_filter = ('name',)
     search_fields = ('name', 'measurement_unit')
@@ -31,11 +33,15 @@ class CustomRecipesAdmin(ModelAdmin):
             - "name";
             - "cooking_time";
             - "author";
-        - добавляет поле "get_favorites_count"."""
+        - добавляет поле "get_favorites_count";
+        - удаляет выбранные рецепты через "RecipesQuerySet.bulk_delete"."""
     list_display = ('name', 'cooking_time', 'author')
     list_filter = ('name', 'cooking_time', 'tags')
     readonly_fields = ('get_favorites_count',)
 
+    def delete_queryset(self, request, queryset):
+        queryset.bulk_delete()
+
     def get_favorites_count(self, obj):
         """Возвращает количество пользователей, которые в настоящий момент
         имеют рецепт в избранном."""
@@ -1,11 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class FoodgramAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'foodgram_app'
 
-    # TODO: посмотреть сигналы
-    # def ready(self):
-    #     from .signals import delete_recipe_ingredients, delete_recipe_tags
-    #     pass
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .search import install_recipes_search
+        post_migrate.connect(install_recipes_search, sender=self)
@@ -0,0 +1,169 @@
+"""
+Создает справочник тегов и ингредиентов проекта "Foodgram" в памяти
+процесса.
+
+Теги и ингредиенты меняются редко, поэтому сериализаторы рецептов
+получают из БД только ID связей ("RecipesTags.tag_id",
+"RecipesIngredients.ingredient_id"), а данные тегов и ингредиентов берут
+из неизменяемого снимка справочника без соединения таблиц.
+
+Снимок строится двумя запросами и помечается версией "CatalogVersion".
+Изменение "Tags" и "Ingredients" увеличивает версию (сигналы, см.
+"foodgram_app/signals.py") и сбрасывает снимок процесса, остальные
+процессы сверяют версию не чаще раза в "CATALOG_POLL_INTERVAL" секунд
+одним запросом. ID, которого нет в снимке, приводит к немедленной сверке
+версии.
+
+Классы:
+    - Catalog;
+    - CatalogCache.
+
+Функции:
+    - get_catalog;
+    - get_catalog_cache;
+    - invalidate_catalog.
+"""
+import threading
+import time
+
+from django.db import transaction
+
+from foodgram_app.models import CatalogVersion, Ingredients, Tags
+
+CATALOG_POLL_INTERVAL: float = 1.0
+
+
+class Catalog():
+    """
+    Неизменяемый снимок справочника тегов и ингредиентов.
+
+    Атрибуты:
+        - ingredients: dict[int, tuple[int, str, str]]
+            - место в сортировке модели "Ingredients", название и единица
+              измерения для каждого ID ингредиента
+        - tags: dict[int, tuple[int, dict]]
+            - место в сортировке модели "Tags" и данные тега для выдачи
+              (id, name, color, slug) для каждого ID тега
+        - version: int
+            - версия справочников, с которой построен снимок
+    """
+
+    def __init__(
+            self,
+            ingredients: dict[int, tuple[int, str, str]],
+            tags: dict[int, tuple[int, dict]],
+            version: int):
+        self.ingredients: dict[int, tuple[int, str, str]] = ingredients
+        self.tags: dict[int, tuple[int, dict]] = tags
+        self.version: int = version
+
+    @classmethod
+    def build(cls, version: int) -> 'Catalog':
+        """Создает снимок справочника двумя запросами к БД."""
+        tags: dict[int, tuple[int, dict]] = {
+            tag['id']: (position, tag)
+            for position, tag in enumerate(Tags.objects.order_by(
+                'name', 'id').values('id', 'name', 'color', 'slug'))}
+        ingredients: dict[int, tuple[int, str, str]] = {
+            ingredient_id: (position, name, measurement_unit)
+            for position, (ingredient_id, name, measurement_unit)
+            in enumerate(Ingredients.objects.order_by('name', 'id')
+                         .values_list('id', 'name', 'measurement_unit'))}
+        return cls(ingredients=ingredients, tags=tags, version=version)
+
+    def has(self, tag_ids: list[int], ingredient_ids: list[int]) -> bool:
+        """Проверяет, что все теги tag_ids и ингредиенты ingredient_ids
+        есть в снимке."""
+        if not all(tag_id in self.tags for tag_id in tag_ids):
+            return False
+        return all(ingredient_id in self.ingredients
+                   for ingredient_id in ingredient_ids)
+
+    def get_tags(self, tag_ids: list[int]) -> list[dict]:
+        """Возвращает данные тегов tag_ids в порядке сортировки модели
+        "Tags". Отсутствующие в снимке теги пропускаются."""
+        tags: list[tuple[int, dict]] = sorted(
+            self.tags[tag_id] for tag_id in tag_ids if tag_id in self.tags)
+        return [dict(tag) for _, tag in tags]
+
+    def get_ingredients(
+            self, amounts: list[tuple[int, float]]) -> list[dict]:
+        """Возвращает данные ингредиентов по парам (ID ингредиента,
+        количество) amounts в порядке сортировки модели "Ingredients".
+        Отсутствующие в снимке ингредиенты пропускаются."""
+        ingredients: list[tuple] = sorted(
+            (*self.ingredients[ingredient_id], ingredient_id, amount)
+            for ingredient_id, amount in amounts
+            if ingredient_id in self.ingredients)
+        return [
+            {'id': ingredient_id,
+             'name': name,
+             'measurement_unit': measurement_unit,
+             'amount': amount}
+            for _, name, measurement_unit, ingredient_id, amount
+            in ingredients]
+
+
+class CatalogCache():
+    """Хранит снимок справочника процесса и обновляет его при изменении
+    версии "CatalogVersion"."""
+
+    def __init__(self, poll_interval: float = CATALOG_POLL_INTERVAL):
+        self.poll_interval: float = poll_interval
+        self._catalog: Catalog = None
+        self._checked_at: float = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, fresh: bool = False) -> Catalog:
+        """Возвращает актуальный снимок, при необходимости обновляя его.
+        С fresh=True версия сверяется независимо от "poll_interval"."""
+        catalog: Catalog = self._catalog
+        elapsed: float = time.monotonic() - self._checked_at
+        if catalog is not None and not fresh and elapsed < self.poll_interval:
+            return catalog
+        with self._lock:
+            version: int = CatalogVersion.objects.current()
+            if self._catalog is None or self._catalog.version != version:
+                self._catalog = Catalog.build(version=version)
+            self._checked_at = time.monotonic()
+            return self._catalog
+
+    def clear(self) -> None:
+        """Сбрасывает снимок: он будет построен заново при обращении."""
+        with self._lock:
+            self._catalog = None
+
+    def resolve(
+            self,
+            tag_ids: list[int],
+            ingredient_ids: list[int]) -> Catalog:
+        """Возвращает снимок, содержащий теги tag_ids и ингредиенты
+        ingredient_ids, если они есть в БД: при отсутствии какого-либо ID
+        в снимке версия сверяется немедленно."""
+        catalog: Catalog = self.get()
+        if catalog.has(tag_ids=tag_ids, ingredient_ids=ingredient_ids):
+            return catalog
+        return self.get(fresh=True)
+
+
+_catalog_cache: CatalogCache = CatalogCache()
+
+
+def get_catalog_cache() -> CatalogCache:
+    """Возвращает хранилище справочника процесса."""
+    return _catalog_cache
+
+
+def get_catalog() -> Catalog:
+    """Возвращает актуальный снимок справочника процесса."""
+    return _catalog_cache.get()
+
+
+def invalidate_catalog() -> None:
+    """Увеличивает версию справочников в текущей транзакции и сбрасывает
+    снимок процесса сразу и после фиксации транзакции (снимок, построенный
+    другим потоком до фиксации, будет построен заново)."""
+    CatalogVersion.objects.bump()
+    _catalog_cache.clear()
+    transaction.on_commit(_catalog_cache.clear)
+    return
@@ -0,0 +1,199 @@
+"""
+Создает конвейер обработки изображений рецептов проекта "Foodgram".
+
+Для картинки рецепта ("Recipes.image") создаются уменьшенные варианты
+в формате WebP без метаданных, перечисленные в "RECIPES_IMAGE_VARIANTS":
+    - card: для карточек в списках рецептов и подписок;
+    - detail: для страницы рецепта.
+Пути к вариантам сохраняются в поле "Recipes.image_variants".
+Файлы хранилища с адресацией по содержимому не перезаписываются: оригинал
+без метаданных сохраняется под именем по хешу нового содержимого, рецепт
+переключается на него, а прежний оригинал ставится в очередь на удаление.
+Пока картинка не обработана, вместо нее выдается статический файл
+"RECIPES_IMAGE_PLACEHOLDER".
+
+Функции:
+    - build_image_variants;
+    - delete_image_files;
+    - get_image_variant_url;
+    - get_unreferenced_files;
+    - process_recipe_image;
+    - strip_image_metadata;
+    - verify_image.
+"""
+import os
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage, default_storage
+from django.db.models import Q
+from PIL import Image, ImageOps
+
+RECIPES_IMAGE_VARIANTS: dict[str, tuple[int, int]] = {
+    'card': (480, 480),
+    'detail': (1200, 1200)}
+RECIPES_IMAGE_PLACEHOLDER: str = 'foodgram_app/recipe_placeholder.svg'
+RECIPES_IMAGE_VARIANTS_DIR: str = 'variants'
+RECIPES_IMAGE_WEBP_QUALITY: int = 80
+RECIPES_IMAGE_JPEG_QUALITY: int = 90
+
+"""Форматы, которые пересохраняются без метаданных. Остальные форматы
+(например, анимированный GIF) сохраняются как есть."""
+STRIP_METADATA_FORMATS: tuple[str] = ('JPEG', 'PNG', 'WEBP')
+
+
+def _open_image(name: str, storage: Storage) -> Image.Image:
+    """Вспомогательная функция: открывает и полностью загружает
+    изображение из хранилища."""
+    with storage.open(name) as file:
+        image: Image.Image = Image.open(file)
+        image.load()
+    return image
+
+
+def _to_webp_mode(image: Image.Image) -> Image.Image:
+    """Вспомогательная функция: приводит изображение к режиму,
+    поддерживаемому WebP (RGB или RGBA при наличии прозрачности)."""
+    if image.mode in ('RGB', 'RGBA'):
+        return image
+    has_alpha: bool = (
+        image.mode in ('LA', 'PA') or 'transparency' in image.info)
+    return image.convert('RGBA' if has_alpha else 'RGB')
+
+
+def verify_image(name: str, storage: Storage = default_storage) -> None:
+    """Проверяет целостность изображения средствами Pillow.
+    При повреждении или неизвестном формате вызывает исключение."""
+    with storage.open(name) as file:
+        Image.open(file).verify()
+    return
+
+
+def strip_image_metadata(
+        name: str, storage: Storage = default_storage) -> bytes:
+    """Возвращает содержимое изображения без метаданных (EXIF, XMP,
+    комментарии) с примененным поворотом из EXIF или None, если
+    у изображения нет метаданных или его формат не поддерживается.
+    Файл в хранилище не изменяется."""
+    image: Image.Image = _open_image(name=name, storage=storage)
+    image_format: str = image.format
+    metadata_keys: set[str] = {'exif', 'xmp', 'comment', 'XML:com.adobe.xmp'}
+    has_metadata: bool = bool(metadata_keys & set(image.info))
+    if image_format not in STRIP_METADATA_FORMATS or not has_metadata:
+        return None
+    image = ImageOps.exif_transpose(image)
+    options: dict = {}
+    if image_format in ('JPEG', 'WEBP'):
+        options['quality'] = RECIPES_IMAGE_JPEG_QUALITY
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L', 'CMYK'):
+        image = image.convert('RGB')
+    buffer: BytesIO = BytesIO()
+    image.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
+
+def build_image_variants(
+        name: str, storage: Storage = default_storage) -> dict[str, str]:
+    """Создает уменьшенные WebP-варианты изображения согласно
+    "RECIPES_IMAGE_VARIANTS" и возвращает словарь
+    {название варианта: путь к файлу}.
+    Варианты сохраняются рядом с оригиналом в каталоге
+    "RECIPES_IMAGE_VARIANTS_DIR" (хранилище с адресацией по содержимому
+    само выбирает итоговое имя). Изображения меньше варианта
+    не увеличиваются."""
+    image: Image.Image = ImageOps.exif_transpose(
+        _open_image(name=name, storage=storage))
+    image = _to_webp_mode(image)
+    directory, filename = os.path.split(name)
+    stem: str = os.path.splitext(filename)[0]
+    variants: dict[str, str] = {}
+    for variant, size in RECIPES_IMAGE_VARIANTS.items():
+        thumbnail: Image.Image = image.copy()
+        thumbnail.thumbnail(size, Image.Resampling.LANCZOS)
+        buffer: BytesIO = BytesIO()
+        thumbnail.save(
+            buffer, format='WEBP', quality=RECIPES_IMAGE_WEBP_QUALITY)
+        variants[variant] = storage.save(
+            os.path.join(
+                directory, RECIPES_IMAGE_VARIANTS_DIR,
+                f'{stem}_{variant}.webp'),
+            ContentFile(buffer.getvalue()))
+    return variants
+
+
+def delete_image_files(
+        names: list[str], storage: Storage = default_storage) -> None:
+    """Удаляет перечисленные файлы изображений из хранилища.
+    Отсутствующие файлы пропускаются."""
+    for name in names:
+        if name and storage.exists(name):
+            storage.delete(name)
+    return
+
+
+def get_image_variant_url(
+        variants: dict[str, str],
+        variant: str,
+        storage: Storage = default_storage) -> str:
+    """Возвращает URL варианта изображения или None, если вариант
+    еще не создан."""
+    name: str = (variants or {}).get(variant)
+    if not name:
+        return None
+    return storage.url(name)
+
+
+def get_unreferenced_files(recipes, names: list[str]) -> list[str]:
+    """Возвращает файлы из names, на которые не ссылается ни один рецепт
+    из QuerySet recipes ни как на оригинал, ни как на вариант картинки.
+    Выполняет один запрос к БД."""
+    names = [name for name in names if name]
+    if not names:
+        return []
+    references: Q = Q(image__in=names)
+    for variant in RECIPES_IMAGE_VARIANTS:
+        references |= Q(**{f'image_variants__{variant}__in': names})
+    referenced: set[str] = set()
+    for image, variants in recipes.filter(references).values_list(
+            'image', 'image_variants'):
+        referenced.add(image)
+        referenced.update((variants or {}).values())
+    return [name for name in names if name not in referenced]
+
+
+def process_recipe_image(recipe) -> list[str]:
+    """Обрабатывает картинку рецепта: сохраняет оригинал без метаданных
+    под новым именем и переключает на него рецепт, пересоздает варианты
+    и сохраняет их пути в "image_variants". Варианты предыдущей картинки,
+    на которые не ссылаются другие рецепты, удаляются. Возвращает файлы,
+    которые больше не нужны рецепту, для постановки в очередь на удаление
+    (их могут использовать другие рецепты). Если картинка рецепта была
+    заменена во время обработки, обработка прекращается."""
+    storage: Storage = recipe.image.storage
+    old_variants: list[str] = list((recipe.image_variants or {}).values())
+    discarded: list[str] = []
+    content: bytes = strip_image_metadata(
+        name=recipe.image.name, storage=storage)
+    if content is not None:
+        original: str = recipe.image.name
+        name: str = storage.save(
+            recipe.image.field.generate_filename(
+                recipe, posixpath.basename(original)),
+            ContentFile(content))
+        if not type(recipe).objects.filter(
+                pk=recipe.pk, image=original).update(image=name):
+            return [name]
+        recipe.image.name = name
+        discarded.append(original)
+    variants: dict[str, str] = build_image_variants(
+        name=recipe.image.name, storage=storage)
+    recipe.image_variants = variants
+    type(recipe).objects.filter(pk=recipe.pk).update(image_variants=variants)
+    delete_image_files(
+        names=get_unreferenced_files(
+            recipes=type(recipe).objects.exclude(pk=recipe.pk),
+            names=[name for name in old_variants
+                   if name not in variants.values()]),
+        storage=storage)
+    return discarded
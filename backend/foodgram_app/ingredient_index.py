@@ -0,0 +1,287 @@
+"""
+Создает инвертированный индекс ингредиентов проекта "Foodgram" для поиска
+рецептов по имеющимся у пользователя ингредиентам.
+
+Индекс хранится в памяти процесса: для каждого ингредиента - сортированный
+массив numpy с ID рецептов, в которые он входит, для каждого рецепта -
+число его ингредиентов. Покрытие рецепта (доля его ингредиентов, имеющихся
+у пользователя) считается слиянием массивов запрошенных ингредиентов
+без запросов к БД.
+
+Индекс строится одним запросом при первом обращении и затем обновляется
+только для изменившихся рецептов по журналу "RecipesIngredientsLog":
+журнал опрашивается не чаще раза в "INGREDIENT_INDEX_POLL_INTERVAL" секунд
+одним запросом по первичному ключу, и пересобираются массивы только тех
+ингредиентов, которые входили или входят в изменившиеся рецепты. ID
+журнала, пропущенные при опросе (их транзакции еще не зафиксированы),
+перепроверяются при следующих опросах в течение
+"INGREDIENT_INDEX_GAP_TIMEOUT" секунд; если пропущенный ID так и не
+появился, индекс перестраивается целиком.
+
+Классы:
+    - IngredientIndex;
+    - IngredientIndexCache.
+
+Функции:
+    - get_ingredient_index;
+    - get_ingredient_index_cache;
+    - to_pairs.
+"""
+import threading
+import time
+from datetime import timedelta
+
+import numpy
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from foodgram_app.models import (
+    RECIPES_INGREDIENTS_LOG_RETENTION,
+    RecipesIngredients, RecipesIngredientsLog)
+
+INGREDIENT_INDEX_GAP_TIMEOUT: int = 60
+INGREDIENT_INDEX_MAX_GAPS: int = 10000
+INGREDIENT_INDEX_POLL_INTERVAL: float = 1.0
+
+
+def to_pairs(rows) -> numpy.ndarray:
+    """Преобразует пары (ID ингредиента, ID рецепта) в массив numpy
+    размерности (N, 2)."""
+    return numpy.array(list(rows), dtype=numpy.int64).reshape(-1, 2)
+
+
+class IngredientIndex():
+    """
+    Неизменяемый снимок инвертированного индекса ингредиентов.
+
+    Атрибуты:
+        - postings: dict[int, numpy.ndarray]
+            - сортированные ID рецептов для каждого ID ингредиента
+        - ingredients: dict[int, numpy.ndarray]
+            - сортированные ID ингредиентов для каждого ID рецепта
+        - recipe_ids: numpy.ndarray
+            - сортированные ID всех рецептов с ингредиентами
+        - sizes: numpy.ndarray
+            - число ингредиентов рецептов из recipe_ids
+    """
+
+    def __init__(
+            self,
+            postings: dict[int, numpy.ndarray],
+            ingredients: dict[int, numpy.ndarray],
+            recipe_ids: numpy.ndarray,
+            sizes: numpy.ndarray):
+        self.postings: dict[int, numpy.ndarray] = postings
+        self.ingredients: dict[int, numpy.ndarray] = ingredients
+        self.recipe_ids: numpy.ndarray = recipe_ids
+        self.sizes: numpy.ndarray = sizes
+
+    @classmethod
+    def from_pairs(cls, pairs: numpy.ndarray) -> 'IngredientIndex':
+        """Создает индекс из массива пар (ID ингредиента, ID рецепта)."""
+        pairs = pairs[numpy.lexsort((pairs[:, 1], pairs[:, 0]))]
+        ingredient_ids, starts = numpy.unique(pairs[:, 0], return_index=True)
+        postings: dict[int, numpy.ndarray] = dict(zip(
+            ingredient_ids.tolist(), numpy.split(pairs[:, 1], starts[1:])))
+        pairs = pairs[numpy.lexsort((pairs[:, 0], pairs[:, 1]))]
+        recipe_ids, starts, sizes = numpy.unique(
+            pairs[:, 1], return_index=True, return_counts=True)
+        ingredients: dict[int, numpy.ndarray] = dict(zip(
+            recipe_ids.tolist(), numpy.split(pairs[:, 0], starts[1:])))
+        return cls(
+            postings=postings, ingredients=ingredients,
+            recipe_ids=recipe_ids, sizes=sizes)
+
+    @classmethod
+    def build(cls) -> 'IngredientIndex':
+        """Создает индекс одним запросом к "RecipesIngredients"."""
+        return cls.from_pairs(pairs=to_pairs(
+            RecipesIngredients.objects.order_by().values_list(
+                'ingredient_id', 'recipe_id').iterator()))
+
+    def search(
+            self,
+            ingredient_ids: list[int],
+            min_coverage: float) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Возвращает ID рецептов с покрытием ингредиентами ingredient_ids
+        не менее min_coverage и их покрытие. Рецепты отсортированы
+        по убыванию покрытия, при равном покрытии - по убыванию ID."""
+        postings: list[numpy.ndarray] = [
+            self.postings[ingredient_id]
+            for ingredient_id in set(ingredient_ids)
+            if ingredient_id in self.postings]
+        if not postings:
+            empty: numpy.ndarray = numpy.array([], dtype=numpy.int64)
+            return empty, empty.astype(numpy.float64)
+        candidates, matched = numpy.unique(
+            numpy.concatenate(postings), return_counts=True)
+        coverage: numpy.ndarray = matched / self.sizes[
+            numpy.searchsorted(self.recipe_ids, candidates)]
+        keep: numpy.ndarray = coverage >= min_coverage
+        candidates, coverage = candidates[keep], coverage[keep]
+        order: numpy.ndarray = numpy.lexsort((-candidates, -coverage))
+        return candidates[order], coverage[order]
+
+    def updated(
+            self,
+            recipe_ids: list[int],
+            pairs: numpy.ndarray) -> 'IngredientIndex':
+        """Возвращает новый индекс, в котором ингредиенты рецептов
+        recipe_ids заменены парами (ID ингредиента, ID рецепта) pairs.
+        Пересобираются только массивы ингредиентов, которые входили
+        или входят в рецепты recipe_ids, остальные массивы переходят
+        в новый индекс без копирования. Текущий индекс не изменяется,
+        поэтому его можно продолжать использовать в других потоках."""
+        changed: numpy.ndarray = numpy.unique(
+            numpy.array(list(recipe_ids), dtype=numpy.int64))
+        added: IngredientIndex = IngredientIndex.from_pairs(pairs=pairs)
+        ingredients: dict[int, numpy.ndarray] = dict(self.ingredients)
+        touched: set[int] = set(added.postings)
+        for recipe_id in changed.tolist():
+            previous: numpy.ndarray = ingredients.pop(recipe_id, None)
+            if previous is not None:
+                touched.update(previous.tolist())
+        ingredients.update(added.ingredients)
+        postings: dict[int, numpy.ndarray] = dict(self.postings)
+        for ingredient_id in touched:
+            posting: numpy.ndarray = postings.pop(
+                ingredient_id, numpy.array([], dtype=numpy.int64))
+            posting = posting[
+                ~numpy.isin(posting, changed, assume_unique=True)]
+            if ingredient_id in added.postings:
+                posting = numpy.union1d(
+                    posting, added.postings[ingredient_id])
+            if posting.size:
+                postings[ingredient_id] = posting
+        positions: numpy.ndarray = numpy.searchsorted(
+            self.recipe_ids, changed)
+        found: numpy.ndarray = positions < self.recipe_ids.size
+        found[found] = self.recipe_ids[positions[found]] == changed[found]
+        all_recipe_ids: numpy.ndarray = numpy.delete(
+            self.recipe_ids, positions[found])
+        sizes: numpy.ndarray = numpy.delete(self.sizes, positions[found])
+        positions = numpy.searchsorted(all_recipe_ids, added.recipe_ids)
+        return IngredientIndex(
+            postings=postings,
+            ingredients=ingredients,
+            recipe_ids=numpy.insert(
+                all_recipe_ids, positions, added.recipe_ids),
+            sizes=numpy.insert(sizes, positions, added.sizes))
+
+
+class IngredientIndexCache():
+    """
+    Хранит индекс ингредиентов процесса и обновляет его по журналу
+    "RecipesIngredientsLog".
+
+    Индекс перестраивается целиком при первом обращении, если процесс
+    не опрашивал журнал дольше срока хранения его записей, если
+    пропущенных ID журнала больше "INGREDIENT_INDEX_MAX_GAPS" или если
+    пропущенный ID не появился в журнале за "gap_timeout" секунд (запись
+    могла быть зафиксирована позже, и ее изменение иначе было бы потеряно).
+    """
+
+    def __init__(
+            self,
+            poll_interval: float = INGREDIENT_INDEX_POLL_INTERVAL,
+            gap_timeout: int = INGREDIENT_INDEX_GAP_TIMEOUT):
+        self.poll_interval: float = poll_interval
+        self.gap_timeout: int = gap_timeout
+        self._index: IngredientIndex = None
+        self._gaps: dict[int, float] = {}
+        self._last_log_id: int = 0
+        self._polled_at: float = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, fresh: bool = False) -> IngredientIndex:
+        """Возвращает актуальный индекс, при необходимости обновляя его.
+        С fresh=True журнал опрашивается независимо от "poll_interval"."""
+        index: IngredientIndex = self._index
+        is_due: bool = fresh or self._is_poll_due(time.monotonic())
+        if index is not None and not is_due:
+            return index
+        with self._lock:
+            now: float = time.monotonic()
+            max_idle: float = (
+                RECIPES_INGREDIENTS_LOG_RETENTION - self.gap_timeout)
+            if self._index is None or now - self._polled_at > max_idle:
+                self._rebuild(now=now)
+            elif fresh or self._is_poll_due(now):
+                self._poll(now=now)
+            self._polled_at = now
+            return self._index
+
+    def clear(self) -> None:
+        """Сбрасывает индекс: он будет построен заново при обращении."""
+        with self._lock:
+            self._index = None
+
+    def _rebuild(self, now: float) -> None:
+        """Вспомогательная функция: перестраивает индекс целиком.
+        Изменения, записанные в журнал во время построения, применяются
+        повторно при следующем опросе. ID журнала за последние
+        "gap_timeout" секунд, не видимые в момент построения, считаются
+        пропущенными."""
+        recent_ids: set[int] = set(RecipesIngredientsLog.objects.filter(
+            created__gte=timezone.now() - timedelta(seconds=self.gap_timeout)
+        ).values_list('id', flat=True))
+        self._last_log_id = RecipesIngredientsLog.objects.aggregate(
+            last_id=Max('id'))['last_id'] or 0
+        self._gaps = {
+            log_id: now
+            for log_id in range(min(recent_ids, default=self._last_log_id),
+                                self._last_log_id)
+            if log_id not in recent_ids}
+        self._index = IngredientIndex.build()
+        return
+
+    def _is_poll_due(self, now: float) -> bool:
+        """Вспомогательная функция: проверяет, пора ли опросить журнал."""
+        return now - self._polled_at >= self.poll_interval
+
+    def _poll(self, now: float) -> None:
+        """Вспомогательная функция: применяет к индексу изменения рецептов
+        из новых записей журнала и из ранее пропущенных ID журнала.
+        Если срок ожидания пропущенного ID истек, перестраивает индекс
+        целиком."""
+        if any(now - noticed >= self.gap_timeout
+               for noticed in self._gaps.values()):
+            self._rebuild(now=now)
+            return
+        rows: list[tuple[int, int]] = list(
+            RecipesIngredientsLog.objects.filter(
+                Q(id__gt=self._last_log_id) | Q(id__in=list(self._gaps)))
+            .order_by().values_list('id', 'recipe_id'))
+        if not rows:
+            return
+        seen: set[int] = {log_id for log_id, _ in rows}
+        last_log_id: int = max(max(seen), self._last_log_id)
+        for log_id in range(self._last_log_id + 1, last_log_id):
+            if log_id not in seen:
+                self._gaps[log_id] = now
+        for log_id in seen:
+            self._gaps.pop(log_id, None)
+        self._last_log_id = last_log_id
+        if len(self._gaps) > INGREDIENT_INDEX_MAX_GAPS:
+            self._rebuild(now=now)
+            return
+        recipe_ids: set[int] = {recipe_id for _, recipe_id in rows}
+        self._index = self._index.updated(
+            recipe_ids=recipe_ids,
+            pairs=to_pairs(RecipesIngredients.objects.filter(
+                recipe_id__in=recipe_ids).order_by().values_list(
+                    'ingredient_id', 'recipe_id')))
+        return
+
+
+_ingredient_index_cache: IngredientIndexCache = IngredientIndexCache()
+
+
+def get_ingredient_index_cache() -> IngredientIndexCache:
+    """Возвращает хранилище индекса ингредиентов процесса."""
+    return _ingredient_index_cache
+
+
+def get_ingredient_index() -> IngredientIndex:
+    """Возвращает актуальный индекс ингредиентов процесса."""
+    return _ingredient_index_cache.get()
@@ -0,0 +1,73 @@
+import time
+from typing import Callable
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Model
+
+from foodgram_app.models import (
+    Recipes, RecipesFavorites, ShoppingCarts, Subscriptions)
+from foodgram_app.validation import VALIDATION_MODES, validation_mode
+
+BENCHMARK_IMAGE_NAME: str = 'recipes/images/benchmark.gif'
+
+
+class Command(BaseCommand):
+    """Измеряет число сохранений объектов в секунду через save()
+    для режимов валидации из "foodgram_app/validation.py".
+    Все объекты создаются в транзакции, которая откатывается после
+    измерения, поэтому БД не изменяется.
+    Пример: python manage.py benchmark_writes --count 1000"""
+
+    help = 'Измеряет число сохранений в секунду для режимов валидации'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=500,
+            help='Число сохранений каждой модели в каждом режиме.')
+
+    def handle(self, *args, **options):
+        count: int = options['count']
+        self.stdout.write(
+            f'{"model":<18}{"mode":<14}{"ms/write":>10}{"writes/sec":>14}')
+        with transaction.atomic():
+            for mode in VALIDATION_MODES:
+                self._benchmark_mode(count=count, mode=mode)
+            transaction.set_rollback(True)
+        return
+
+    def _benchmark_mode(self, count: int, mode: str) -> None:
+        """Вспомогательная функция: создает count объектов каждой модели
+        в режиме валидации mode и выводит результаты."""
+        users: list[User] = User.objects.bulk_create([
+            User(username=f'benchmark_{mode}_{num}',
+                 email=f'benchmark_{mode}_{num}@email.com')
+            for num in range(count + 1)])
+        author: User = users.pop()
+        recipes: list[Recipes] = [
+            Recipes(author=author, cooking_time=1, image=BENCHMARK_IMAGE_NAME,
+                    name=f'benchmark_{mode}_{num}', text='benchmark')
+            for num in range(count)]
+        factories: dict[str, Callable[[int], Model]] = {
+            'Recipes': lambda num: recipes[num],
+            'RecipesFavorites': lambda num: RecipesFavorites(
+                recipe=recipes[num], user=author),
+            'ShoppingCarts': lambda num: ShoppingCarts(
+                recipe=recipes[num], user=author),
+            'Subscriptions': lambda num: Subscriptions(
+                subscriber=author, subscription_to=users[num])}
+        with validation_mode(mode):
+            for model_name, factory in factories.items():
+                objects: list[Model] = [factory(num) for num in range(count)]
+                started: float = time.perf_counter()
+                for obj in objects:
+                    obj.save()
+                elapsed: float = time.perf_counter() - started
+                self.stdout.write(
+                    f'{model_name:<18}{mode:<14}'
+                    f'{elapsed / count * 1000:>10.3f}'
+                    f'{count / elapsed:>14.1f}')
+        return
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from foodgram_app.models import (
+    RECIPES_IMAGE_STATUS_FAILED, RECIPES_IMAGE_STATUS_PENDING, Recipes)
+from foodgram_app.tasks import finalize_recipe_image
+
+
+class Command(BaseCommand):
+    """Синхронно обрабатывает картинки рецептов, у которых нет вариантов
+    или обработка которых не завершена (например, созданных до появления
+    конвейера обработки изображений или потерянных фоновым пулом при
+    перезапуске процесса). С флагом "--all" обрабатывает все рецепты.
+    Пример: python manage.py build_image_variants --all"""
+
+    help = 'Создает уменьшенные варианты картинок рецептов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Пересоздать варианты для всех рецептов.')
+
+    def handle(self, *args, **options):
+        recipes = Recipes.objects.all()
+        if not options['all']:
+            unprocessed: Q = Q(image_variants={})
+            unprocessed |= Q(image_status=RECIPES_IMAGE_STATUS_PENDING)
+            recipes = recipes.filter(unprocessed)
+        processed: int = 0
+        failed: int = 0
+        for recipe_id in recipes.values_list('id', flat=True).iterator():
+            status: str = finalize_recipe_image(recipe_id=recipe_id)
+            if status == RECIPES_IMAGE_STATUS_FAILED:
+                failed += 1
+                self.stderr.write(
+                    f'Рецепт id={recipe_id}: картинка повреждена.')
+            elif status is not None:
+                processed += 1
+        self.stdout.write(
+            f'Обработано рецептов: {processed}, с ошибками: {failed}.')
+        return
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from foodgram_app.recommendations import (
+    RECOMMENDATIONS_BATCH_SIZE, RECOMMENDATIONS_TOP_N,
+    RECOMMENDATIONS_USERS_BLOCK_SIZE, build_recommendations)
+
+
+class Command(BaseCommand):
+    """Рассчитывает персональные рекомендации рецептов по избранному,
+    спискам покупок и подпискам пользователей и заменяет содержимое
+    таблицы "RecipeRecommendations". Расчет выполняется в одном процессе
+    без внешних сервисов и предназначен для запуска по расписанию.
+    Пример: python manage.py build_recommendations --top-n 100"""
+
+    help = 'Рассчитывает персональные рекомендации рецептов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-n',
+            type=int,
+            default=RECOMMENDATIONS_TOP_N,
+            help='Число рекомендаций для каждого пользователя.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=RECOMMENDATIONS_BATCH_SIZE,
+            help='Число строк в одном запросе записи.')
+        parser.add_argument(
+            '--block-size',
+            type=int,
+            default=RECOMMENDATIONS_USERS_BLOCK_SIZE,
+            help='Число пользователей, рассчитываемых и записываемых '
+                 'за один шаг.')
+
+    def handle(self, *args, **options):
+        rows: int = build_recommendations(
+            top_n=options['top_n'],
+            batch_size=options['batch_size'],
+            block_size=options['block_size'])
+        self.stdout.write(f'Записано рекомендаций: {rows}.')
+        return
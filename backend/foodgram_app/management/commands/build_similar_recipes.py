@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from foodgram_app.similarity import (
+    SIMILAR_RECIPES_BATCH_SIZE, SIMILAR_RECIPES_BLOCK_SIZE,
+    SIMILAR_RECIPES_TOP_K, build_similar_recipes)
+
+
+class Command(BaseCommand):
+    """Пересчитывает похожие рецепты для всех рецептов и заменяет
+    содержимое таблицы "SimilarRecipes" (например, после первого
+    развертывания или если инкрементальные пересчеты были потеряны фоновым
+    пулом при перезапуске процесса).
+    Пример: python manage.py build_similar_recipes --top-k 10"""
+
+    help = 'Пересчитывает похожие рецепты по совпадению ингредиентов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=SIMILAR_RECIPES_TOP_K,
+            help='Число похожих рецептов для каждого рецепта.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=SIMILAR_RECIPES_BATCH_SIZE,
+            help='Число строк в одном запросе записи.')
+        parser.add_argument(
+            '--block-size',
+            type=int,
+            default=SIMILAR_RECIPES_BLOCK_SIZE,
+            help='Число рецептов, рассчитываемых и записываемых '
+                 'за один шаг.')
+
+    def handle(self, *args, **options):
+        rows: int = build_similar_recipes(
+            top_k=options['top_k'],
+            batch_size=options['batch_size'],
+            block_size=options['block_size'])
+        self.stdout.write(f'Записано похожих рецептов: {rows}.')
+        return
@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.core.files.storage import Storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from foodgram_app.models import RECIPES_MEDIA_ROOT, MediaGarbage, Recipes
+from foodgram_app.storage import recipes_image_storage
+from foodgram_app.tasks import sweep_media_garbage
+
+RECONCILE_CHUNK_SIZE: int = 2000
+RECONCILE_MIN_AGE: int = 3600
+
+
+class Command(BaseCommand):
+    """Сверяет файлы каталога картинок рецептов ("RECIPES_MEDIA_ROOT")
+    со ссылками рецептов на картинки и их варианты. Файлы без ссылок
+    ставятся в очередь "MediaGarbage", после чего очередь удаляется
+    пакетами (см. "sweep_media_garbage" в "foodgram_app/tasks.py").
+    Файлы моложе "--min-age" секунд не трогаются: они могут принадлежать
+    еще не зафиксированной транзакции создания рецепта.
+    Пример: python manage.py reconcile_media --dry-run"""
+
+    help = 'Удаляет медиа-файлы рецептов, на которые нет ссылок'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только вывести файлы без ссылок.')
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=RECONCILE_MIN_AGE,
+            help='Минимальный возраст файла в секундах.')
+
+    def handle(self, *args, **options):
+        storage: Storage = recipes_image_storage
+        modified_before = timezone.now() - timedelta(
+            seconds=options['min_age'])
+        referenced: set[str] = set()
+        recipes = Recipes.objects.values_list('image', 'image_variants')
+        for image, variants in recipes.iterator(
+                chunk_size=RECONCILE_CHUNK_SIZE):
+            referenced.add(image)
+            referenced.update((variants or {}).values())
+        orphans: list[str] = [
+            name for name in self._list_files(storage, RECIPES_MEDIA_ROOT)
+            if name not in referenced]
+        orphans = [
+            name for name in orphans
+            if storage.get_modified_time(name) < modified_before]
+        if options['dry_run']:
+            for name in orphans:
+                self.stdout.write(name)
+            self.stdout.write(f'Файлов без ссылок: {len(orphans)}.')
+            return
+        for start in range(0, len(orphans), RECONCILE_CHUNK_SIZE):
+            MediaGarbage.objects.enqueue(
+                names=orphans[start:start + RECONCILE_CHUNK_SIZE])
+        deleted: int = sweep_media_garbage()
+        self.stdout.write(f'Удалено файлов: {deleted}.')
+        return
+
+    def _list_files(self, storage: Storage, path: str):
+        """Вспомогательная функция: рекурсивно перечисляет файлы
+        директории хранилища."""
+        if not storage.exists(path):
+            return
+        directories, files = storage.listdir(path)
+        for filename in files:
+            yield f'{path}/{filename}'
+        for directory in directories:
+            yield from self._list_files(storage, f'{path}/{directory}')
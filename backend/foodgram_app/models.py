@@ -2,35 +2,81 @@
 Создает модели проекта "Footgram".
 
 Классы-модели:
+    - ValidatedModel (абстрактная)
+    - CatalogVersion
     - Ingredients
+    - MediaGarbage
     - Recipes
     - RecipesFavorites
     - RecipesIngredients
+    - RecipesIngredientsLog
+    - RecipeRecommendations
     - RecipesTags
     - ShoppingCarts
+    - SimilarRecipes
     - Subscriptions
     - Tags
 
+Классы-менеджеры:
+    - CatalogVersionManager
+    - MediaGarbageManager
+    - RecipesIngredientsLogManager
+    - RecipesQuerySet
+    - UniqueRelationManager
+
 Создает список используемых в проекте единиц измерения ингредиентов: "UNITS".
+Создает список статусов обработки картинок рецептов: "IMAGE_STATUSES".
+Создает сигнал изменения состава рецептов: "recipe_ingredients_changed".
 """
-import os
+from datetime import timedelta
 
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, RegexValidator
+from django.db import connections, router, transaction
 from django.db.models import (
     CASCADE, SET_NULL,
-    Model,
-    CharField, FloatField, ForeignKey, ImageField,
-    ManyToManyField, PositiveSmallIntegerField, SlugField, TextField,
-    UniqueConstraint)
+    F, Index, Manager, Model, QuerySet,
+    BigIntegerField, CharField, DateTimeField, FloatField, ForeignKey,
+    ImageField, JSONField, ManyToManyField, PositiveBigIntegerField,
+    PositiveIntegerField, PositiveSmallIntegerField,
+    SlugField, TextField, UniqueConstraint)
+from django.db.models.constants import OnConflict
+from django.dispatch import Signal
+from django.utils import timezone
+
+from foodgram_app.storage import recipes_image_storage
+from foodgram_app.validation import VALIDATION_MODE_FULL, get_validation_mode
 
 INGREDIENTS_NAME_MAX_LENGTH: int = 99
 INGREDIENTS_UNIT_MAX_LENGTH: int = 48
+MEDIA_GARBAGE_NAME_MAX_LEN: int = 255
 TAGS_COLOR_MAX_LEN: int = 7
 TAGS_NAME_MAX_LEN: int = 200
 TAGS_SLUG_MAX_LEN: int = 200
+RECIPES_IMAGE_STATUS_FAILED: str = 'failed'
+RECIPES_IMAGE_STATUS_PENDING: str = 'pending'
+RECIPES_IMAGE_STATUS_READY: str = 'ready'
+RECIPES_IMAGE_STATUS_MAX_LEN: int = 7
 RECIPES_MEDIA_ROOT: str = 'recipes/images'
 RECIPES_NAME_MAX_LEN: int = 128
+RECIPES_BULK_DELETE_BATCH_SIZE: int = 500
+RECIPES_INGREDIENTS_LOG_RETENTION: int = 3600
+CATALOG_VERSION_ID: int = 1
+
+IMAGE_STATUSES: list[tuple[str]] = [
+    (RECIPES_IMAGE_STATUS_FAILED, 'Ошибка обработки'),
+    (RECIPES_IMAGE_STATUS_PENDING, 'Обрабатывается'),
+    (RECIPES_IMAGE_STATUS_READY, 'Готова'),
+]
+
+"""Отправляется при записи в журнал "RecipesIngredientsLog" с аргументами
+recipe_ids (множество ID рецептов) и using (псевдоним БД)."""
+recipe_ingredients_changed: Signal = Signal()
+
+"""Отправляется после массового удаления рецептов
+"RecipesQuerySet.bulk_delete" с аргументами recipe_ids (список ID удаленных
+рецептов) и using (псевдоним БД)."""
+recipes_bulk_deleted: Signal = Signal()
 
 UNITS: list[tuple[str]] = [
     ('банка', 'банка'),
@@ -65,7 +111,243 @@ UNITS: list[tuple[str]] = [
     ('щепотка', 'щепотка')]
 
 
-class Ingredients(Model):
+class CatalogVersionManager(Manager):
+    """Менеджер версии справочников тегов и ингредиентов
+    ("CatalogVersion")."""
+
+    def bump(self) -> None:
+        """Увеличивает версию справочников одним запросом к БД (при первом
+        вызове создает запись). Выполняется в текущей транзакции."""
+        if self.filter(id=CATALOG_VERSION_ID).update(
+                version=F('version') + 1):
+            return
+        _, created = self.get_or_create(
+            id=CATALOG_VERSION_ID, defaults={'version': 1})
+        if not created:
+            self.filter(id=CATALOG_VERSION_ID).update(
+                version=F('version') + 1)
+        return
+
+    def current(self) -> int:
+        """Возвращает текущую версию справочников (0, если справочники
+        еще не изменялись)."""
+        return self.filter(id=CATALOG_VERSION_ID).values_list(
+            'version', flat=True).first() or 0
+
+
+class MediaGarbageManager(Manager):
+    """Менеджер очереди медиа-файлов на удаление ("MediaGarbage")."""
+
+    def enqueue(self, names: list[str]) -> None:
+        """Ставит файлы в очередь на удаление одним запросом к БД.
+        Файлы, уже стоящие в очереди, и пустые имена пропускаются.
+        Запись выполняется в текущей транзакции: при ее откате файлы
+        не будут удалены."""
+        self.bulk_create(
+            [self.model(name=name) for name in set(names) if name],
+            ignore_conflicts=True)
+        return
+
+
+class RecipesIngredientsLogManager(Manager):
+    """Менеджер журнала изменений состава рецептов
+    ("RecipesIngredientsLog")."""
+
+    def log(self, recipe_ids: list[int]) -> None:
+        """Записывает в журнал ID рецептов, состав ингредиентов которых
+        изменился, одним запросом к БД и удаляет записи старше
+        "RECIPES_INGREDIENTS_LOG_RETENTION" секунд вторым запросом.
+        Запись выполняется в текущей транзакции, затем отправляется сигнал
+        "recipe_ingredients_changed"."""
+        recipe_ids: set[int] = set(recipe_ids)
+        if not recipe_ids:
+            return
+        self.bulk_create(
+            [self.model(recipe_id=recipe_id) for recipe_id in recipe_ids])
+        self.filter(created__lt=timezone.now() - timedelta(
+            seconds=RECIPES_INGREDIENTS_LOG_RETENTION)).delete()
+        recipe_ingredients_changed.send(
+            sender=self.model, recipe_ids=recipe_ids, using=self.db)
+        return
+
+
+class RecipesQuerySet(QuerySet):
+    """QuerySet модели "Recipes" с массовым удалением без сборщика Django."""
+
+    def bulk_delete(self) -> int:
+        """Удаляет рецепты QuerySet и зависимые строки запросами над
+        множествами в порядке зависимостей (пакетами по
+        "RECIPES_BULK_DELETE_BATCH_SIZE" рецептов):
+            - "RecipesIngredients", "RecipesTags", "RecipesFavorites",
+              "SimilarRecipes" - удаление (с записью в журнал
+              "RecipesIngredientsLog");
+            - "ShoppingCarts" - обнуление ссылки на рецепт (SET_NULL);
+            - картинки рецептов и их варианты - постановка
+              в очередь "MediaGarbage";
+            - "Recipes" - удаление.
+        Объекты не загружаются в память, сигналы pre_delete/post_delete
+        для рецептов не отправляются: их единственный получатель
+        ("discard_recipe_media") заменен постановкой файлов в очередь.
+        После удаления отправляется сигнал "recipes_bulk_deleted", его
+        получатель запускает удаление очереди после фиксации транзакции.
+        Возвращает число удаленных рецептов."""
+        recipe_ids: list[int] = list(
+            self.order_by().values_list('id', flat=True))
+        with transaction.atomic(using=self.db):
+            for start in range(
+                    0, len(recipe_ids), RECIPES_BULK_DELETE_BATCH_SIZE):
+                batch: list[int] = recipe_ids[
+                    start:start + RECIPES_BULK_DELETE_BATCH_SIZE]
+                RecipesIngredientsLog.objects.db_manager(self.db).log(
+                    recipe_ids=batch)
+                for model in (RecipesIngredients, RecipesTags,
+                              RecipesFavorites, SimilarRecipes):
+                    model.objects.using(self.db).filter(
+                        recipe_id__in=batch)._raw_delete(using=self.db)
+                ShoppingCarts.objects.using(self.db).filter(
+                    recipe_id__in=batch).update(recipe=None)
+                recipes = Recipes.objects.using(self.db).filter(id__in=batch)
+                names: list[str] = []
+                for image, variants in recipes.values_list(
+                        'image', 'image_variants'):
+                    names.append(image)
+                    names.extend((variants or {}).values())
+                MediaGarbage.objects.db_manager(self.db).enqueue(names=names)
+                recipes._raw_delete(using=self.db)
+            if recipe_ids:
+                recipes_bulk_deleted.send(
+                    sender=Recipes, recipe_ids=recipe_ids, using=self.db)
+        return len(recipe_ids)
+
+
+class IngredientsQuerySet(QuerySet):
+    """QuerySet модели "Ingredients" с удалением рецептов, в которые входят
+    ингредиенты, без сборщика Django."""
+
+    def delete_recipes(self) -> int:
+        """Удаляет рецепты, в которые входят ингредиенты QuerySet,
+        через "RecipesQuerySet.bulk_delete" и возвращает их число."""
+        recipes_del_ids = RecipesIngredients.objects.using(self.db).filter(
+            ingredient__in=self.order_by().values('id')).values('recipe_id')
+        return Recipes.objects.using(self.db).filter(
+            id__in=recipes_del_ids).bulk_delete()
+
+    def delete(self):
+        """Удаляет ингредиенты QuerySet вместе с их рецептами. Рецепты
+        удаляются до запуска сборщика Django, поэтому связи
+        "RecipesIngredients" не загружаются в память."""
+        with transaction.atomic(using=self.db):
+            self.delete_recipes()
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+class UniqueRelationManager(Manager):
+    """
+    Менеджер для моделей-связей с ограничением уникальности
+    ("RecipesFavorites", "ShoppingCarts", "Subscriptions").
+
+    Позволяет создавать и удалять связь одним запросом к БД, определяя
+    по числу затронутых строк, существовала ли связь ранее. Проверки
+    уникальности выполняются самой БД, а не через "full_clean()".
+    """
+
+    def create_if_not_exists(self, **fields) -> bool:
+        """Создает связь запросом "INSERT ... ON CONFLICT DO NOTHING".
+        Возвращает True, если связь создана, и False, если она уже
+        существовала. Значениями полей-связей могут быть объекты или их ID.
+        Существование связываемых объектов не проверяется."""
+        connection = connections[self.db]
+        opts = self.model._meta
+        columns: list[str] = []
+        params: list = []
+        for name, value in fields.items():
+            field = opts.get_field(name)
+            columns.append(connection.ops.quote_name(field.column))
+            params.append(field.get_db_prep_save(
+                getattr(value, 'pk', value), connection=connection))
+        sql: str = '{insert} {table} ({columns}) VALUES ({values}) {suffix}'
+        sql = sql.format(
+            insert=connection.ops.insert_statement(
+                on_conflict=OnConflict.IGNORE),
+            table=connection.ops.quote_name(opts.db_table),
+            columns=', '.join(columns),
+            values=', '.join(['%s'] * len(params)),
+            suffix=connection.ops.on_conflict_suffix_sql(
+                fields=(),
+                on_conflict=OnConflict.IGNORE,
+                update_fields=(),
+                unique_fields=()))
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount > 0
+
+    def delete_if_exists(self, **filters) -> bool:
+        """Удаляет связь одним запросом "DELETE ... WHERE ...".
+        Возвращает True, если связь была удалена, и False, если ее не было.
+        Модели-связи не имеют зависимых объектов, поэтому Django выполняет
+        удаление без предварительной выборки."""
+        deleted, _ = self.filter(**filters).delete()
+        return deleted > 0
+
+
+class ValidatedModel(Model):
+    """
+    Абстрактная модель с проверкой объекта перед сохранением в БД.
+
+    Объем проверки зависит от режима валидации (см.
+    "foodgram_app/validation.py"): в полном режиме вызывается
+    "full_clean()", в режиме "constraints" - только проверка значений
+    полей без запросов к БД (уникальность, ограничения и связи проверяет
+    сама БД).
+    """
+
+    class Meta:
+        abstract = True
+
+    def validate_on_save(self) -> None:
+        """Проверяет объект согласно текущему режиму валидации."""
+        if get_validation_mode() == VALIDATION_MODE_FULL:
+            self.full_clean()
+            return
+        self.full_clean(
+            exclude=[
+                field.name for field in self._meta.concrete_fields
+                if field.is_relation],
+            validate_unique=False,
+            validate_constraints=False)
+        return
+
+
+class CatalogVersion(Model):
+    """
+    Класс для представления версии справочников тегов и ингредиентов.
+
+    Таблица содержит одну запись, версия которой увеличивается при каждом
+    изменении "Tags" и "Ingredients". По версии процессы определяют, что
+    их копия справочников устарела (см. "foodgram_app/catalog.py").
+
+    Атрибуты:
+        - version: int
+            - номер версии
+    """
+    version = PositiveBigIntegerField(
+        default=0,
+        verbose_name='Версия')
+
+    objects = CatalogVersionManager()
+
+    class Meta:
+        verbose_name = 'Версия справочников'
+        verbose_name_plural = 'Версии справочников'
+
+    def __str__(self):
+        return f'Версия {self.version}'
+
+
+class Ingredients(ValidatedModel):
     """
     Класс для представления ингредиентов.
 
@@ -103,16 +385,27 @@ class Ingredients(Model):
         verbose_name = 'Ингредиент'
         verbose_name_plural = 'Ингредиенты'
 
+    objects = IngredientsQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
-        self.full_clean()
+        self.validate_on_save()
         self.name = self.name.lower()
         super().save(*args, **kwargs)
 
+    def delete(self, using=None, keep_parents=False):
+        """Удаляет ингредиент вместе с его рецептами (см.
+        "IngredientsQuerySet.delete")."""
+        using = using or router.db_for_write(self.__class__, instance=self)
+        with transaction.atomic(using=using):
+            Ingredients.objects.using(using).filter(
+                id=self.id).delete_recipes()
+            return super().delete(using=using, keep_parents=keep_parents)
+
     def __str__(self):
         return f'{self.name} ({self.measurement_unit})'
 
 
-class Tags(Model):
+class Tags(ValidatedModel):
     """
     Класс для представления тегов.
 
@@ -172,11 +465,50 @@ class Tags(Model):
 
     def save(self, *args, **kwargs):
         """Производит проверку валидности полей и сохраняет объект в БД."""
-        self.full_clean()
+        self.validate_on_save()
         super().save(*args, **kwargs)
 
 
-class Recipes(Model):
+class MediaGarbage(Model):
+    """
+    Класс для представления очереди медиа-файлов на удаление.
+
+    Файлы ставятся в очередь при удалении рецептов и замене их картинок
+    и удаляются пакетами после фиксации транзакции
+    (см. "sweep_media_garbage" в "foodgram_app/tasks.py"). Файл, на который
+    к моменту удаления снова ссылается рецепт, не удаляется, а повторное
+    сохранение файла снимает его с очереди (см. "ContentAddressedStorage").
+
+    Метод __str__ возвращает путь к файлу:
+        "recipes/images/ab/ab12...ef.png"
+
+    Атрибуты:
+        - created: datetime
+            - дата постановки в очередь
+        - name: str
+            - путь к файлу в хранилище
+            - установлено ограничение по уникальности
+    """
+    created = DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата постановки в очередь')
+    name = CharField(
+        max_length=MEDIA_GARBAGE_NAME_MAX_LEN,
+        unique=True,
+        verbose_name='Путь к файлу')
+
+    objects = MediaGarbageManager()
+
+    class Meta:
+        ordering = ('id',)
+        verbose_name = 'Медиа-файл на удаление'
+        verbose_name_plural = 'Медиа-файлы на удаление'
+
+    def __str__(self):
+        return self.name
+
+
+class Recipes(ValidatedModel):
     """
     Класс для представления рецептов.
 
@@ -193,8 +525,20 @@ class Recipes(Model):
         - cooking_time: int
             - время приготовления рецепта (в минутах)
             - установлено ограничение по значению: не менее 1
+            - индексируется составными индексами (cooking_time, -id) и
+              (author, cooking_time, -id) для фильтрации по диапазону
+              и сортировки по времени приготовления
         - image: str
             - картинка рецепта (Base64)
+            - хранится под именем по хешу содержимого
+              (см. "foodgram_app/storage.py")
+            - индексируется
+        - image_status: str
+            - статус фоновой обработки картинки (см. "foodgram_app/tasks.py")
+            - до завершения обработки вместо картинки выдается заглушка
+        - image_variants: dict
+            - пути к уменьшенным WebP-вариантам картинки
+              (см. "foodgram_app/images.py")
         - ingredients:
             - список ингредиентов
             - связь через ManyToManyField и таблицу "RecipesIngredients"
@@ -221,8 +565,21 @@ class Recipes(Model):
                 message='Время должно составлять не менее 1 минуты!')],
         verbose_name='Время приготовления (мин.)')
     image = ImageField(
+        db_index=True,
+        storage=recipes_image_storage,
         upload_to=RECIPES_MEDIA_ROOT,
         verbose_name='Картинка рецепта')
+    image_status = CharField(
+        choices=IMAGE_STATUSES,
+        default=RECIPES_IMAGE_STATUS_READY,
+        editable=False,
+        max_length=RECIPES_IMAGE_STATUS_MAX_LEN,
+        verbose_name='Статус обработки картинки')
+    image_variants = JSONField(
+        blank=True,
+        default=dict,
+        editable=False,
+        verbose_name='Варианты картинки')
     ingredients = ManyToManyField(
         through='RecipesIngredients',
         to=Ingredients,
@@ -240,7 +597,16 @@ class Recipes(Model):
     text = TextField(
         verbose_name='Описание')
 
+    objects = RecipesQuerySet.as_manager()
+
     class Meta:
+        indexes = [
+            Index(
+                fields=('cooking_time', '-id'),
+                name='recipes_cooking_time_idx'),
+            Index(
+                fields=('author', 'cooking_time', '-id'),
+                name='recipes_author_cooking_idx')]
         ordering = ('-id',)
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
@@ -248,19 +614,12 @@ class Recipes(Model):
     def __str__(self):
         return f'{self.name} ({self.cooking_time} мин.)'
 
-    def delete(self, *args, **kwargs):
-        """Обновляет метод delete модели: добавляет удаление медиа-файла."""
-        if self.image and os.path.exists(self.image.path):
-            os.remove(self.image.path)
-        super().delete(*args, **kwargs)
-        return
-
     def save(self, *args, **kwargs):
-        self.full_clean()
+        self.validate_on_save()
         super().save(*args, **kwargs)
 
 
-class RecipesFavorites(Model):
+class RecipesFavorites(ValidatedModel):
     """
     Класс для представления избранных рецептов.
 
@@ -292,6 +651,8 @@ class RecipesFavorites(Model):
         to=Recipes,
         verbose_name='Рецепт')
 
+    objects = UniqueRelationManager()
+
     class Meta:
         constraints = [
             UniqueConstraint(
@@ -306,11 +667,11 @@ class RecipesFavorites(Model):
             f'{self.user.username}: "{self.recipe}"')
 
     def save(self, *args, **kwargs):
-        self.full_clean()
+        self.validate_on_save()
         super().save(*args, **kwargs)
 
 
-class RecipesIngredients(Model):
+class RecipesIngredients(ValidatedModel):
     """
     Класс для предоставления ингредиентов рецепта.
 
@@ -362,11 +723,100 @@ class RecipesIngredients(Model):
         return f'{self.recipe.name} - {self.ingredient.name}'
 
     def save(self, *args, **kwargs):
-        self.full_clean()
+        self.validate_on_save()
         super().save(*args, **kwargs)
 
 
-class RecipesTags(Model):
+class RecipesIngredientsLog(Model):
+    """
+    Класс для представления журнала изменений состава рецептов.
+
+    Запись добавляется при каждом изменении связей рецепта с ингредиентами
+    ("RecipesIngredients"), в том числе массовом. По журналу процессы
+    обновляют свой инвертированный индекс ингредиентов только для
+    изменившихся рецептов (см. "foodgram_app/ingredient_index.py").
+    Записи старше "RECIPES_INGREDIENTS_LOG_RETENTION" секунд удаляются.
+
+    Атрибуты:
+        - created: datetime
+            - дата изменения
+            - индексируется
+        - recipe_id: int
+            - ID рецепта (рецепт может быть уже удален)
+    """
+    created = DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Дата изменения')
+    recipe_id = BigIntegerField(
+        verbose_name='ID рецепта')
+
+    objects = RecipesIngredientsLogManager()
+
+    class Meta:
+        ordering = ('id',)
+        verbose_name = 'Изменение состава рецепта'
+        verbose_name_plural = 'Журнал изменений состава рецептов'
+
+    def __str__(self):
+        return f'Рецепт {self.recipe_id} ({self.created})'
+
+
+class RecipeRecommendations(Model):
+    """
+    Класс для представления персональных рекомендаций рецептов.
+
+    Для каждого пользователя хранит не более "RECOMMENDATIONS_TOP_N"
+    рекомендованных рецептов с местом в выдаче. Таблица заполняется только
+    офлайн-расчетом (см. "foodgram_app/recommendations.py").
+
+    Метод __str__ возвращает ID пользователя, место и ID рецепта:
+        "Пользователь 1: 1. рецепт 5"
+
+    Сортировка производится по пользователю и месту в выдаче.
+
+    Атрибуты:
+        - rank: int
+            - место рецепта в выдаче пользователя (с 1)
+        - recipe_id: int
+            - ID рецепта (рецепт может быть уже удален: такие записи
+              пропускаются при выдаче)
+        - score: float
+            - оценка рецепта для пользователя
+        - user: int
+            - ID пользователя
+            - связь через ForeignKey к модели "User"
+
+    Атрибуты user и rank проходят проверку на уникальное сочетание
+    и индексируются (выдача страницами по курсору места).
+    """
+    rank = PositiveIntegerField(
+        verbose_name='Место в выдаче')
+    recipe_id = BigIntegerField(
+        verbose_name='ID рецепта')
+    score = FloatField(
+        verbose_name='Оценка')
+    user = ForeignKey(
+        on_delete=CASCADE,
+        related_name='recipe_recommendations',
+        to=User,
+        verbose_name='Пользователь')
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=('user', 'rank'),
+                name='user_recommendation_rank')]
+        ordering = ('user', 'rank')
+        verbose_name = 'Рекомендация рецепта'
+        verbose_name_plural = 'Рекомендации рецептов'
+
+    def __str__(self):
+        return (f'Пользователь {self.user_id}: '
+                f'{self.rank}. рецепт {self.recipe_id}')
+
+
+class RecipesTags(ValidatedModel):
     """
     Класс для предоставления тегов рецептов.
 
@@ -413,11 +863,11 @@ class RecipesTags(Model):
         return f'{self.recipe.name} - {self.tag.name}'
 
     def save(self, *args, **kwargs):
-        self.full_clean()
+        self.validate_on_save()
         super().save(*args, **kwargs)
 
 
-class ShoppingCarts(Model):
+class ShoppingCarts(ValidatedModel):
     """
     Класс для представления списка покупок.
 
@@ -435,6 +885,8 @@ class ShoppingCarts(Model):
         - recipe: int
             - ID рецепта, добавленный в корзину
             - связь через ForeignKey к модели "Recipes"
+
+    Атрибуты проходят проверку на уникальное сочетание.
     """
     user = ForeignKey(
         on_delete=CASCADE,
@@ -448,7 +900,13 @@ class ShoppingCarts(Model):
         related_name='shopping_cart',
         verbose_name='Рецепт в корзине')
 
+    objects = UniqueRelationManager()
+
     class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=('user', 'recipe'),
+                name='user_shopping_cart_recipe')]
         ordering = ('user', 'recipe')
         verbose_name = 'Список покупок'
         verbose_name_plural = 'Списки покупок'
@@ -458,11 +916,69 @@ class ShoppingCarts(Model):
             f'{self.user.username}: "{self.recipe}"')
 
     def save(self, *args, **kwargs):
-        self.full_clean()
+        self.validate_on_save()
         super().save(*args, **kwargs)
 
 
-class Subscriptions(Model):
+class SimilarRecipes(Model):
+    """
+    Класс для представления похожих рецептов.
+
+    Для каждого рецепта хранит не более "SIMILAR_RECIPES_TOP_K" наиболее
+    похожих на него рецептов по составу ингредиентов. Таблица заполняется
+    и обновляется только расчетом сходства (см. "foodgram_app/similarity.py").
+
+    Метод __str__ возвращает ID рецептов и сходство:
+        "Рецепт 1 ~ 5 (0.75)"
+
+    Сортировка производится по рецепту, затем по убыванию сходства
+    и убыванию ID похожего рецепта.
+
+    Атрибуты:
+        - recipe: int
+            - ID рецепта
+            - связь через ForeignKey к модели "Recipes"
+        - score: float
+            - сходство (коэффициент Жаккара множеств ингредиентов)
+        - similar_id: int
+            - ID похожего рецепта (рецепт может быть уже удален: по такой
+              записи список рецепта пересчитывается при удалении)
+
+    Атрибуты recipe, score и similar_id индексируются составным индексом.
+    Атрибуты recipe и similar_id уникальны в совокупности: одновременные
+    пересчеты одного рецепта не создают повторяющихся записей.
+    """
+    recipe = ForeignKey(
+        on_delete=CASCADE,
+        related_name='similar_recipes',
+        to=Recipes,
+        verbose_name='Рецепт')
+    score = FloatField(
+        verbose_name='Сходство')
+    similar_id = BigIntegerField(
+        verbose_name='ID похожего рецепта')
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=('recipe', 'similar_id'),
+                name='recipe_similar_recipe')]
+        indexes = [
+            Index(
+                fields=('recipe', '-score', '-similar_id'),
+                name='similar_recipes_score_idx'),
+            Index(
+                fields=('similar_id',),
+                name='similar_recipes_similar_idx')]
+        ordering = ('recipe', '-score', '-similar_id')
+        verbose_name = 'Похожий рецепт'
+        verbose_name_plural = 'Похожие рецепты'
+
+    def __str__(self):
+        return f'Рецепт {self.recipe_id} ~ {self.similar_id} ({self.score})'
+
+
+class Subscriptions(ValidatedModel):
     """
     Класс для представления подписок пользователей друг на друга.
 
@@ -493,6 +1009,8 @@ class Subscriptions(Model):
         to=User,
         verbose_name='Автор на которого подписка')
 
+    objects = UniqueRelationManager()
+
     class Meta:
         constraints = [
             UniqueConstraint(
@@ -508,5 +1026,5 @@ class Subscriptions(Model):
             f'на {self.subscription_to.username}')
 
     def save(self, *args, **kwargs):
-        self.full_clean()
+        self.validate_on_save()
         super().save(*args, **kwargs)
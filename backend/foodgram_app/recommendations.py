@@ -0,0 +1,188 @@
+"""
+Создает офлайн-расчет персональных рекомендаций рецептов проекта "Foodgram".
+
+Рекомендации строятся коллаборативной фильтрацией "рецепт-рецепт" по
+взаимодействиям пользователей с рецептами (веса "RECOMMENDATIONS_WEIGHTS"):
+    - рецепт в избранном ("RecipesFavorites");
+    - рецепт в списке покупок ("ShoppingCarts");
+    - рецепт автора, на которого подписан пользователь ("Subscriptions").
+Сходство рецептов - косинусная мера столбцов разреженной матрицы
+взаимодействий W (пользователи x рецепты), оценка рецепта i для
+пользователя u - сумма сходств i с рецептами пользователя с их весами:
+    score(u, i) = sum_j W[u, j] * cos(j, i).
+Матрица рецепт-рецепт не строится: оценки считаются для блоков
+по "RECOMMENDATIONS_USERS_BLOCK_SIZE" пользователей двумя разреженными
+умножениями W[блок] * (W / norm).T * W / norm по строкам и столбцам W
+в формате CSR/CSC на массивах numpy (см. "foodgram_app/sparse.py").
+Плотные векторы длиной в число пользователей или рецептов не создаются:
+память и время расчета блока пропорциональны числу ненулевых элементов
+произведений. Лучшие рецепты пользователя выбираются "argpartition" без
+полной сортировки оценок.
+
+Рецепты из избранного и списка покупок пользователя, а также его
+собственные рецепты не рекомендуются. Результат - не более
+"RECOMMENDATIONS_TOP_N" рецептов на пользователя - записывается в таблицу
+"RecipeRecommendations" командой "python manage.py build_recommendations"
+по мере расчета блоков пользователей.
+
+Функции:
+    - build_recommendations;
+    - iter_recommendations;
+    - recommend.
+"""
+from typing import Iterator
+
+import numpy
+from django.db import transaction
+from django.db.models import QuerySet
+
+from foodgram_app.models import (
+    RecipeRecommendations, Recipes, RecipesFavorites, ShoppingCarts,
+    Subscriptions)
+from foodgram_app.sparse import CompressedMatrix, sparse_product, top_scores
+
+RECOMMENDATIONS_BATCH_SIZE: int = 1000
+RECOMMENDATIONS_TOP_N: int = 100
+RECOMMENDATIONS_USERS_BLOCK_SIZE: int = 256
+RECOMMENDATIONS_WEIGHTS: dict[str, float] = {
+    'favorite': 1.0,
+    'shopping_cart': 0.5,
+    'subscription': 0.25}
+
+
+def _interactions() -> tuple[numpy.ndarray, ...]:
+    """Вспомогательная функция: загружает взаимодействия пользователей
+    с рецептами тремя запросами. Возвращает массивы ID пользователей,
+    ID рецептов, весов и признаков "рецепт уже выбран пользователем"
+    (в избранном или списке покупок). Для повторяющихся пар берется
+    наибольший вес."""
+    sources: list[tuple[str, QuerySet]] = [
+        ('favorite', RecipesFavorites.objects.values_list(
+            'user_id', 'recipe_id')),
+        ('shopping_cart', ShoppingCarts.objects.filter(
+            recipe__isnull=False).values_list('user_id', 'recipe_id')),
+        ('subscription', Subscriptions.objects.filter(
+            subscription_to__recipe_author__isnull=False).values_list(
+                'subscriber_id', 'subscription_to__recipe_author'))]
+    pairs: list[numpy.ndarray] = []
+    weights: list[numpy.ndarray] = []
+    chosen: list[numpy.ndarray] = []
+    for kind, queryset in sources:
+        kind_pairs: numpy.ndarray = numpy.array(
+            list(queryset.order_by().iterator()),
+            dtype=numpy.int64).reshape(-1, 2)
+        pairs.append(kind_pairs)
+        weights.append(numpy.full(
+            len(kind_pairs), RECOMMENDATIONS_WEIGHTS[kind]))
+        chosen.append(numpy.full(len(kind_pairs), kind != 'subscription'))
+    all_pairs: numpy.ndarray = numpy.concatenate(pairs)
+    all_weights: numpy.ndarray = numpy.concatenate(weights)
+    all_chosen: numpy.ndarray = numpy.concatenate(chosen)
+    order: numpy.ndarray = numpy.lexsort(
+        (-all_weights, all_pairs[:, 1], all_pairs[:, 0]))
+    all_pairs, all_weights = all_pairs[order], all_weights[order]
+    first: numpy.ndarray = numpy.ones(len(all_pairs), dtype=bool)
+    first[1:] = (all_pairs[1:] != all_pairs[:-1]).any(axis=1)
+    starts: numpy.ndarray = numpy.flatnonzero(first)
+    return (
+        all_pairs[starts, 0], all_pairs[starts, 1], all_weights[starts],
+        numpy.logical_or.reduceat(all_chosen[order], starts)
+        if starts.size else all_chosen)
+
+
+def iter_recommendations(
+        top_n: int = RECOMMENDATIONS_TOP_N,
+        block_size: int = RECOMMENDATIONS_USERS_BLOCK_SIZE) -> Iterator[
+            list[tuple[int, list[tuple[int, float]]]]]:
+    """Рассчитывает рекомендации для всех пользователей со взаимодействиями
+    блоками по block_size пользователей. Возвращает генератор списков
+    [(ID пользователя, [(ID рецепта, оценка), ...]), ...] для каждого блока,
+    рецепты отсортированы по убыванию оценки, при равной оценке - по убыванию
+    ID. Выполняет четыре запроса к БД до выдачи первого блока."""
+    user_ids, recipe_ids, weights, chosen = _interactions()
+    users, user_index = numpy.unique(user_ids, return_inverse=True)
+    recipes, recipe_index = numpy.unique(recipe_ids, return_inverse=True)
+    by_user = CompressedMatrix(
+        rows=user_index, columns=recipe_index, data=weights,
+        shape=users.size)
+    by_recipe = CompressedMatrix(
+        rows=recipe_index, columns=user_index, data=weights,
+        shape=recipes.size)
+    norms: numpy.ndarray = numpy.sqrt(numpy.bincount(
+        recipe_index, weights=weights ** 2, minlength=recipes.size))
+    authors: dict[int, int] = dict(Recipes.objects.filter(
+        id__in=recipes.tolist()).values_list('id', 'author_id'))
+    recipe_authors: numpy.ndarray = numpy.array(
+        [authors.get(recipe_id, 0) for recipe_id in recipes.tolist()],
+        dtype=numpy.int64)
+    chosen = chosen[by_user.order]
+    for start in range(0, users.size, block_size):
+        block: numpy.ndarray = numpy.arange(
+            start, min(start + block_size, users.size))
+        positions, counts = by_user.rows(rows=block)
+        own_rows: numpy.ndarray = numpy.repeat(block - start, counts)
+        own: numpy.ndarray = by_user.indices[positions]
+        affinity: tuple[numpy.ndarray, ...] = sparse_product(
+            rows=own_rows,
+            columns=own,
+            data=by_user.data[positions] / norms[own],
+            right=by_recipe,
+            size=users.size)
+        rows, columns, scores = sparse_product(
+            *affinity, right=by_user, size=recipes.size)
+        scores /= norms[columns]
+        own_chosen: numpy.ndarray = chosen[positions]
+        excluded: numpy.ndarray = numpy.isin(
+            rows * recipes.size + columns,
+            own_rows[own_chosen] * recipes.size + own[own_chosen])
+        own_recipes: numpy.ndarray = (
+            recipe_authors[columns] == users[block][rows])
+        keep: numpy.ndarray = (scores > 0) & ~(excluded | own_recipes)
+        rows, columns, scores = rows[keep], columns[keep], scores[keep]
+        bounds: numpy.ndarray = numpy.searchsorted(
+            rows, numpy.arange(block.size + 1))
+        yield [
+            (user_id, top_scores(
+                recipe_ids=recipes[columns[bounds[row]:bounds[row + 1]]],
+                scores=scores[bounds[row]:bounds[row + 1]],
+                top_n=top_n))
+            for row, user_id in enumerate(users[block].tolist())
+            if bounds[row] < bounds[row + 1]]
+
+
+def recommend(
+        top_n: int = RECOMMENDATIONS_TOP_N,
+        block_size: int = RECOMMENDATIONS_USERS_BLOCK_SIZE) -> dict[
+            int, list]:
+    """Рассчитывает рекомендации для всех пользователей со взаимодействиями.
+    Возвращает словарь {ID пользователя: [(ID рецепта, оценка), ...]}
+    (см. "iter_recommendations"). Выполняет четыре запроса к БД."""
+    return {
+        user_id: recipes
+        for block in iter_recommendations(top_n=top_n, block_size=block_size)
+        for user_id, recipes in block}
+
+
+def build_recommendations(
+        top_n: int = RECOMMENDATIONS_TOP_N,
+        batch_size: int = RECOMMENDATIONS_BATCH_SIZE,
+        block_size: int = RECOMMENDATIONS_USERS_BLOCK_SIZE) -> int:
+    """Рассчитывает рекомендации и заменяет содержимое
+    "RecipeRecommendations" в одной транзакции: строки каждого блока
+    пользователей записываются bulk_create пакетами по batch_size строк
+    сразу после его расчета. Возвращает число записанных строк."""
+    written: int = 0
+    with transaction.atomic():
+        RecipeRecommendations.objects.all().delete()
+        for block in iter_recommendations(
+                top_n=top_n, block_size=block_size):
+            rows: list[RecipeRecommendations] = [
+                RecipeRecommendations(
+                    rank=rank, recipe_id=recipe_id, score=score,
+                    user_id=user_id)
+                for user_id, recipes in block
+                for rank, (recipe_id, score) in enumerate(recipes, start=1)]
+            RecipeRecommendations.objects.bulk_create(
+                rows, batch_size=batch_size)
+            written += len(rows)
+    return written
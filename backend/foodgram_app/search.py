@@ -0,0 +1,140 @@
+"""
+Создает полнотекстовый поиск рецептов проекта "Foodgram" по полям
+"Recipes.name" и "Recipes.text" с ранжированием результатов.
+
+Поисковый индекс создается после миграций приложения (сигнал
+"post_migrate") и поддерживается самой БД без участия Django, поэтому
+учитывает в том числе массовые операции (bulk_create, "_raw_delete"):
+    - PostgreSQL: вычисляемый столбец "search_vector" типа tsvector
+      (название - вес A, описание - вес B, русская морфология) с индексом
+      GIN, ранжирование функцией ts_rank;
+    - SQLite: виртуальная таблица FTS5 "<таблица рецептов>_fts",
+      синхронизируемая триггерами, ранжирование функцией bm25. Слова
+      запроса ищутся по префиксу, что заменяет стемминг.
+Для остальных СУБД выполняется поиск подстроки без ранжирования.
+
+Функции:
+    - install_recipes_search;
+    - search_recipes.
+"""
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+from foodgram_app.models import Recipes
+
+SEARCH_CONFIG: str = 'russian'
+SEARCH_VECTOR_COLUMN: str = 'search_vector'
+
+
+def _fts_table() -> str:
+    """Вспомогательная функция: возвращает имя таблицы FTS5 для SQLite."""
+    return f'{Recipes._meta.db_table}_fts'
+
+
+def _install_postgresql(cursor, table: str) -> None:
+    """Вспомогательная функция: создает вычисляемый столбец tsvector
+    и индекс GIN для PostgreSQL."""
+    cursor.execute(
+        f'ALTER TABLE {table} ADD COLUMN IF NOT EXISTS '
+        f'{SEARCH_VECTOR_COLUMN} tsvector GENERATED ALWAYS AS ('
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A')"
+        ' || '
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(text, '')), 'B')"
+        ') STORED')
+    cursor.execute(
+        f'CREATE INDEX IF NOT EXISTS {table}_{SEARCH_VECTOR_COLUMN}_gin '
+        f'ON {table} USING GIN ({SEARCH_VECTOR_COLUMN})')
+    return
+
+
+def _install_sqlite(cursor, table: str) -> None:
+    """Вспомогательная функция: создает таблицу FTS5 с внешним содержимым
+    и триггеры ее синхронизации с таблицей рецептов для SQLite. Таблица
+    и каждый триггер проверяются отдельно: триггеры, удаленные при
+    пересоздании таблицы рецептов миграцией, создаются заново, а индекс
+    перестраивается, так как мог устареть без них."""
+    fts: str = _fts_table()
+    cursor.execute(
+        "SELECT name FROM sqlite_master WHERE (type = 'table' AND name = %s) "
+        "OR (type = 'trigger' AND tbl_name = %s)",
+        (fts, table))
+    existing: set[str] = {row[0] for row in cursor.fetchall()}
+    delete_row: str = (
+        f"INSERT INTO {fts}({fts}, rowid, name, text) "
+        "VALUES ('delete', old.id, old.name, old.text);")
+    insert_row: str = (
+        f'INSERT INTO {fts}(rowid, name, text) '
+        'VALUES (new.id, new.name, new.text);')
+    triggers: dict[str, str] = {
+        f'{fts}_ai': f'AFTER INSERT ON {table} BEGIN {insert_row} END',
+        f'{fts}_ad': f'AFTER DELETE ON {table} BEGIN {delete_row} END',
+        f'{fts}_au': (
+            f'AFTER UPDATE OF name, text ON {table} '
+            f'BEGIN {delete_row} {insert_row} END')}
+    if existing.issuperset((fts, *triggers)):
+        return
+    cursor.execute(
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(name, text, '
+        f"content='{table}', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')")
+    for name, trigger in triggers.items():
+        cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {trigger}')
+    cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+    return
+
+
+def install_recipes_search(using: str = 'default', **kwargs) -> None:
+    """Создает поисковый индекс рецептов в БД using, если его еще нет.
+    Подключается к сигналу "post_migrate" приложения (см. "apps.py")."""
+    connection = connections[using]
+    table: str = Recipes._meta.db_table
+    if table not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            _install_postgresql(cursor=cursor, table=table)
+        elif connection.vendor == 'sqlite':
+            _install_sqlite(cursor=cursor, table=table)
+    return
+
+
+def _fts_query(query: str) -> str:
+    """Вспомогательная функция: преобразует запрос пользователя в запрос
+    FTS5, в котором каждое слово экранировано и ищется по префиксу."""
+    words: list[str] = [
+        '"' + word.replace('"', '""') + '"*' for word in query.split()]
+    return ' '.join(words)
+
+
+def search_recipes(queryset: QuerySet, query: str) -> QuerySet:
+    """Фильтрует QuerySet рецептов по поисковому запросу query и сортирует
+    результаты по убыванию релевантности ("search_rank"), а при равной
+    релевантности - по убыванию ID."""
+    query = query.strip()
+    if not query:
+        return queryset
+    connection = connections[queryset.db]
+    table: str = Recipes._meta.db_table
+    if connection.vendor == 'postgresql':
+        tsquery: str = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        column: str = f'{table}.{SEARCH_VECTOR_COLUMN}'
+        return queryset.filter(RawSQL(
+            f'{column} @@ {tsquery}', (query,), output_field=BooleanField())
+        ).annotate(search_rank=RawSQL(
+            f'ts_rank({column}, {tsquery})', (query,),
+            output_field=FloatField())
+        ).order_by('-search_rank', '-id')
+    if connection.vendor == 'sqlite':
+        fts: str = _fts_table()
+        match: str = _fts_query(query=query)
+        return queryset.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', (match,))
+        ).annotate(search_rank=RawSQL(
+            f'SELECT -bm25({fts}, 10.0, 1.0) FROM {fts} '
+            f'WHERE {fts} MATCH %s AND {fts}.rowid = {table}.id', (match,),
+            output_field=FloatField())
+        ).order_by('-search_rank', '-id')
+    return queryset.filter(
+        Q(name__icontains=query) | Q(text__icontains=query)
+    ).order_by('-id')
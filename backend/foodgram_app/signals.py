@@ -1,27 +1,69 @@
-import os
-
-from django.db.models.signals import pre_delete
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 
-from .models import Ingredients, Recipes, RecipesIngredients, RecipesTags, Tags
-
-
-@receiver(signal=pre_delete, sender=Ingredients)
-def delete_recipe_ingredients(sender, instance, *args, **kwargs) -> None:
-    """При удалении объекта модели Ingredients также удаляет те объекты модели
-    Recipes, с которыми существует связь через RecipesIngredients.
-    Дополнительно удаляет изображение рецепта."""
-    recipes_del_ids: list[int] = RecipesIngredients.objects.filter(
-        ingredient=instance).values_list('recipe_id', flat=True)
-    recipes_del: list[Recipes] = Recipes.objects.filter(id__in=recipes_del_ids)
-    media: list[str] = recipes_del.values_list('image', flat=True)
-    for path in media:
-        full_path: str = os.path.join('foodgram_app', 'media', path)
-        try:
-            os.remove(full_path)
-        except FileNotFoundError:
-            pass
-    recipes_del.delete()
+from .catalog import invalidate_catalog
+from .models import (
+    Ingredients, Recipes, RecipesIngredients, RecipesIngredientsLog,
+    RecipesTags, Tags, recipe_ingredients_changed, recipes_bulk_deleted)
+from .tasks import (
+    discard_media_files, schedule_media_sweep, schedule_similar_recipes)
+
+
+@receiver(signal=post_delete, sender=Ingredients)
+@receiver(signal=post_save, sender=Ingredients)
+@receiver(signal=post_delete, sender=Tags)
+@receiver(signal=post_save, sender=Tags)
+def invalidate_tags_ingredients(sender, *args, **kwargs) -> None:
+    """При сохранении и удалении объектов моделей Tags и Ingredients
+    увеличивает версию справочника тегов и ингредиентов и сбрасывает
+    его снимок процесса (см. "foodgram_app/catalog.py")."""
+    invalidate_catalog()
+    return
+
+
+@receiver(signal=recipes_bulk_deleted, sender=Recipes)
+def sweep_recipes_media(sender, *args, **kwargs) -> None:
+    """После массового удаления рецептов (в том числе при удалении
+    ингредиента, см. "IngredientsQuerySet.delete") запускает удаление
+    изображений из очереди "MediaGarbage" после фиксации транзакции."""
+    schedule_media_sweep()
+    return
+
+
+@receiver(signal=post_delete, sender=Recipes)
+def discard_recipe_media(sender, instance, *args, **kwargs) -> None:
+    """При удалении объекта модели Recipes (в том числе каскадном) ставит
+    изображение рецепта и его варианты в очередь на удаление "MediaGarbage",
+    а ID рецепта - в журнал изменений состава "RecipesIngredientsLog".
+    Файлы удаляются после фиксации транзакции."""
+    discard_media_files(
+        names=[instance.image.name, *instance.image_variants.values()])
+    RecipesIngredientsLog.objects.log(recipe_ids=[instance.id])
+    return
+
+
+@receiver(signal=post_delete, sender=RecipesIngredients)
+@receiver(signal=post_save, sender=RecipesIngredients)
+def log_recipe_ingredients(
+        sender, instance, origin=None, *args, **kwargs) -> None:
+    """При сохранении и удалении объекта модели RecipesIngredients (например,
+    в админ-зоне) записывает ID рецепта в журнал изменений состава
+    "RecipesIngredientsLog". При удалении самого рецепта запись делает
+    "discard_recipe_media", при удалении ингредиента рецепты с ним удаляются
+    целиком (см. "IngredientsQuerySet.delete") и журнал пишет
+    "RecipesQuerySet.bulk_delete"."""
+    if isinstance(origin, (Recipes, Ingredients)):
+        return
+    RecipesIngredientsLog.objects.log(recipe_ids=[instance.recipe_id])
+    return
+
+
+@receiver(signal=recipe_ingredients_changed, sender=RecipesIngredientsLog)
+def refresh_recipe_similarity(
+        sender, recipe_ids, using, *args, **kwargs) -> None:
+    """При записи в журнал изменений состава "RecipesIngredientsLog" ставит
+    пересчет похожих рецептов в очередь после фиксации транзакции."""
+    schedule_similar_recipes(recipe_ids=recipe_ids, using=using)
     return
 
 
@@ -0,0 +1,232 @@
+"""
+Создает подбор похожих рецептов проекта "Foodgram" по совпадению
+ингредиентов.
+
+Сходство рецептов - коэффициент Жаккара множеств их ингредиентов
+(число общих ингредиентов / число ингредиентов в объединении). Для каждого
+рецепта в таблице "SimilarRecipes" хранится не более "SIMILAR_RECIPES_TOP_K"
+наиболее похожих рецептов, поэтому выдача похожих рецептов - один запрос
+по индексу.
+
+Таблица заполняется:
+    - целиком - командой "python manage.py build_similar_recipes": число
+      общих ингредиентов считается для блоков по
+      "SIMILAR_RECIPES_BLOCK_SIZE" рецептов разреженным умножением
+      A[блок] * A.T матрицы состава A (рецепты x ингредиенты) в формате
+      CSR (см. "foodgram_app/sparse.py"), строки каждого блока
+      записываются сразу после его расчета;
+    - инкрементально - после фиксации каждой транзакции, изменившей состав
+      рецептов (сигнал "recipe_ingredients_changed"), в пуле потоков
+      фоновых задач (см. "foodgram_app/tasks.py"). Пересчитываются списки
+      изменившихся рецептов, рецептов, в списках которых они были,
+      и рецептов, в списки которых они могут войти по новому сходству.
+      Сходство считается слиянием массивов numpy инвертированного индекса
+      ингредиентов (см. "foodgram_app/ingredient_index.py") без запросов
+      к БД.
+
+Функции:
+    - build_similar_recipes;
+    - iter_similar_recipes;
+    - refresh_similar_recipes.
+"""
+from typing import Iterator
+
+import numpy
+from django.db import transaction
+from django.db.models import Count, Min
+
+from foodgram_app.ingredient_index import (
+    IngredientIndex, get_ingredient_index_cache, to_pairs)
+from foodgram_app.models import RecipesIngredients, SimilarRecipes
+from foodgram_app.sparse import CompressedMatrix, sparse_product, top_scores
+
+SIMILAR_RECIPES_BATCH_SIZE: int = 1000
+SIMILAR_RECIPES_BLOCK_SIZE: int = 256
+SIMILAR_RECIPES_TOP_K: int = 10
+
+
+def _group_ingredients(pairs: numpy.ndarray) -> dict[int, numpy.ndarray]:
+    """Вспомогательная функция: группирует пары (ID ингредиента, ID рецепта)
+    по рецептам. Возвращает сортированные ID ингредиентов каждого рецепта."""
+    pairs = pairs[numpy.lexsort((pairs[:, 0], pairs[:, 1]))]
+    recipe_ids, starts = numpy.unique(pairs[:, 1], return_index=True)
+    return dict(zip(
+        recipe_ids.tolist(), numpy.split(pairs[:, 0], starts[1:])))
+
+
+def _jaccard(
+        index: IngredientIndex,
+        ingredient_ids: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """Вспомогательная функция: возвращает ID рецептов индекса, имеющих
+    общие ингредиенты с множеством ingredient_ids, и коэффициенты Жаккара
+    их сходства с этим множеством."""
+    postings: list[numpy.ndarray] = [
+        index.postings[ingredient_id]
+        for ingredient_id in ingredient_ids.tolist()
+        if ingredient_id in index.postings]
+    if not postings:
+        empty: numpy.ndarray = numpy.array([], dtype=numpy.int64)
+        return empty, empty.astype(numpy.float64)
+    candidates, shared = numpy.unique(
+        numpy.concatenate(postings), return_counts=True)
+    sizes: numpy.ndarray = index.sizes[
+        numpy.searchsorted(index.recipe_ids, candidates)]
+    return candidates, shared / (ingredient_ids.size + sizes - shared)
+
+
+def _similar_rows(
+        index: IngredientIndex,
+        ingredients: dict[int, numpy.ndarray],
+        top_k: int) -> list[SimilarRecipes]:
+    """Вспомогательная функция: возвращает объекты "SimilarRecipes"
+    (не сохраненные) с top_k наиболее похожими рецептами для каждого
+    рецепта из ingredients. При равном сходстве выше рецепт с большим ID."""
+    rows: list[SimilarRecipes] = []
+    for recipe_id, ingredient_ids in ingredients.items():
+        candidates, scores = _jaccard(
+            index=index, ingredient_ids=ingredient_ids)
+        keep: numpy.ndarray = candidates != recipe_id
+        candidates, scores = candidates[keep], scores[keep]
+        order: numpy.ndarray = numpy.lexsort(
+            (-candidates, -scores))[:top_k]
+        rows.extend(
+            SimilarRecipes(
+                recipe_id=recipe_id, score=score, similar_id=similar_id)
+            for similar_id, score in zip(
+                candidates[order].tolist(), scores[order].tolist()))
+    return rows
+
+
+def iter_similar_recipes(
+        top_k: int = SIMILAR_RECIPES_TOP_K,
+        block_size: int = SIMILAR_RECIPES_BLOCK_SIZE) -> Iterator[
+            list[tuple[int, list[tuple[int, float]]]]]:
+    """Рассчитывает похожие рецепты для всех рецептов блоками по block_size
+    рецептов. Возвращает генератор списков
+    [(ID рецепта, [(ID похожего рецепта, сходство), ...]), ...] для каждого
+    блока, похожие рецепты отсортированы по убыванию сходства, при равном
+    сходстве - по убыванию ID. Загружает состав рецептов одним запросом."""
+    pairs: numpy.ndarray = to_pairs(
+        RecipesIngredients.objects.order_by().values_list(
+            'ingredient_id', 'recipe_id').iterator())
+    recipes, recipe_index = numpy.unique(pairs[:, 1], return_inverse=True)
+    ingredients, ingredient_index = numpy.unique(
+        pairs[:, 0], return_inverse=True)
+    ones: numpy.ndarray = numpy.ones(len(pairs))
+    by_recipe = CompressedMatrix(
+        rows=recipe_index, columns=ingredient_index, data=ones,
+        shape=recipes.size)
+    by_ingredient = CompressedMatrix(
+        rows=ingredient_index, columns=recipe_index, data=ones,
+        shape=ingredients.size)
+    sizes: numpy.ndarray = numpy.diff(by_recipe.indptr)
+    for start in range(0, recipes.size, block_size):
+        block: numpy.ndarray = numpy.arange(
+            start, min(start + block_size, recipes.size))
+        positions, counts = by_recipe.rows(rows=block)
+        rows, columns, shared = sparse_product(
+            rows=numpy.repeat(block - start, counts),
+            columns=by_recipe.indices[positions],
+            data=by_recipe.data[positions],
+            right=by_ingredient,
+            size=recipes.size)
+        keep: numpy.ndarray = columns != block[rows]
+        rows, columns, shared = rows[keep], columns[keep], shared[keep]
+        scores: numpy.ndarray = shared / (
+            sizes[block][rows] + sizes[columns] - shared)
+        bounds: numpy.ndarray = numpy.searchsorted(
+            rows, numpy.arange(block.size + 1))
+        yield [
+            (recipe_id, top_scores(
+                recipe_ids=recipes[columns[bounds[row]:bounds[row + 1]]],
+                scores=scores[bounds[row]:bounds[row + 1]],
+                top_n=top_k))
+            for row, recipe_id in enumerate(recipes[block].tolist())
+            if bounds[row] < bounds[row + 1]]
+
+
+def build_similar_recipes(
+        top_k: int = SIMILAR_RECIPES_TOP_K,
+        batch_size: int = SIMILAR_RECIPES_BATCH_SIZE,
+        block_size: int = SIMILAR_RECIPES_BLOCK_SIZE) -> int:
+    """Пересчитывает похожие рецепты для всех рецептов и заменяет
+    содержимое "SimilarRecipes" в одной транзакции: строки каждого блока
+    рецептов записываются bulk_create пакетами по batch_size строк сразу
+    после его расчета (см. "iter_similar_recipes"). Возвращает число
+    записанных строк."""
+    written: int = 0
+    with transaction.atomic():
+        SimilarRecipes.objects.all().delete()
+        for block in iter_similar_recipes(
+                top_k=top_k, block_size=block_size):
+            rows: list[SimilarRecipes] = [
+                SimilarRecipes(
+                    recipe_id=recipe_id, score=score, similar_id=similar_id)
+                for recipe_id, similar in block
+                for similar_id, score in similar]
+            SimilarRecipes.objects.bulk_create(
+                rows, batch_size=batch_size, ignore_conflicts=True)
+            written += len(rows)
+    return written
+
+
+def _may_include(
+        scores: dict[int, float],
+        top_k: int,
+        batch_size: int = SIMILAR_RECIPES_BATCH_SIZE) -> set[int]:
+    """Вспомогательная функция: возвращает ID рецептов из scores (ID рецепта:
+    сходство с одним из изменившихся рецептов), в список похожих которых
+    изменившийся рецепт может войти: список короче top_k или сходство
+    не ниже наименьшего сходства в списке. Выполняет один запрос к БД
+    на каждые batch_size рецептов."""
+    included: set[int] = set(scores)
+    candidates: list[int] = list(scores)
+    for start in range(0, len(candidates), batch_size):
+        for recipe_id, count, min_score in (
+                SimilarRecipes.objects.filter(
+                    recipe_id__in=candidates[start:start + batch_size])
+                .order_by().values('recipe_id')
+                .annotate(count=Count('id'), min_score=Min('score'))
+                .values_list('recipe_id', 'count', 'min_score')):
+            if count >= top_k and scores[recipe_id] < min_score:
+                included.discard(recipe_id)
+    return included
+
+
+def refresh_similar_recipes(
+        recipe_ids: set[int],
+        top_k: int = SIMILAR_RECIPES_TOP_K) -> int:
+    """Пересчитывает похожие рецепты после изменения состава рецептов
+    recipe_ids (в том числе удаления рецептов). Вызывается после фиксации
+    изменений: индекс ингредиентов процесса обновляется по журналу
+    независимо от интервала его опроса. Возвращает число пересчитанных
+    рецептов."""
+    changed: set[int] = set(recipe_ids)
+    changed_pairs: numpy.ndarray = to_pairs(
+        RecipesIngredients.objects.filter(recipe_id__in=changed)
+        .order_by().values_list('ingredient_id', 'recipe_id'))
+    index: IngredientIndex = get_ingredient_index_cache().get(fresh=True)
+    scores: dict[int, float] = {}
+    for ingredient_ids in _group_ingredients(pairs=changed_pairs).values():
+        candidates, candidate_scores = _jaccard(
+            index=index, ingredient_ids=ingredient_ids)
+        for candidate, score in zip(
+                candidates.tolist(), candidate_scores.tolist()):
+            if candidate not in changed:
+                scores[candidate] = max(score, scores.get(candidate, 0.0))
+    affected: set[int] = changed | _may_include(scores=scores, top_k=top_k)
+    affected |= set(SimilarRecipes.objects.filter(
+        similar_id__in=changed).values_list('recipe_id', flat=True))
+    pairs: numpy.ndarray = numpy.concatenate((
+        changed_pairs,
+        to_pairs(RecipesIngredients.objects.filter(
+            recipe_id__in=affected - changed).order_by().values_list(
+                'ingredient_id', 'recipe_id'))))
+    rows: list[SimilarRecipes] = _similar_rows(
+        index=index,
+        ingredients=_group_ingredients(pairs=pairs),
+        top_k=top_k)
+    with transaction.atomic():
+        SimilarRecipes.objects.filter(recipe_id__in=affected).delete()
+        SimilarRecipes.objects.bulk_create(rows, ignore_conflicts=True)
+    return len(affected)
@@ -0,0 +1,84 @@
+"""
+Создает операции над разреженными матрицами на массивах numpy для
+офлайн-расчетов проекта "Foodgram" (рекомендации и похожие рецепты,
+см. "foodgram_app/recommendations.py" и "foodgram_app/similarity.py").
+
+Матрицы хранятся в сжатом построчном формате (CSR), произведение
+считается по ненулевым элементам без плотных промежуточных матриц,
+лучшие элементы строки выбираются "argpartition" без полной сортировки.
+
+Классы:
+    - CompressedMatrix.
+
+Функции:
+    - sparse_product;
+    - top_scores.
+"""
+import numpy
+
+
+class CompressedMatrix():
+    """
+    Разреженная матрица в сжатом построчном формате (CSR): элементы строки
+    row - indices[indptr[row]:indptr[row + 1]] и data[...] той же части,
+    order - позиции элементов во входных массивах.
+    """
+
+    def __init__(
+            self,
+            rows: numpy.ndarray,
+            columns: numpy.ndarray,
+            data: numpy.ndarray,
+            shape: int):
+        self.order: numpy.ndarray = numpy.argsort(rows, kind='stable')
+        self.indices: numpy.ndarray = columns[self.order]
+        self.data: numpy.ndarray = data[self.order]
+        self.indptr: numpy.ndarray = numpy.concatenate(([0], numpy.cumsum(
+            numpy.bincount(rows, minlength=shape))))
+
+    def rows(self, rows: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Возвращает позиции элементов строк rows (подряд, в порядке rows)
+        и число элементов каждой строки."""
+        starts: numpy.ndarray = self.indptr[rows]
+        counts: numpy.ndarray = self.indptr[rows + 1] - starts
+        offsets: numpy.ndarray = numpy.repeat(
+            starts - numpy.cumsum(counts) + counts, counts)
+        return offsets + numpy.arange(counts.sum()), counts
+
+
+def sparse_product(
+        rows: numpy.ndarray,
+        columns: numpy.ndarray,
+        data: numpy.ndarray,
+        right: CompressedMatrix,
+        size: int) -> tuple[numpy.ndarray, ...]:
+    """Возвращает произведение разреженной матрицы (элементы data
+    в позициях rows, columns) на матрицу right с size столбцами в виде
+    массивов строк, столбцов и значений ненулевых элементов, упорядоченных
+    по строке и столбцу."""
+    positions, counts = right.rows(rows=columns)
+    keys: numpy.ndarray = (
+        numpy.repeat(rows, counts) * size + right.indices[positions])
+    unique, inverse = numpy.unique(keys, return_inverse=True)
+    values: numpy.ndarray = numpy.bincount(
+        inverse,
+        weights=right.data[positions] * numpy.repeat(data, counts),
+        minlength=unique.size)
+    return unique // size, unique % size, values
+
+
+def top_scores(
+        recipe_ids: numpy.ndarray,
+        scores: numpy.ndarray,
+        top_n: int) -> list[tuple[int, float]]:
+    """Возвращает top_n рецептов с наибольшей оценкой (при равной оценке -
+    с наибольшим ID) в порядке убывания. Кандидаты отбираются
+    "argpartition", сортируются только они и рецепты с оценкой, равной
+    наименьшей из отобранных."""
+    if scores.size > top_n:
+        threshold: float = scores[numpy.argpartition(
+            -scores, top_n - 1)[:top_n]].min()
+        selected: numpy.ndarray = numpy.flatnonzero(scores >= threshold)
+        recipe_ids, scores = recipe_ids[selected], scores[selected]
+    order: numpy.ndarray = numpy.lexsort((-recipe_ids, -scores))[:top_n]
+    return list(zip(recipe_ids[order].tolist(), scores[order].tolist()))
@@ -0,0 +1,83 @@
+"""
+Создает хранилище картинок рецептов проекта "Foodgram" с адресацией
+по содержимому.
+
+Файл сохраняется под именем, равным SHA-256 его содержимого
+("recipes/images/ab/ab12...ef.png"), поэтому одинаковые картинки хранятся
+на диске один раз, а URL файла никогда не указывает на другое содержимое
+и может кэшироваться бессрочно (см. "gateway/nginx.conf").
+Файл удаляется только когда на него не ссылается ни один рецепт
+(см. "get_unreferenced_files" в "foodgram_app/images.py"); сохранение
+файла снимает его с очереди на удаление "MediaGarbage".
+
+Классы:
+    - ContentAddressedStorage (унаследован от FileSystemStorage).
+
+Функции:
+    - get_content_name.
+"""
+import hashlib
+import posixpath
+
+from django.apps import apps
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+CONTENT_HASH_SHARD_LEN: int = 2
+
+
+def get_content_name(name: str, content: File) -> str:
+    """Возвращает имя файла по SHA-256 его содержимого в директории
+    исходного имени: "<директория>/<первые символы хеша>/<хеш><расширение>".
+    Расширение исходного имени приводится к нижнему регистру."""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    content_hash: str = digest.hexdigest()
+    directory, filename = posixpath.split(name)
+    extension: str = posixpath.splitext(filename)[1].lower()
+    return posixpath.join(
+        directory,
+        content_hash[:CONTENT_HASH_SHARD_LEN],
+        content_hash + extension)
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Переопределяет FileSystemStorage: сохраняет файл под именем
+    из "get_content_name" и не записывает его повторно, если такой файл
+    уже существует. Файлы не перезаписываются: измененное содержимое
+    сохраняется под новым именем.
+
+    Перед проверкой существования файл снимается с очереди на удаление
+    "MediaGarbage" (см. "reclaim"), иначе удаление очереди могло бы удалить
+    найденный файл до фиксации транзакции рецепта, который на него
+    ссылается."""
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = get_content_name(name=name, content=content)
+        self.reclaim(name=name)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    def reclaim(self, name: str) -> None:
+        """Удаляет файл name из очереди на удаление "MediaGarbage" одним
+        запросом к БД. Если запись уже выбрана удалением очереди (см.
+        "sweep_media_garbage" в "foodgram_app/tasks.py"), запрос ждет
+        фиксации прохода, после чего удаленный файл записывается заново.
+        При откате транзакции, сохраняющей ссылку на файл, API снова
+        ставит файл в очередь (см. "RecipesSerializer._save_image"),
+        остальные файлы без ссылок удаляет сверка "reconcile_media"."""
+        apps.get_model('foodgram_app', 'MediaGarbage').objects.filter(
+            name=name).delete()
+        return
+
+
+recipes_image_storage: ContentAddressedStorage = ContentAddressedStorage()
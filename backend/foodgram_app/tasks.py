@@ -0,0 +1,191 @@
+"""
+Создает фоновые задачи проекта "Foodgram" для медиа-файлов рецептов
+и пересчета похожих рецептов.
+
+Проверка картинки Pillow и создание ее вариантов
+(см. "foodgram_app/images.py"), а также удаление медиа-файлов из очереди
+"MediaGarbage" выполняются в пуле потоков процесса после фиксации
+транзакции, поэтому не удерживают транзакцию и не увеличивают время ответа
+на запрос.
+Размер пула задается настройкой "RECIPES_IMAGE_WORKERS"; при значении 0
+задачи выполняются синхронно после фиксации транзакции.
+
+Задачи, потерянные при перезапуске процесса, дообрабатываются командами
+"python manage.py build_image_variants", "python manage.py reconcile_media"
+и "python manage.py build_similar_recipes".
+
+Функции:
+    - discard_media_files;
+    - finalize_recipe_image;
+    - schedule_media_sweep;
+    - schedule_recipe_image;
+    - schedule_similar_recipes;
+    - sweep_media_garbage.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from foodgram_app.images import (
+    delete_image_files, get_unreferenced_files, process_recipe_image,
+    verify_image)
+from foodgram_app.models import (
+    RECIPES_IMAGE_STATUS_FAILED, RECIPES_IMAGE_STATUS_READY,
+    MediaGarbage, Recipes)
+from foodgram_app.similarity import refresh_similar_recipes
+from foodgram_app.storage import recipes_image_storage
+
+MEDIA_GC_BATCH_SIZE: int = 500
+
+logger = logging.getLogger(__name__)
+
+_executor: ThreadPoolExecutor = None
+_executor_lock = threading.Lock()
+_media_sweep_pending: threading.Event = threading.Event()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Вспомогательная функция: возвращает пул потоков процесса, создавая
+    его при первом обращении. Возвращает None, если пул отключен."""
+    global _executor
+    workers: int = getattr(settings, 'RECIPES_IMAGE_WORKERS', 0)
+    if workers <= 0:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix='recipe-media')
+    return _executor
+
+
+def finalize_recipe_image(recipe_id: int, image_name: str = None) -> str:
+    """Проверяет картинку рецепта, создает ее варианты, ставит в очередь
+    на удаление оригинал с метаданными и устанавливает статус обработки.
+    Возвращает установленный статус или None, если рецепт удален либо его
+    картинка была заменена (обработка не нужна).
+    Повреждение картинки не вызывает исключения: рецепт получает статус
+    "failed" и продолжает выдаваться с заглушкой."""
+    recipe: Recipes = Recipes.objects.filter(id=recipe_id).only(
+        'id', 'image', 'image_variants').first()
+    if recipe is None or (image_name and recipe.image.name != image_name):
+        return None
+    status: str = RECIPES_IMAGE_STATUS_READY
+    discarded: list[str] = []
+    try:
+        verify_image(name=recipe.image.name, storage=recipe.image.storage)
+        discarded = process_recipe_image(recipe=recipe)
+    except Exception:
+        logger.exception('Не удалось обработать картинку рецепта id=%s.',
+                         recipe_id)
+        status = RECIPES_IMAGE_STATUS_FAILED
+    Recipes.objects.filter(
+        id=recipe_id, image=recipe.image.name).update(image_status=status)
+    if discarded:
+        discard_media_files(names=discarded)
+    return status
+
+
+def _run_in_worker(task, **kwargs) -> None:
+    """Вспомогательная функция: выполняет задачу в потоке пула
+    и закрывает соединения с БД этого потока."""
+    try:
+        task(**kwargs)
+    except Exception:
+        logger.exception('Ошибка фоновой задачи %s.', task.__name__)
+    finally:
+        connections.close_all()
+    return
+
+
+def _submit(task, **kwargs) -> None:
+    """Вспомогательная функция: ставит задачу в очередь пула потоков
+    или выполняет ее синхронно, если пул отключен."""
+    executor: ThreadPoolExecutor = _get_executor()
+    if executor is None:
+        task(**kwargs)
+        return
+    executor.submit(_run_in_worker, task, **kwargs)
+    return
+
+
+def schedule_recipe_image(recipe: Recipes) -> None:
+    """Ставит обработку картинки рецепта в очередь пула потоков после
+    фиксации текущей транзакции."""
+    recipe_id: int = recipe.id
+    image_name: str = recipe.image.name
+    transaction.on_commit(lambda: _submit(
+        finalize_recipe_image, recipe_id=recipe_id, image_name=image_name))
+    return
+
+
+def schedule_similar_recipes(
+        recipe_ids: set[int], using: str = 'default') -> None:
+    """Ставит пересчет похожих рецептов после изменения состава рецептов
+    recipe_ids в очередь пула потоков после фиксации текущей транзакции
+    в БД using (см. "foodgram_app/similarity.py")."""
+    recipe_ids = set(recipe_ids)
+    transaction.on_commit(lambda: _submit(
+        refresh_similar_recipes, recipe_ids=recipe_ids), using=using)
+    return
+
+
+def sweep_media_garbage(batch_size: int = MEDIA_GC_BATCH_SIZE) -> int:
+    """Удаляет медиа-файлы из очереди "MediaGarbage" пакетами
+    по batch_size записей и возвращает число удаленных файлов.
+    На каждый пакет выполняется проверка ссылок рецептов на файлы одним
+    запросом и удаление записей очереди одним запросом. Файлы, на которые
+    снова ссылается рецепт, из очереди удаляются без удаления файла."""
+    deleted: int = 0
+    while True:
+        with transaction.atomic():
+            garbage: list[tuple[int, str]] = list(
+                MediaGarbage.objects.select_for_update(skip_locked=True)
+                .order_by('id').values_list('id', 'name')[:batch_size])
+            if not garbage:
+                return deleted
+            names: list[str] = get_unreferenced_files(
+                recipes=Recipes.objects.all(),
+                names=[name for _, name in garbage])
+            delete_image_files(names=names, storage=recipes_image_storage)
+            MediaGarbage.objects.filter(
+                id__in=[garbage_id for garbage_id, _ in garbage]).delete()
+        deleted += len(names)
+
+
+def _sweep_pending_media_garbage() -> None:
+    """Вспомогательная функция: снимает отметку о запланированном удалении
+    очереди и выполняет его."""
+    _media_sweep_pending.clear()
+    sweep_media_garbage()
+    return
+
+
+def _start_media_sweep() -> None:
+    """Вспомогательная функция: запускает удаление очереди, если оно еще
+    не запланировано. Массовое удаление рецептов приводит к одному проходу
+    по очереди, а не к проходу на каждый рецепт."""
+    if _media_sweep_pending.is_set():
+        return
+    _media_sweep_pending.set()
+    _submit(_sweep_pending_media_garbage)
+    return
+
+
+def schedule_media_sweep() -> None:
+    """Запускает удаление очереди "MediaGarbage" после фиксации текущей
+    транзакции."""
+    transaction.on_commit(_start_media_sweep)
+    return
+
+
+def discard_media_files(names: list[str]) -> None:
+    """Ставит медиа-файлы в очередь на удаление в текущей транзакции
+    и запускает удаление очереди после ее фиксации."""
+    MediaGarbage.objects.enqueue(names=names)
+    schedule_media_sweep()
+    return
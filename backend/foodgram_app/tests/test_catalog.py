@@ -0,0 +1,73 @@
+import pytest
+
+from foodgram_app.catalog import Catalog, CatalogCache, get_catalog_cache
+from foodgram_app.models import CatalogVersion, Ingredients, Tags
+from foodgram_app.tests.test_models import (
+    create_ingredient_obj, create_tag_obj)
+
+
+@pytest.mark.django_db
+class TestCatalog():
+    """Производит тест справочника тегов и ингредиентов процесса."""
+
+    def setup_method(self) -> None:
+        """Создает теги и ингредиенты для тестов."""
+        self.tags: list[Tags] = [
+            create_tag_obj(num=num) for num in range(1, 4)]
+        self.ingredients: list[Ingredients] = [
+            create_ingredient_obj(num=num) for num in range(1, 4)]
+        return
+
+    def test_payloads(self) -> None:
+        """Тестирует выдачу тегов и ингредиентов по ID в порядке
+        сортировки моделей и пропуск отсутствующих ID."""
+        catalog: Catalog = Catalog.build(version=0)
+        tag_ids: list[int] = [tag.id for tag in reversed(self.tags)]
+        assert catalog.get_tags(tag_ids=[*tag_ids, 0]) == [
+            {'id': tag.id, 'name': tag.name, 'color': tag.color,
+             'slug': tag.slug}
+            for tag in Tags.objects.filter(id__in=tag_ids)]
+        ingredient: Ingredients = self.ingredients[0]
+        assert catalog.get_ingredients(
+            amounts=[(ingredient.id, 5), (0, 1)]) == [
+                {'id': ingredient.id, 'name': ingredient.name,
+                 'measurement_unit': ingredient.measurement_unit,
+                 'amount': 5}]
+        assert catalog.has(tag_ids=tag_ids, ingredient_ids=[ingredient.id])
+        assert not catalog.has(tag_ids=[0], ingredient_ids=[])
+        return
+
+    def test_invalidation(self, django_assert_num_queries) -> None:
+        """Тестирует сброс справочника при изменении тега и обновление
+        по версии, измененной другим процессом."""
+        cache: CatalogCache = get_catalog_cache()
+        version: int = cache.get().version
+        with django_assert_num_queries(0):
+            cache.get()
+        tag: Tags = self.tags[0]
+        tag.name = 'Обновленный'
+        tag.save()
+        catalog: Catalog = cache.get()
+        assert catalog.version == version + 1
+        assert catalog.get_tags(tag_ids=[tag.id])[0]['name'] == tag.name
+        cache = CatalogCache(poll_interval=0)
+        cache.get()
+        CatalogVersion.objects.bump()
+        with django_assert_num_queries(3):
+            assert cache.get().version == version + 2
+        with django_assert_num_queries(1):
+            cache.get()
+        return
+
+    def test_resolve_missing(self, django_assert_num_queries) -> None:
+        """Тестирует немедленную сверку версии при отсутствии ID
+        в снимке справочника."""
+        cache: CatalogCache = CatalogCache(poll_interval=60)
+        cache.get()
+        tag: Tags = Tags.objects.create(
+            color='#ABCDEF', name='Новый', slug='new_tag')
+        with django_assert_num_queries(0):
+            cache.resolve(tag_ids=[self.tags[0].id], ingredient_ids=[])
+        assert cache.resolve(tag_ids=[tag.id], ingredient_ids=[]).has(
+            tag_ids=[tag.id], ingredient_ids=[])
+        return
@@ -0,0 +1,309 @@
+import hashlib
+from io import BytesIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection
+from PIL import Image
+from rest_framework import status
+
+from api.v1.serializers import RecipesSerializer
+from api.v1.tests.test_serializers import create_base64_png
+from api.v1.tests.test_views import (
+    URL_RECIPES, URL_RECIPES_PK, auth_token_client)
+from foodgram_app.images import (
+    RECIPES_IMAGE_VARIANTS, get_image_variant_url, process_recipe_image)
+from foodgram_app.models import (
+    RECIPES_IMAGE_STATUS_FAILED, RECIPES_IMAGE_STATUS_PENDING,
+    RECIPES_IMAGE_STATUS_READY, RECIPES_MEDIA_ROOT, MediaGarbage, Recipes)
+from foodgram_app.storage import recipes_image_storage
+from foodgram_app.tasks import finalize_recipe_image, schedule_recipe_image
+from foodgram_app.tests.test_models import (
+    IMAGE_BYTES, create_ingredient_obj, create_recipe_obj, create_tag_obj,
+    create_user_obj)
+
+
+def create_jpeg_with_exif(size: tuple[int, int]) -> bytes:
+    """Создает и возвращает байты JPEG-изображения с метаданными EXIF."""
+    exif: Image.Exif = Image.Exif()
+    exif[0x010F] = 'test_camera'
+    buffer: BytesIO = BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, format='JPEG', exif=exif)
+    return buffer.getvalue()
+
+
+def content_name_matches(path) -> bool:
+    """Проверяет, что имя файла совпадает с SHA-256 его содержимого."""
+    return path.stem == hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+@pytest.mark.django_db
+class TestRecipesImages():
+    """Производит тест конвейера обработки картинок рецептов."""
+
+    @pytest.fixture(autouse=True)
+    def media_root(self, settings, tmp_path):
+        """Сохраняет медиа тестов во временную директорию."""
+        settings.MEDIA_ROOT = tmp_path
+        return tmp_path
+
+    def test_process_recipe_image(
+            self, django_capture_on_commit_callbacks, media_root) -> None:
+        """Тестирует создание вариантов картинки и удаление метаданных."""
+        recipe: Recipes = create_recipe_obj(
+            num=1, user=create_user_obj(num=1))
+        recipe.image.save(
+            'test_image.jpg', BytesIO(create_jpeg_with_exif((2000, 1000))))
+        original: str = recipe.image.name
+        assert process_recipe_image(recipe=recipe) == [original]
+        assert (media_root / original).exists()
+        recipe.refresh_from_db()
+        assert recipe.image.name != original
+        assert content_name_matches(media_root / recipe.image.name)
+        assert set(recipe.image_variants) == set(RECIPES_IMAGE_VARIANTS)
+        for variant, max_size in RECIPES_IMAGE_VARIANTS.items():
+            with Image.open(media_root / recipe.image_variants[variant]) as im:
+                assert im.format == 'WEBP'
+                assert im.width == max_size[0]
+                assert im.height == max_size[0] // 2
+        with Image.open(recipe.image.path) as image:
+            assert 'exif' not in image.info
+        url: str = get_image_variant_url(
+            variants=recipe.image_variants, variant='card')
+        assert url.endswith(recipe.image_variants['card'])
+        assert get_image_variant_url(variants={}, variant='card') is None
+        old_variants: list[str] = list(recipe.image_variants.values())
+        recipe.image.save(
+            'test_image_new.jpg', BytesIO(create_jpeg_with_exif((10, 10))))
+        process_recipe_image(recipe=recipe)
+        for name in old_variants:
+            assert not (media_root / name).exists()
+        new_variants: list[str] = list(recipe.image_variants.values())
+        with django_capture_on_commit_callbacks(execute=True):
+            recipe.delete()
+        for name in new_variants:
+            assert not (media_root / name).exists()
+        return
+
+    def test_build_image_variants_command(self) -> None:
+        """Тестирует создание вариантов картинок командой
+        "build_image_variants" для рецептов без вариантов."""
+        user = create_user_obj(num=1)
+        create_recipe_obj(num=1, user=user)
+        create_recipe_obj(num=2, user=user)
+        assert Recipes.objects.filter(image_variants={}).count() == 2
+        call_command('build_image_variants')
+        assert not Recipes.objects.filter(image_variants={}).exists()
+        return
+
+    def test_recipes_image_variant_urls(self, client) -> None:
+        """Тестирует выдачу URL вариантов картинки в эндпоинтах рецептов:
+        "card" для списка, "detail" для страницы рецепта."""
+        recipe: Recipes = create_recipe_obj(
+            num=1, user=create_user_obj(num=1))
+        process_recipe_image(recipe=recipe)
+        response = client.get(URL_RECIPES)
+        image: str = response.json()['results'][0]['image']
+        assert image.endswith(recipe.image_variants['card'])
+        response = client.get(URL_RECIPES_PK.format(pk=recipe.id))
+        image = response.json()['image']
+        assert image.endswith(recipe.image_variants['detail'])
+        return
+
+    def test_schedule_recipe_image(
+            self, client, django_capture_on_commit_callbacks) -> None:
+        """Тестирует фоновую обработку картинки рецепта после фиксации
+        транзакции и выдачу заглушки до ее завершения."""
+        recipe: Recipes = create_recipe_obj(
+            num=1, user=create_user_obj(num=1))
+        Recipes.objects.filter(id=recipe.id).update(
+            image_status=RECIPES_IMAGE_STATUS_PENDING)
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            schedule_recipe_image(recipe=recipe)
+        response = client.get(URL_RECIPES_PK.format(pk=recipe.id))
+        assert response.json()['image'].endswith('recipe_placeholder.svg')
+        assert len(callbacks) == 1
+        callbacks[0]()
+        recipe.refresh_from_db()
+        assert recipe.image_status == RECIPES_IMAGE_STATUS_READY
+        assert set(recipe.image_variants) == set(RECIPES_IMAGE_VARIANTS)
+        return
+
+    def test_finalize_recipe_image_failed(self) -> None:
+        """Тестирует обработку поврежденной картинки и пропуск обработки
+        замененной картинки."""
+        recipe: Recipes = create_recipe_obj(
+            num=1, user=create_user_obj(num=1))
+        assert finalize_recipe_image(
+            recipe_id=recipe.id, image_name='other.gif') is None
+        recipe.image.save('broken.gif', ContentFile(b'GIF89a broken'))
+        status: str = finalize_recipe_image(recipe_id=recipe.id)
+        assert status == RECIPES_IMAGE_STATUS_FAILED
+        recipe.refresh_from_db()
+        assert recipe.image_status == RECIPES_IMAGE_STATUS_FAILED
+        assert finalize_recipe_image(recipe_id=0) is None
+        return
+
+    def test_content_addressed_storage(
+            self, django_capture_on_commit_callbacks, media_root) -> None:
+        """Тестирует хранение одинаковых картинок в одном файле
+        и удаление файла только после удаления последнего рецепта."""
+        user = create_user_obj(num=1)
+        recipe_1: Recipes = create_recipe_obj(num=1, user=user)
+        recipe_2: Recipes = create_recipe_obj(num=2, user=user)
+        assert recipe_1.image.name == recipe_2.image.name
+        content_hash: str = hashlib.sha256(IMAGE_BYTES).hexdigest()
+        assert recipe_1.image.name == (
+            f'{RECIPES_MEDIA_ROOT}/{content_hash[:2]}/{content_hash}.gif')
+        process_recipe_image(recipe=recipe_1)
+        process_recipe_image(recipe=recipe_2)
+        names: list[str] = [
+            recipe_1.image.name, *recipe_1.image_variants.values()]
+        assert list(recipe_2.image_variants.values()) == names[1:]
+        with django_capture_on_commit_callbacks(execute=True):
+            recipe_1.delete()
+        for name in names:
+            assert (media_root / name).exists()
+        with django_capture_on_commit_callbacks(execute=True):
+            recipe_2.delete()
+        for name in names:
+            assert not (media_root / name).exists()
+        return
+
+    def test_strip_metadata_shared_original(
+            self, django_capture_on_commit_callbacks, media_root) -> None:
+        """Тестирует удаление метаданных картинки, общей для двух рецептов:
+        файлы не перезаписываются, рецепты переключаются на один файл без
+        метаданных, оригинал удаляется после переключения обоих рецептов."""
+        user = create_user_obj(num=1)
+        content: bytes = create_jpeg_with_exif((20, 10))
+        recipes: list[Recipes] = []
+        for num in (1, 2):
+            recipe: Recipes = create_recipe_obj(num=num, user=user)
+            recipe.image.save('test_image.jpg', ContentFile(content))
+            recipes.append(recipe)
+        original: str = recipes[0].image.name
+        assert recipes[1].image.name == original
+        for recipe in recipes:
+            assert (media_root / original).read_bytes() == content
+            with django_capture_on_commit_callbacks(execute=True):
+                assert finalize_recipe_image(recipe_id=recipe.id) == (
+                    RECIPES_IMAGE_STATUS_READY)
+        assert not (media_root / original).exists()
+        names: set[str] = set(
+            Recipes.objects.values_list('image', flat=True))
+        assert len(names) == 1 and original not in names
+        path = media_root / names.pop()
+        assert content_name_matches(path)
+        with Image.open(path) as image:
+            assert 'exif' not in image.info
+        return
+
+    def test_strip_metadata_replaced_image(self) -> None:
+        """Тестирует, что рецепт не переключается на оригинал без
+        метаданных, если его картинка была заменена во время обработки."""
+        recipe: Recipes = create_recipe_obj(
+            num=1, user=create_user_obj(num=1))
+        recipe.image.save(
+            'test_image.jpg', ContentFile(create_jpeg_with_exif((20, 10))))
+        Recipes.objects.filter(id=recipe.id).update(image='other.jpg')
+        stripped: list[str] = process_recipe_image(recipe=recipe)
+        assert len(stripped) == 1 and stripped[0] != recipe.image.name
+        assert Recipes.objects.get(id=recipe.id).image.name == 'other.jpg'
+        return
+
+    def test_save_reclaims_media_garbage(
+            self, django_capture_on_commit_callbacks, media_root) -> None:
+        """Тестирует, что сохранение файла, стоящего в очереди на удаление,
+        снимает его с очереди: удаление очереди до фиксации рецепта,
+        ссылающегося на файл, не удаляет файл."""
+        user = create_user_obj(num=1)
+        recipe: Recipes = create_recipe_obj(num=1, user=user)
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            Recipes.objects.all().delete()
+        assert MediaGarbage.objects.filter(name=recipe.image.name).exists()
+        name: str = recipes_image_storage.save(
+            f'{RECIPES_MEDIA_ROOT}/test_image.gif', ContentFile(IMAGE_BYTES))
+        assert name == recipe.image.name
+        assert not MediaGarbage.objects.exists()
+        for callback in callbacks:
+            callback()
+        assert (media_root / name).exists()
+        create_recipe_obj(num=2, user=user)
+        assert (media_root / name).exists()
+        return
+
+    @pytest.mark.parametrize('rollback', [False, True])
+    def test_save_image_before_transaction(
+            self,
+            rollback: bool,
+            django_capture_on_commit_callbacks,
+            media_root,
+            monkeypatch) -> None:
+        """Тестирует сохранение картинки нового рецепта в хранилище до
+        начала транзакции создания рецепта и удаление файла через очередь
+        "MediaGarbage" при откате транзакции."""
+        create_user_obj(num=1)
+        create_tag_obj(num=1)
+        create_ingredient_obj(num=1)
+        depth: int = len(connection.atomic_blocks)
+        saved: list[tuple[str, int]] = []
+        save = recipes_image_storage.save
+
+        def record_save(name, content, max_length=None) -> str:
+            saved_name: str = save(name, content, max_length=max_length)
+            saved.append((saved_name, len(connection.atomic_blocks)))
+            return saved_name
+
+        def fail_set_tags(*args, **kwargs) -> None:
+            raise RuntimeError('test_rollback')
+
+        monkeypatch.setattr(recipes_image_storage, 'save', record_save)
+        if rollback:
+            monkeypatch.setattr(RecipesSerializer, '_set_tags', fail_set_tags)
+        data: dict = {
+            'ingredients': [{'id': 1, 'amount': 1}],
+            'tags': [1],
+            'image': create_base64_png(size=(2, 2)),
+            'name': 'test_recipe_name',
+            'text': 'test_recipe_text',
+            'cooking_time': 1}
+        client = auth_token_client(user_id=1)
+        with django_capture_on_commit_callbacks(execute=True):
+            if rollback:
+                with pytest.raises(RuntimeError):
+                    client.post(URL_RECIPES, data, format='json')
+            else:
+                response = client.post(URL_RECIPES, data, format='json')
+                assert response.status_code == status.HTTP_201_CREATED
+        name, blocks = saved[0]
+        assert blocks == depth
+        assert Recipes.objects.exists() is not rollback
+        assert (media_root / name).exists() is not rollback
+        assert not MediaGarbage.objects.exists()
+        return
+
+    def test_media_garbage(
+            self, django_capture_on_commit_callbacks, media_root) -> None:
+        """Тестирует постановку файлов в очередь при удалении рецептов,
+        одно удаление очереди на транзакцию и сверку каталога медиа
+        командой "reconcile_media"."""
+        user = create_user_obj(num=1)
+        recipe: Recipes = create_recipe_obj(num=1, user=user)
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            Recipes.objects.all().delete()
+        assert list(MediaGarbage.objects.values_list('name', flat=True)) == [
+            recipe.image.name]
+        assert (media_root / recipe.image.name).exists()
+        for callback in callbacks:
+            callback()
+        assert not MediaGarbage.objects.exists()
+        assert not (media_root / recipe.image.name).exists()
+        recipe = create_recipe_obj(num=2, user=user)
+        orphan: str = recipes_image_storage.save(
+            f'{RECIPES_MEDIA_ROOT}/orphan.gif', ContentFile(b'orphan'))
+        call_command('reconcile_media', min_age=0)
+        assert (media_root / recipe.image.name).exists()
+        assert not (media_root / orphan).exists()
+        return
@@ -0,0 +1,143 @@
+import numpy
+import pytest
+from django.contrib.auth.models import User
+
+from foodgram_app.ingredient_index import IngredientIndex, IngredientIndexCache
+from foodgram_app.models import (
+    Ingredients, Recipes, RecipesIngredients, RecipesIngredientsLog)
+from foodgram_app.tests.test_models import (
+    create_ingredient_obj, create_recipe_ingredient_obj, create_recipe_obj,
+    create_user_obj)
+
+"""Пары (ID ингредиента, ID рецепта): рецепт 1 - ингредиенты 1, 2;
+рецепт 2 - ингредиенты 1, 2, 3, 4; рецепт 3 - ингредиент 3."""
+TEST_PAIRS: list[tuple[int, int]] = [
+    (1, 1), (2, 1), (1, 2), (2, 2), (3, 2), (4, 2), (3, 3)]
+
+
+class TestIngredientIndex():
+    """Производит тест снимка инвертированного индекса ингредиентов."""
+
+    def search(self, index: IngredientIndex, ingredient_ids: list[int],
+               min_coverage: float) -> list[tuple[int, float]]:
+        """Возвращает результат поиска в виде списка пар
+        (ID рецепта, покрытие)."""
+        recipe_ids, coverage = index.search(
+            ingredient_ids=ingredient_ids, min_coverage=min_coverage)
+        return list(zip(recipe_ids.tolist(), coverage.tolist()))
+
+    @pytest.mark.parametrize('ingredient_ids, min_coverage, expected', [
+        ([1, 2], 0.5, [(1, 1.0), (2, 0.5)]),
+        ([1, 2], 0.6, [(1, 1.0)]),
+        ([3], 0.1, [(3, 1.0), (2, 0.25)]),
+        ([1, 3], 0.5, [(3, 1.0), (2, 0.5), (1, 0.5)]),
+        ([100], 0.1, [])])
+    def test_search(self, ingredient_ids, min_coverage, expected) -> None:
+        """Тестирует подбор рецептов по покрытию ингредиентами."""
+        index: IngredientIndex = IngredientIndex.from_pairs(
+            pairs=numpy.array(TEST_PAIRS))
+        assert self.search(index, ingredient_ids, min_coverage) == expected
+        return
+
+    def test_updated(self) -> None:
+        """Тестирует замену ингредиентов рецептов без изменения исходного
+        снимка: рецепт 1 получает ингредиент 3, рецепт 3 удаляется,
+        добавляется рецепт 4. Массив ингредиента 4, не входившего
+        в изменившиеся рецепты, переходит в новый индекс без копирования."""
+        index: IngredientIndex = IngredientIndex.from_pairs(
+            pairs=numpy.array(TEST_PAIRS))
+        updated: IngredientIndex = index.updated(
+            recipe_ids=[1, 3, 4],
+            pairs=numpy.array([(3, 1), (3, 4), (5, 4)]))
+        assert self.search(updated, [3], 0.1) == [
+            (1, 1.0), (4, 0.5), (2, 0.25)]
+        assert self.search(updated, [1], 0.1) == [(2, 0.25)]
+        assert updated.recipe_ids.tolist() == [1, 2, 4]
+        assert updated.sizes.tolist() == [1, 4, 2]
+        assert {recipe_id: ingredient_ids.tolist() for recipe_id,
+                ingredient_ids in updated.ingredients.items()} == {
+                    1: [3], 2: [1, 2, 3, 4], 4: [3, 5]}
+        assert updated.postings[4] is index.postings[4]
+        assert self.search(index, [3], 0.1) == [(3, 1.0), (2, 0.25)]
+        return
+
+
+@pytest.mark.django_db
+class TestIngredientIndexCache():
+    """Производит тест обновления индекса ингредиентов процесса
+    по журналу изменений состава рецептов."""
+
+    def setup_method(self) -> None:
+        """Создает автора и ингредиенты для тестов."""
+        self.user: User = create_user_obj(num=1)
+        self.ingredients: list[Ingredients] = [
+            create_ingredient_obj(num=num) for num in range(1, 4)]
+        self.cache: IngredientIndexCache = IngredientIndexCache(
+            poll_interval=0)
+        return
+
+    def create_recipe(self, num: int, ingredients: list[int]) -> Recipes:
+        """Создает рецепт с ингредиентами по их номерам."""
+        recipe: Recipes = create_recipe_obj(num=num, user=self.user)
+        for ingredient_num in ingredients:
+            create_recipe_ingredient_obj(
+                amount=1,
+                ingredient=self.ingredients[ingredient_num - 1],
+                recipe=recipe)
+        return recipe
+
+    def search(self, ingredient_nums: list[int]) -> list[int]:
+        """Возвращает ID рецептов с покрытием не менее 0.5."""
+        recipe_ids, _ = self.cache.get().search(
+            ingredient_ids=[self.ingredients[num - 1].id
+                            for num in ingredient_nums],
+            min_coverage=0.5)
+        return recipe_ids.tolist()
+
+    def test_cache_follows_writes(self, django_assert_num_queries) -> None:
+        """Тестирует применение изменений рецептов к индексу."""
+        recipe: Recipes = self.create_recipe(num=1, ingredients=[1, 2])
+        assert self.search([1]) == [recipe.id]
+        other: Recipes = self.create_recipe(num=2, ingredients=[3])
+        with django_assert_num_queries(2):
+            assert self.search([3]) == [other.id]
+        RecipesIngredients.objects.filter(
+            recipe=recipe, ingredient=self.ingredients[0]).delete()
+        assert self.search([2]) == [recipe.id]
+        assert self.search([1]) == []
+        other.delete()
+        assert self.search([3]) == []
+        Recipes.objects.filter(id=recipe.id).bulk_delete()
+        assert self.search([2]) == []
+        with django_assert_num_queries(1):
+            assert self.search([2]) == []
+        return
+
+    def test_cache_rechecks_gaps(self) -> None:
+        """Тестирует повторную проверку ID журнала, которые не были видны
+        при опросе (транзакция записи еще не зафиксирована)."""
+        self.cache.get()
+        recipe: Recipes = self.create_recipe(num=1, ingredients=[1])
+        logs: list[RecipesIngredientsLog] = list(
+            RecipesIngredientsLog.objects.order_by('id'))
+        hidden: RecipesIngredientsLog = logs[-1]
+        RecipesIngredientsLog.objects.filter(id=hidden.id).delete()
+        RecipesIngredientsLog.objects.log(recipe_ids=[0])
+        assert self.search([1]) == []
+        RecipesIngredientsLog.objects.bulk_create([hidden])
+        assert self.search([1]) == [recipe.id]
+        return
+
+    def test_cache_rebuilds_on_expired_gap(self) -> None:
+        """Тестирует перестроение индекса целиком, если пропущенный ID
+        журнала не появился за время ожидания."""
+        self.cache.get()
+        recipe: Recipes = self.create_recipe(num=1, ingredients=[1])
+        hidden: RecipesIngredientsLog = (
+            RecipesIngredientsLog.objects.order_by('id').last())
+        RecipesIngredientsLog.objects.filter(id=hidden.id).delete()
+        RecipesIngredientsLog.objects.log(recipe_ids=[0])
+        assert self.search([1]) == []
+        self.cache.gap_timeout = 0
+        assert self.search([1]) == [recipe.id]
+        return
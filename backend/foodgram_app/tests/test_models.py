@@ -3,6 +3,7 @@ import os
 import pytest
 import shutil
 from django.conf import settings
+from django.contrib.admin import site
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile
@@ -10,8 +11,8 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db.models import CASCADE, SET_NULL
 
 from foodgram_app.models import (
-    Ingredients, Recipes, RecipesFavorites, RecipesIngredients,
-    RecipesTags, ShoppingCarts, Subscriptions, Tags)
+    Ingredients, MediaGarbage, Recipes, RecipesFavorites, RecipesIngredients,
+    RecipesIngredientsLog, RecipesTags, ShoppingCarts, Subscriptions, Tags)
 
 IMAGE_BYTES: bytes = (
     b'\x47\x49\x46\x38\x39\x61\x02\x00'
@@ -788,6 +789,88 @@ class TestSubscriptionsModel():
         return
 
 
+@pytest.mark.django_db
+class TestRecipesBulkDelete():
+    """Производит тест массового удаления рецептов
+    "RecipesQuerySet.bulk_delete" и удаления ингредиентов."""
+
+    def create_recipes(self, count: int) -> Ingredients:
+        """Создает рецепты с общим ингредиентом, тегом, избранным
+        и списком покупок. Возвращает общий ингредиент."""
+        user: User = create_user_obj(num=1)
+        ingredient: Ingredients = create_ingredient_obj(num=1)
+        tag: Tags = create_tag_obj(num=1)
+        for num in range(1, count + 1):
+            recipe: Recipes = create_recipe_obj(num=num, user=user)
+            create_recipe_ingredient_obj(
+                amount=1, ingredient=ingredient, recipe=recipe)
+            create_recipe_tag_obj(recipe=recipe, tag=tag)
+            create_recipe_favorite_obj(recipe=recipe, user=user)
+            create_shopping_cart_obj(recipe=recipe, user=user)
+        return ingredient
+
+    @pytest.mark.parametrize('count', [1, TEST_OBJECTS_COUNT + 1])
+    def test_bulk_delete(self, count, django_assert_num_queries) -> None:
+        """Тестирует удаление рецептов и зависимых строк фиксированным
+        числом запросов независимо от числа рецептов."""
+        self.create_recipes(count=count)
+        RecipesIngredientsLog.objects.all().delete()
+        with django_assert_num_queries(13):
+            assert Recipes.objects.all().bulk_delete() == count
+        assert not Recipes.objects.exists()
+        assert not RecipesIngredients.objects.exists()
+        assert not RecipesTags.objects.exists()
+        assert not RecipesFavorites.objects.exists()
+        assert ShoppingCarts.objects.filter(recipe=None).count() == count
+        assert MediaGarbage.objects.count() == 1
+        assert RecipesIngredientsLog.objects.count() == count
+        return
+
+    @pytest.mark.parametrize('count', [TEST_OBJECTS_COUNT, 40])
+    def test_delete_ingredient(
+            self, count, django_assert_max_num_queries) -> None:
+        """Тестирует удаление рецептов при удалении ингредиента
+        фиксированным числом запросов независимо от числа рецептов."""
+        ingredient: Ingredients = self.create_recipes(count=count)
+        other_recipe: Recipes = create_recipe_obj(
+            num=count + 1, user=User.objects.get())
+        with django_assert_max_num_queries(18):
+            ingredient.delete()
+        assert list(Recipes.objects.all()) == [other_recipe]
+        assert not Ingredients.objects.exists()
+        return
+
+    @pytest.mark.parametrize('count', [TEST_OBJECTS_COUNT, 40])
+    @pytest.mark.parametrize('model, delete, queries', [
+        (Ingredients, lambda queryset: queryset.get().delete(), 19),
+        (Ingredients, lambda queryset: queryset.delete(), 19),
+        (Ingredients,
+         lambda queryset: site._registry[Ingredients].delete_queryset(
+             request=None, queryset=queryset), 19),
+        (Recipes,
+         lambda queryset: site._registry[Recipes].delete_queryset(
+             request=None, queryset=queryset), 13)])
+    def test_delete_entry_points(
+            self,
+            count,
+            model,
+            delete,
+            queries,
+            django_assert_num_queries,
+            django_capture_on_commit_callbacks) -> None:
+        """Тестирует удаление рецептов через удаление ингредиента,
+        QuerySet ингредиентов и действия админ-зоны фиксированным числом
+        запросов и удаление изображений после фиксации транзакции."""
+        self.create_recipes(count=count)
+        with django_capture_on_commit_callbacks(execute=True):
+            with django_assert_num_queries(queries):
+                delete(model.objects.all())
+        assert not Recipes.objects.exists()
+        assert not RecipesIngredients.objects.exists()
+        assert not MediaGarbage.objects.exists()
+        return
+
+
 def test_delete_temp_media_folder() -> None:
     """Проверяет, что папка с тестовыми медиа-данными успешно удалена."""
     shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
@@ -0,0 +1,89 @@
+import numpy
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+
+from foodgram_app.models import RecipeRecommendations, Recipes
+from foodgram_app.recommendations import recommend
+from foodgram_app.sparse import top_scores
+from foodgram_app.tests.test_models import (
+    create_recipe_favorite_obj, create_recipe_obj, create_shopping_cart_obj,
+    create_subscription_obj, create_user_obj)
+
+
+@pytest.mark.parametrize('top_n, expected', [
+    (1, [5]),
+    (2, [5, 4]),
+    (3, [5, 4, 2]),
+    (10, [5, 4, 2, 3, 1])])
+def test_top(top_n: int, expected: list[int]) -> None:
+    """Тестирует выбор лучших рецептов: по убыванию оценки, при равной
+    оценке (в том числе на границе отбора) - по убыванию ID."""
+    recipes: list[tuple[int, float]] = top_scores(
+        recipe_ids=numpy.array([1, 2, 3, 4, 5]),
+        scores=numpy.array([0.1, 0.5, 0.2, 0.5, 0.9]),
+        top_n=top_n)
+    assert [recipe_id for recipe_id, _ in recipes] == expected
+    return
+
+
+@pytest.mark.django_db
+class TestRecommendations():
+    """Производит тест офлайн-расчета персональных рекомендаций."""
+
+    def setup_method(self) -> None:
+        """Создает пользователей 1-3 и авторов 4-5. Рецепты 1-4 - автора 4,
+        рецепт 5 - пользователя 1, рецепт 6 - автора 5.
+        Пользователь 1: избранное 1, 2, список покупок 5, подписка на 5;
+        пользователь 2: избранное 1, 2, 3; пользователь 3: избранное 3, 4."""
+        self.users: list[User] = [
+            create_user_obj(num=num) for num in range(1, 6)]
+        self.recipes: list[Recipes] = [
+            create_recipe_obj(num=num, user=self.users[3])
+            for num in range(1, 5)]
+        self.recipes.append(create_recipe_obj(num=5, user=self.users[0]))
+        self.recipes.append(create_recipe_obj(num=6, user=self.users[4]))
+        for user_num, recipe_nums in ((1, [1, 2]), (2, [1, 2, 3]),
+                                      (3, [3, 4])):
+            for recipe_num in recipe_nums:
+                create_recipe_favorite_obj(
+                    recipe=self.recipes[recipe_num - 1],
+                    user=self.users[user_num - 1])
+        create_shopping_cart_obj(recipe=self.recipes[4], user=self.users[0])
+        create_subscription_obj(
+            subscriber=self.users[0], subscription_to=self.users[4])
+        return
+
+    def recipe_ids(self, recipe_nums: list[int]) -> list[int]:
+        """Возвращает ID рецептов по их номерам."""
+        return [self.recipes[num - 1].id for num in recipe_nums]
+
+    @pytest.mark.parametrize('block_size', [1, 2, 256])
+    def test_recommend(
+            self, block_size: int, django_assert_num_queries) -> None:
+        """Тестирует порядок рекомендаций и исключение рецептов
+        из избранного, списка покупок и собственных рецептов при расчете
+        блоками пользователей разного размера."""
+        with django_assert_num_queries(4):
+            recommendations: dict[int, list] = recommend(
+                block_size=block_size)
+        assert {
+            user_id: [recipe_id for recipe_id, _ in recipes]
+            for user_id, recipes in recommendations.items()} == {
+                self.users[0].id: self.recipe_ids([6, 3]),
+                self.users[1].id: self.recipe_ids([6, 5, 4]),
+                self.users[2].id: self.recipe_ids([2, 1])}
+        assert recommend(top_n=1)[self.users[1].id] == [
+            (self.recipes[5].id, recommendations[self.users[1].id][0][1])]
+        return
+
+    def test_build_recommendations(self) -> None:
+        """Тестирует запись рекомендаций командой "build_recommendations"
+        с заменой ранее рассчитанных."""
+        call_command('build_recommendations', top_n=2)
+        call_command('build_recommendations', block_size=1)
+        assert list(RecipeRecommendations.objects.filter(
+            user=self.users[1]).values_list('rank', 'recipe_id')) == list(
+                enumerate(self.recipe_ids([6, 5, 4]), start=1))
+        assert RecipeRecommendations.objects.count() == 7
+        return
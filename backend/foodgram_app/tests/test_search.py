@@ -0,0 +1,27 @@
+import pytest
+from django.db import connection
+
+from foodgram_app.models import Recipes
+from foodgram_app.search import install_recipes_search, search_recipes
+from foodgram_app.tests.test_models import create_recipe_obj, create_user_obj
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Индекс FTS5 есть только в SQLite.')
+@pytest.mark.django_db
+def test_install_recreates_dropped_triggers() -> None:
+    """Тестирует, что при повторной установке индекса триггеры
+    синхронизации, удаленные при пересоздании таблицы рецептов, создаются
+    заново, а изменения без триггеров попадают в индекс."""
+    recipe: Recipes = create_recipe_obj(num=1, user=create_user_obj(num=1))
+    fts: str = f'{Recipes._meta.db_table}_fts'
+    with connection.cursor() as cursor:
+        for suffix in ('ai', 'ad', 'au'):
+            cursor.execute(f'DROP TRIGGER {fts}_{suffix}')
+    Recipes.objects.filter(id=recipe.id).update(name='Борщ')
+    install_recipes_search()
+    assert list(search_recipes(Recipes.objects.all(), 'борщ')) == [recipe]
+    Recipes.objects.filter(id=recipe.id).update(name='Солянка')
+    assert list(search_recipes(Recipes.objects.all(), 'солянка')) == [recipe]
+    assert not search_recipes(Recipes.objects.all(), 'борщ').exists()
+    return
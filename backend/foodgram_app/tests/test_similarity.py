@@ -0,0 +1,139 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+
+from foodgram_app.ingredient_index import get_ingredient_index_cache
+from foodgram_app.models import Ingredients, Recipes, SimilarRecipes
+from foodgram_app.similarity import (
+    _may_include, build_similar_recipes, refresh_similar_recipes)
+from foodgram_app.tests.test_models import (
+    create_ingredient_obj, create_recipe_ingredient_obj, create_recipe_obj,
+    create_user_obj)
+
+"""Составы тестовых рецептов (номера ингредиентов)."""
+TEST_RECIPES_INGREDIENTS: list[list[int]] = [[1, 2], [1, 2, 3], [3, 4], [4]]
+
+
+@pytest.mark.django_db
+class TestSimilarRecipes():
+    """Производит тест расчета похожих рецептов."""
+
+    def setup_method(self) -> None:
+        """Создает рецепты с ингредиентами из "TEST_RECIPES_INGREDIENTS"."""
+        get_ingredient_index_cache().clear()
+        self.user: User = create_user_obj(num=1)
+        self.ingredients: list[Ingredients] = [
+            create_ingredient_obj(num=num) for num in range(1, 6)]
+        self.recipes: list[Recipes] = [
+            self.create_recipe(num=num, ingredients=ingredients)
+            for num, ingredients in enumerate(
+                TEST_RECIPES_INGREDIENTS, start=1)]
+        return
+
+    def create_recipe(self, num: int, ingredients: list[int]) -> Recipes:
+        """Создает рецепт с ингредиентами по их номерам."""
+        recipe: Recipes = create_recipe_obj(num=num, user=self.user)
+        self.add_ingredients(recipe=recipe, ingredients=ingredients)
+        return recipe
+
+    def add_ingredients(self, recipe: Recipes, ingredients: list[int]) -> None:
+        """Добавляет в рецепт ингредиенты по их номерам."""
+        for ingredient_num in ingredients:
+            create_recipe_ingredient_obj(
+                amount=1,
+                ingredient=self.ingredients[ingredient_num - 1],
+                recipe=recipe)
+        return
+
+    def similar(self) -> dict[int, list[tuple[int, float]]]:
+        """Возвращает содержимое "SimilarRecipes" в виде словаря
+        {ID рецепта: [(ID похожего рецепта, сходство), ...]}."""
+        similar: dict[int, list[tuple[int, float]]] = {}
+        for recipe_id, similar_id, score in SimilarRecipes.objects.values_list(
+                'recipe_id', 'similar_id', 'score'):
+            similar.setdefault(recipe_id, []).append(
+                (similar_id, round(score, 4)))
+        return similar
+
+    @pytest.mark.parametrize('block_size', [1, 3, 256])
+    def test_build(self, block_size: int) -> None:
+        """Тестирует полный расчет блоками рецептов: коэффициент Жаккара,
+        ограничение числа похожих рецептов и порядок при равном сходстве."""
+        r1, r2, r3, r4 = [recipe.id for recipe in self.recipes]
+        assert build_similar_recipes(top_k=2, block_size=block_size) == 6
+        assert self.similar() == {
+            r1: [(r2, 0.6667)],
+            r2: [(r1, 0.6667), (r3, 0.25)],
+            r3: [(r4, 0.5), (r2, 0.25)],
+            r4: [(r3, 0.5)]}
+        call_command('build_similar_recipes', top_k=1)
+        assert self.similar()[r2] == [(r1, 0.6667)]
+        return
+
+    def test_may_include_batches(self, django_assert_num_queries) -> None:
+        """Тестирует отбор рецептов, в списки которых может войти
+        изменившийся рецепт, запросами по batch_size рецептов."""
+        build_similar_recipes(top_k=1)
+        scores: dict[int, float] = {
+            recipe.id: 0.5 for recipe in self.recipes}
+        with django_assert_num_queries(1):
+            expected: set[int] = _may_include(scores=scores, top_k=1)
+        with django_assert_num_queries(2):
+            assert _may_include(
+                scores=scores, top_k=1, batch_size=3) == expected
+        assert expected == {self.recipes[2].id, self.recipes[3].id}
+        return
+
+    @pytest.mark.parametrize('change', ['add', 'create', 'delete'])
+    def test_refresh(self, change: str) -> None:
+        """Тестирует инкрементальный пересчет: результат совпадает
+        с полным расчетом после изменения состава рецепта, создания
+        рецепта, который входит в списки других рецептов, и удаления
+        рецепта из списков других рецептов."""
+        build_similar_recipes(top_k=1)
+        recipe: Recipes = self.recipes[0]
+        if change == 'add':
+            self.add_ingredients(recipe=recipe, ingredients=[3, 4])
+        elif change == 'create':
+            recipe = self.create_recipe(num=5, ingredients=[3, 4])
+        recipe_id: int = recipe.id
+        if change == 'delete':
+            recipe.delete()
+        refresh_similar_recipes(recipe_ids={recipe_id}, top_k=1)
+        refreshed: dict[int, list[tuple[int, float]]] = self.similar()
+        build_similar_recipes(top_k=1)
+        assert refreshed == self.similar()
+        return
+
+    def test_refresh_concurrent(self, monkeypatch) -> None:
+        """Тестирует, что пересчет, одновременный с другим пересчетом
+        того же рецепта (его записи вставлены между удалением и вставкой),
+        не создает повторяющихся записей."""
+        build_similar_recipes()
+        expected: dict[int, list[tuple[int, float]]] = self.similar()
+        bulk_create = SimilarRecipes.objects.bulk_create
+
+        def concurrent_bulk_create(rows, **kwargs):
+            bulk_create([
+                SimilarRecipes(
+                    recipe_id=row.recipe_id, similar_id=row.similar_id,
+                    score=row.score)
+                for row in rows])
+            return bulk_create(rows, **kwargs)
+
+        monkeypatch.setattr(
+            SimilarRecipes.objects, 'bulk_create', concurrent_bulk_create)
+        refresh_similar_recipes(recipe_ids={self.recipes[1].id})
+        assert self.similar() == expected
+        return
+
+    def test_refresh_on_commit(
+            self, django_capture_on_commit_callbacks) -> None:
+        """Тестирует пересчет похожих рецептов после фиксации транзакции,
+        изменившей состав рецепта."""
+        build_similar_recipes()
+        recipe: Recipes = self.recipes[3]
+        with django_capture_on_commit_callbacks(execute=True):
+            self.add_ingredients(recipe=recipe, ingredients=[1, 2, 3])
+        assert self.similar()[recipe.id][0] == (self.recipes[1].id, 0.75)
+        return
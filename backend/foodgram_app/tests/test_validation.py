@@ -0,0 +1,69 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+
+from foodgram_app.models import Recipes, RecipesFavorites
+from foodgram_app.validation import (
+    VALIDATION_MODE_CONSTRAINTS, VALIDATION_MODE_FULL,
+    get_validation_mode, validation_mode)
+
+
+@pytest.mark.django_db
+class TestValidationMode():
+    """Производит тест режимов валидации при сохранении объектов."""
+
+    def setup_method(self):
+        """Создает пользователя и рецепт для тестов."""
+        self.user: User = User.objects.create(
+            username='test_user', email='test_user@email.com')
+        self.recipe: Recipes = Recipes.objects.create(
+            author=self.user,
+            cooking_time=1,
+            image='recipes/images/test.gif',
+            name='test_recipe',
+            text='test_recipe_text')
+        return
+
+    def test_validation_mode_context(self):
+        """Тест переключения и восстановления режима валидации."""
+        assert get_validation_mode() == VALIDATION_MODE_FULL
+        with validation_mode(VALIDATION_MODE_CONSTRAINTS):
+            assert get_validation_mode() == VALIDATION_MODE_CONSTRAINTS
+        assert get_validation_mode() == VALIDATION_MODE_FULL
+        with pytest.raises(ValueError):
+            with validation_mode('unknown'):
+                pass
+        return
+
+    @pytest.mark.parametrize(
+        'mode, queries',
+        [(VALIDATION_MODE_FULL, 4), (VALIDATION_MODE_CONSTRAINTS, 1)])
+    def test_validation_mode_queries(
+            self, django_assert_num_queries, mode, queries):
+        """Тест числа запросов к БД при сохранении объекта."""
+        favorite: RecipesFavorites = RecipesFavorites(
+            recipe=self.recipe, user=self.user)
+        with validation_mode(mode), django_assert_num_queries(queries):
+            favorite.save()
+        return
+
+    def test_validation_mode_constraints_fields(self):
+        """Тест проверки значений полей в режиме "constraints"."""
+        with validation_mode(VALIDATION_MODE_CONSTRAINTS):
+            with pytest.raises(ValidationError):
+                Recipes(
+                    author=self.user,
+                    cooking_time=0,
+                    image='recipes/images/test.gif',
+                    name='test_recipe_invalid',
+                    text='test_recipe_text').save()
+        return
+
+    def test_benchmark_writes_command(self):
+        """Тест команды "benchmark_writes": объекты не остаются в БД."""
+        users_count: int = User.objects.count()
+        call_command('benchmark_writes', count=3)
+        assert User.objects.count() == users_count
+        assert Recipes.objects.count() == 1
+        return
@@ -0,0 +1,46 @@
+"""
+Создает режимы валидации моделей проекта "Foodgram" при сохранении.
+
+Режимы:
+    - VALIDATION_MODE_FULL: полная проверка "full_clean()" (по умолчанию;
+      админ-зона, формы, консоль);
+    - VALIDATION_MODE_CONSTRAINTS: проверяются только значения полей,
+      а уникальность, ограничения и существование связанных объектов
+      обеспечиваются ограничениями БД. Предназначен для записи через API,
+      когда данные уже проверены сериализатором: сохранение не выполняет
+      дополнительных запросов к БД.
+
+Режим хранится в contextvars и действует только внутри
+"with validation_mode(...)" текущего потока или задачи asyncio.
+
+Функции:
+    - get_validation_mode;
+    - validation_mode.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+VALIDATION_MODE_CONSTRAINTS: str = 'constraints'
+VALIDATION_MODE_FULL: str = 'full'
+VALIDATION_MODES: tuple[str] = (
+    VALIDATION_MODE_CONSTRAINTS, VALIDATION_MODE_FULL)
+
+_validation_mode: ContextVar[str] = ContextVar(
+    'validation_mode', default=VALIDATION_MODE_FULL)
+
+
+def get_validation_mode() -> str:
+    """Возвращает текущий режим валидации."""
+    return _validation_mode.get()
+
+
+@contextmanager
+def validation_mode(mode: str):
+    """Устанавливает режим валидации mode внутри блока "with"."""
+    if mode not in VALIDATION_MODES:
+        raise ValueError(f'Неизвестный режим валидации "{mode}".')
+    token = _validation_mode.set(mode)
+    try:
+        yield
+    finally:
+        _validation_mode.reset(token)
@@ -0,0 +1,62 @@
+"""
+Создает хешеры паролей проекта "Foodgram" с настраиваемой стоимостью.
+
+Классы-хешеры:
+    - TunedArgon2PasswordHasher (унаследован от Argon2PasswordHasher);
+    - TunedPBKDF2PasswordHasher (унаследован от PBKDF2PasswordHasher);
+    - TunedScryptPasswordHasher (унаследован от ScryptPasswordHasher).
+
+Параметры стоимости берутся из настройки "PASSWORD_HASHER_COST". Хешеры
+сохраняют имена алгоритмов Django, поэтому существующие хеши проверяются
+без изменений. Если параметры хеша отличаются от настроенных, Django
+пересчитывает его при успешном входе ("must_update").
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher, PBKDF2PasswordHasher, ScryptPasswordHasher)
+
+
+def get_cost(name: str) -> int:
+    """Возвращает параметр стоимости хеширования из "PASSWORD_HASHER_COST"."""
+    return settings.PASSWORD_HASHER_COST[name]
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Хешер Argon2 с параметрами "ARGON2_*" из "PASSWORD_HASHER_COST".
+    Требует установленной библиотеки "argon2-cffi"."""
+
+    @property
+    def memory_cost(self) -> int:
+        return get_cost('ARGON2_MEMORY_COST')
+
+    @property
+    def parallelism(self) -> int:
+        return get_cost('ARGON2_PARALLELISM')
+
+    @property
+    def time_cost(self) -> int:
+        return get_cost('ARGON2_TIME_COST')
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """Хешер PBKDF2-SHA256 с числом итераций "PBKDF2_ITERATIONS"
+    из "PASSWORD_HASHER_COST"."""
+
+    @property
+    def iterations(self) -> int:
+        return get_cost('PBKDF2_ITERATIONS')
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """Хешер scrypt с параметром "SCRYPT_WORK_FACTOR" из
+    "PASSWORD_HASHER_COST". Лимит памяти OpenSSL рассчитывается по
+    параметрам, так как значение по умолчанию (32 МБ) недостаточно для
+    работы с "SCRYPT_WORK_FACTOR" больше 2 ** 14."""
+
+    @property
+    def maxmem(self) -> int:
+        return 2 * 128 * self.work_factor * self.block_size
+
+    @property
+    def work_factor(self) -> int:
+        return get_cost('SCRYPT_WORK_FACTOR')
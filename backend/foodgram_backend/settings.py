@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 from .databases import DATABASE_POSTGRESQL
@@ -33,6 +34,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.v1.compression.ResponseCompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -63,6 +65,56 @@ WSGI_APPLICATION = 'foodgram_backend.wsgi.application'
 
 DATABASES = DATABASE_POSTGRESQL
 
+AUTHENTICATION_BACKENDS = [
+    'api.v1.backends.EmailBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+PASSWORD_HASHER_COST = {
+    'ARGON2_MEMORY_COST': int(
+        os.getenv('PASSWORD_ARGON2_MEMORY_COST', 102400)),
+    'ARGON2_PARALLELISM': int(os.getenv('PASSWORD_ARGON2_PARALLELISM', 8)),
+    'ARGON2_TIME_COST': int(os.getenv('PASSWORD_ARGON2_TIME_COST', 2)),
+    'PBKDF2_ITERATIONS': int(os.getenv('PASSWORD_PBKDF2_ITERATIONS', 390000)),
+    'SCRYPT_WORK_FACTOR': int(
+        os.getenv('PASSWORD_SCRYPT_WORK_FACTOR', 2 ** 14)),
+}
+
+PASSWORD_HASHERS_LEGACY = [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+# Первый хешер политики используется для новых паролей, остальные - только
+# для проверки существующих хешей (с пересчетом при успешном входе).
+PASSWORD_HASHER_POLICIES = {
+    'argon2': [
+        'foodgram_backend.hashers.TunedArgon2PasswordHasher',
+        'foodgram_backend.hashers.TunedPBKDF2PasswordHasher',
+        'foodgram_backend.hashers.TunedScryptPasswordHasher',
+        *PASSWORD_HASHERS_LEGACY],
+    'pbkdf2': [
+        'foodgram_backend.hashers.TunedPBKDF2PasswordHasher',
+        'foodgram_backend.hashers.TunedArgon2PasswordHasher',
+        'foodgram_backend.hashers.TunedScryptPasswordHasher',
+        *PASSWORD_HASHERS_LEGACY],
+    'scrypt': [
+        'foodgram_backend.hashers.TunedScryptPasswordHasher',
+        'foodgram_backend.hashers.TunedPBKDF2PasswordHasher',
+        'foodgram_backend.hashers.TunedArgon2PasswordHasher',
+        *PASSWORD_HASHERS_LEGACY],
+}
+
+PASSWORD_HASHER_POLICY = os.getenv('PASSWORD_HASHER_POLICY', 'pbkdf2')
+
+if PASSWORD_HASHER_POLICY not in PASSWORD_HASHER_POLICIES:
+    raise ImproperlyConfigured(
+        f'Неизвестная политика хеширования паролей '
+        f'PASSWORD_HASHER_POLICY="{PASSWORD_HASHER_POLICY}", допустимые: '
+        f'{", ".join(PASSWORD_HASHER_POLICIES)}.')
+
+PASSWORD_HASHERS = PASSWORD_HASHER_POLICIES[PASSWORD_HASHER_POLICY]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -80,7 +132,7 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication'],
+        'api.v1.authentication.CachedTokenAuthentication'],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny'],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
@@ -91,13 +143,40 @@ REST_FRAMEWORK = {
     'DEFAULT_THROTTLE_RATES': {
         'user': '10000/day',
         'anon': '1000/day'},
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.v1.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer'],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'api.v1.parsers.FastJSONParser',
         'rest_framework.parsers.FormParser',
         'rest_framework.parsers.MultiPartParser',
         'rest_framework.parsers.FileUploadParser']
 }
 
+# Без CACHE_ALIAS кэш токенов хранится в памяти процесса, и отзыв токена
+# в других процессах действует через TIMEOUT секунд. При нескольких
+# процессах (воркеры Gunicorn, контейнеры) задайте общий кэш Django.
+TOKEN_AUTHENTICATION_CACHE = {
+    'CACHE_ALIAS': os.getenv('TOKEN_AUTHENTICATION_CACHE_ALIAS') or None,
+    'MAX_SIZE': int(os.getenv('TOKEN_AUTHENTICATION_CACHE_MAX_SIZE', 10000)),
+    'TIMEOUT': int(os.getenv('TOKEN_AUTHENTICATION_CACHE_TIMEOUT', 60)),
+}
+
+RESPONSE_COMPRESSION = {
+    'CACHE_MAX_SIZE': int(
+        os.getenv('RESPONSE_COMPRESSION_CACHE_MAX_SIZE', 256)),
+    'LEVEL': int(os.getenv('RESPONSE_COMPRESSION_LEVEL', 6)),
+    'MIN_SIZE': int(os.getenv('RESPONSE_COMPRESSION_MIN_SIZE', 1024)),
+    'ENDPOINTS': {
+        '/api/v1/ingredients/': {'CACHE': True, 'LEVEL': 9},
+        '/api/v1/tags/': {'CACHE': True, 'LEVEL': 9},
+        '/api/v1/recipes/': {'CACHE': True, 'CACHE_QUERY_PARAMS': ('page',)},
+        '/api/v1/recipes/download_shopping_cart/': {'CACHE': False},
+        '/api/v1/recipes/recommended/': {'CACHE': False}},
+}
+
+RECIPES_IMAGE_WORKERS = int(os.getenv('RECIPES_IMAGE_WORKERS', 2))
+
 LANGUAGE_CODE = 'ru-ru'
 
 TIME_ZONE = 'Europe/Moscow'
@@ -6,3 +6,5 @@ DATABASES = DATABASE_SQLITE_PYTEST
 SECRET_KEY = 'test_secret_key'
 
 MEDIA_ROOT = BASE_DIR / 'foodgram_app/test_media'
+
+RECIPES_IMAGE_WORKERS = 0